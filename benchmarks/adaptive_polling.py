@@ -0,0 +1,90 @@
+"""
+Simulation: fixed-interval polling vs the adaptive scheduler
+
+Replays a listening session on a virtual clock - a playlist of tracks,
+then a long pause, then the player closed - and counts polls and the
+delay between each real track change and the poll that notices it.
+
+Usage: python benchmarks/adaptive_polling.py [--tracks N] [--seed S]
+"""
+import argparse
+import os
+import random
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.adaptive_scheduler import (AdaptiveScheduler, SCHEDULE_PLAYING, SCHEDULE_PAUSED,
+                                     SCHEDULE_ABSENT)
+
+PAUSE_SECONDS = 3600
+ABSENT_SECONDS = 3600
+
+
+def build_session(tracks, rng):
+    """List of (start, end, state, duration) segments"""
+    segments = []
+    now = 0.0
+    for _ in range(tracks):
+        duration = rng.uniform(150, 420)
+        segments.append((now, now + duration, SCHEDULE_PLAYING, duration))
+        now += duration
+    segments.append((now, now + PAUSE_SECONDS, SCHEDULE_PAUSED, 0))
+    now += PAUSE_SECONDS
+    segments.append((now, now + ABSENT_SECONDS, SCHEDULE_ABSENT, 0))
+    return segments
+
+
+def simulate(segments, next_delay, observe):
+    """Poll through the session; returns polls per segment state and detection delays"""
+    polls = {}
+    delays = []
+    index = 0
+    seen = -1
+    now = 0.0
+    end = segments[-1][1]
+    while now < end:
+        while segments[index][1] <= now:
+            index += 1
+        start, _, state, duration = segments[index]
+        polls[state] = polls.get(state, 0) + 1
+        if index != seen:
+            if seen >= 0 and segments[seen][2] == SCHEDULE_PLAYING:
+                delays.append(now - start)
+            seen = index
+        observe(state, now - start if state == SCHEDULE_PLAYING else None, duration or None, now)
+        now += next_delay(now)
+    return polls, delays
+
+
+def report(label, polls, delays):
+    delays = sorted(delays)
+    p50 = delays[len(delays) // 2] * 1000
+    worst = delays[-1] * 1000
+    detail = ", ".join(f"{state} {count}" for state, count in polls.items())
+    print(f"{label:<9} {sum(polls.values()):7d} polls ({detail})")
+    print(f"{'':<9} track change detected after p50 {p50:6.0f} ms, max {worst:6.0f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--tracks", type=int, default=40)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    segments = build_session(args.tracks, random.Random(args.seed))
+    print(f"{args.tracks} tracks, then paused {PAUSE_SECONDS}s, then closed {ABSENT_SECONDS}s "
+          f"(adapt+anc: anchor progress mode, playing interval not capped)")
+
+    fixed = simulate(segments, lambda now: 1.0, lambda *args: None)
+    report("fixed 1s", *fixed)
+
+    for label, cap in (("adaptive", True), ("adapt+anc", False)):
+        scheduler = AdaptiveScheduler(cap_to_progress=cap)
+        adaptive = simulate(segments, lambda now: scheduler.next_delay(now),
+                            lambda state, position, duration, now: scheduler.observe(state, position, duration, now))
+        report(label, *adaptive)
+
+
+if __name__ == "__main__":
+    main()
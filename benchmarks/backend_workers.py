@@ -0,0 +1,105 @@
+"""
+Benchmark: supervised backend worker processes
+
+Runs two scripted fake backends in worker processes (no Windows needed),
+lets them stream deltas, then crashes one and freezes the other, and reports
+how long the supervisor took to notice each failure and to get the backend
+publishing again. A frozen worker is only noticed by its missing heartbeats,
+so the heartbeat timeout is shortened for the run.
+
+Usage: python benchmarks/backend_workers.py
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.backend_supervisor import BackendSupervisor
+from core.runtime import get_runtime
+from players.remote_player import RemotePlayer
+from testing.fakes import ScriptedFakePlayer
+
+HEARTBEAT_TIMEOUT = 3.0
+
+
+class _Sink:
+    """Accepts any manager call"""
+
+    def __getattr__(self, name):
+        return lambda *args, **kwargs: None
+
+
+class _CountingHub(_Sink):
+    """Event hub that remembers when each player last published"""
+
+    def __init__(self):
+        self.published = {}
+
+    def publish_now_playing(self, title, artist, album, player):
+        self.published[player] = time.time()
+
+    def publish_progress(self, title, artist, album, position_seconds, duration_seconds, is_playing, player):
+        self.published[player] = time.time()
+
+
+def wait_until(condition, timeout):
+    started = time.time()
+    while not condition():
+        if time.time() - started > timeout:
+            return None
+        time.sleep(0.05)
+    return time.time() - started
+
+
+def main():
+    supervisor = BackendSupervisor(heartbeat_timeout=HEARTBEAT_TIMEOUT, restart_backoff=(0.5, 5.0))
+    hub = _CountingHub()
+    tracks = [("Airbag", "Radiohead", "OK Computer"), ("Lucky", "Radiohead", "OK Computer")]
+    players = {}
+    for name in ("fake-a", "fake-b"):
+        player = RemotePlayer(name, ScriptedFakePlayer, _Sink(), _Sink(), _Sink(), supervisor,
+                              options={"tracks": tracks, "track_seconds": 2.0, "tick": 0.5})
+        player.event_hub = hub
+        players[name] = player
+
+    started = time.time()
+    for name, player in players.items():
+        print(f"{name} available: {player.is_available()}")
+        player.start_monitoring()
+    ready = wait_until(lambda: all(name in hub.published for name in players), 15)
+    print(f"Both backends publishing after {time.time() - started:.1f}s" if ready is not None
+          else "Backends did not start")
+    time.sleep(2.0)
+
+    def publishing_again(name, since):
+        return lambda: hub.published.get(name, 0) > since and supervisor.get_stats()[name]["state"] == "running"
+
+    for name, fault in (("fake-a", "crash"), ("fake-b", "freeze")):
+        old_pid = supervisor.get_stats()[name]["pid"]
+        injected = time.time()
+        supervisor.inject_fault(name, fault)
+        noticed = wait_until(lambda: supervisor.get_stats()[name]["pid"] != old_pid, HEARTBEAT_TIMEOUT + 10)
+        recovered = wait_until(publishing_again(name, injected), 15)
+        if noticed is None or recovered is None:
+            print(f"{name} {fault}: NOT recovered")
+        else:
+            print(f"{name} {fault}: noticed after {noticed:.1f}s, "
+                  f"publishing again after {time.time() - injected:.1f}s "
+                  f"(pid {old_pid} -> {supervisor.get_stats()[name]['pid']})")
+
+    for player in players.values():
+        player.stop_monitoring()
+    stats = supervisor.get_stats()
+    supervisor.shutdown()
+
+    print()
+    for name, worker_stats in stats.items():
+        print(f"  {name}: {worker_stats['spawns']} spawns, {worker_stats['restarts']} restarts "
+              f"({worker_stats['crashes']} crashed, {worker_stats['stalls']} stalled), "
+              f"{worker_stats['deltas']} deltas, {worker_stats['heartbeats']} heartbeats")
+    get_runtime().stop()
+
+
+if __name__ == "__main__":
+    main()
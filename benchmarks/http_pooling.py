@@ -0,0 +1,105 @@
+"""
+Benchmark: artwork lookup latency with and without pooled HTTP sessions
+
+Runs a local stand-in for the Last.fm API and image CDN, then times
+"lookups" (one API call + one image download) using one-shot
+requests.get calls versus the shared pooled HttpClient.
+
+Usage: python benchmarks/http_pooling.py [--lookups N] [--connect-delay MS]
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import requests
+from utils.http_client import HttpClient
+
+IMAGE_BYTES = os.urandom(64 * 1024)
+
+
+class StandInHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive
+    disable_nagle_algorithm = True
+    connect_delay = 0.0
+
+    def setup(self):
+        # Simulate DNS + TCP/TLS handshake cost on every new connection
+        if self.connect_delay:
+            time.sleep(self.connect_delay)
+        super().setup()
+
+    def do_GET(self):
+        if self.path.startswith("/2.0/"):
+            port = self.server.server_address[1]
+            body = json.dumps({"album": {"image": [
+                {"#text": f"http://127.0.0.1:{port}/img/cover.png", "size": "extralarge"}
+            ]}}).encode()
+            content_type = "application/json"
+        else:
+            body = IMAGE_BYTES
+            content_type = "image/png"
+
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def lookup(get, base_url):
+    """One artwork lookup: API call then image download"""
+    response = get(f"{base_url}/2.0/", params={"method": "album.getinfo", "format": "json"})
+    image_url = response.json()["album"]["image"][-1]["#text"]
+    image = get(image_url)
+    assert len(image.content) == len(IMAGE_BYTES)
+
+
+def run(label, get, base_url, lookups):
+    lookup(get, base_url)  # warm-up
+    samples = []
+    for _ in range(lookups):
+        start = time.perf_counter()
+        lookup(get, base_url)
+        samples.append((time.perf_counter() - start) * 1000)
+    samples.sort()
+    p95 = samples[int(len(samples) * 0.95) - 1]
+    print(f"{label:<12} mean {statistics.mean(samples):7.2f} ms   "
+          f"p50 {statistics.median(samples):7.2f} ms   p95 {p95:7.2f} ms")
+    return statistics.mean(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--lookups", type=int, default=200)
+    parser.add_argument("--connect-delay", type=float, default=20.0,
+                        help="simulated per-connection setup cost in ms")
+    args = parser.parse_args()
+
+    StandInHandler.connect_delay = args.connect_delay / 1000.0
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StandInHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base_url = f"http://127.0.0.1:{server.server_address[1]}"
+
+    print(f"{args.lookups} lookups, simulated connection setup {args.connect_delay:.0f} ms")
+    unpooled = run("unpooled", lambda url, **kw: requests.get(url, timeout=5, **kw), base_url, args.lookups)
+
+    client = HttpClient()
+    pooled = run("pooled", client.get, base_url, args.lookups)
+    client.close()
+
+    print(f"speedup      {unpooled / pooled:.1f}x")
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+"""
+Benchmark: watchdog recovery from hung COM and WinRT calls
+
+Runs the iTunes and Apple Music backends against their fakes (no Windows
+needed), makes one COM property read, one media properties await and one
+blocking playback info read hang, and reports how long each backend took to
+come back, how long the event loop stayed unresponsive, which call sites the
+watchdog recorded and the latency percentiles per call site. The hung reads
+are released at the end to check that the abandoned runs exit quietly.
+
+Usage: python benchmarks/hung_calls.py
+"""
+import asyncio
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.runtime import get_runtime
+from players.apple_music import AppleMusicPlayer
+from players.itunes import iTunesPlayer
+from testing.fakes import FakeEventSource, FakeiTunes, FakeSession, FakeSessionManager
+
+
+class _Sink:
+    """Accepts any manager call"""
+
+    def __getattr__(self, name):
+        return lambda *args, **kwargs: None
+
+    async def read_apple_music_artwork(self, session):
+        return None
+
+
+def wait_until(condition, timeout):
+    started = time.time()
+    while not condition():
+        if time.time() - started > timeout:
+            return None
+        time.sleep(0.05)
+    return time.time() - started
+
+
+def main():
+    runtime = get_runtime()
+    budget = runtime.budget
+
+    itunes_app = FakeiTunes()
+    itunes_app.set_playing("Karma Police", "Radiohead", "OK Computer", 264)
+    itunes = iTunesPlayer(_Sink(), _Sink(), _Sink(), event_source=FakeEventSource(),
+                          itunes_factory=lambda: itunes_app)
+    manager = FakeSessionManager()
+    apple_music = AppleMusicPlayer(_Sink(), _Sink(), _Sink(), session_manager=manager)
+    for player in (itunes, apple_music):
+        player.event_hub = _Sink()
+        player.start_monitoring()
+    session = FakeSession()
+    manager.add_session(session)
+    session.play("Paranoid Android", "Radiohead", "OK Computer", 386)
+    time.sleep(1.5)
+
+    # A COM read that never returns on its own
+    first_apartment = itunes.apartment
+    itunes_app.hang("PlayerPosition")
+    recovered = wait_until(lambda: itunes.apartment is not first_apartment
+                           and itunes.last_known_state == "playing", 15)
+    print(f"iTunes: {'recovered after %.1fs' % recovered if recovered else 'NOT recovered'} "
+          f"on a new apartment")
+
+    # A WinRT await that never completes
+    restarts = budget.stats["restarts"]
+    session.hang_media_properties = True
+    session.play("Lucky", "Radiohead", "OK Computer", 259)
+    recovered = wait_until(lambda: budget.stats["restarts"] > restarts and apple_music.current_track_id, 15)
+    print(f"Apple Music: {'recovered after %.1fs' % recovered if recovered else 'NOT recovered'}")
+
+    # A blocking WinRT call that never returns - it must not take the loop down with it
+    restarts = budget.stats["restarts"]
+    session.hang_playback_info = True
+    session.play("Exit Music", "Radiohead", "OK Computer", 267)
+    time.sleep(0.5)
+    started = time.time()
+    asyncio.run_coroutine_threadsafe(asyncio.sleep(0), runtime.loop).result(15)
+    stalled = time.time() - started
+    recovered = wait_until(lambda: budget.stats["restarts"] > restarts and apple_music.current_track_id, 15)
+    print(f"Apple Music (blocking call): {'recovered after %.1fs' % recovered if recovered else 'NOT recovered'}, "
+          f"loop answered in {stalled * 1000:.1f} ms")
+
+    # Let the abandoned iTunes run finish its call - it must not touch the new run's state
+    itunes_app.release()
+    session.release()
+    time.sleep(0.5)
+    print(f"iTunes after release: state {itunes.last_known_state}, object kept: {itunes.itunes is not None}")
+
+    for player in (itunes, apple_music):
+        player.stop_monitoring()
+
+    stats = budget.get_stats()
+    print(f"\n{stats['hangs']} hangs, {stats['restarts']} restarts, {stats['checks']} watchdog checks")
+    for hang in stats["recent_hangs"]:
+        print(f"  hung: {hang['backend']} {hang['site']} on {hang['thread']}")
+    for site, site_stats in sorted(stats["sites"].items()):
+        print(f"  {site:<34} {site_stats['calls']:5d} calls  p50 {site_stats['p50_ms']:8.2f}  "
+              f"p99 {site_stats['p99_ms']:8.2f}  max {site_stats['max_ms']:8.1f} ms")
+    runtime.stop()
+
+
+if __name__ == "__main__":
+    main()
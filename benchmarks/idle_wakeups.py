@@ -0,0 +1,96 @@
+"""
+Benchmark: timer wakeups while idle and while playing
+
+Runs the Apple Music and iTunes backends side by side against their fakes
+(no Windows needed) with the console status heartbeat registered, and
+reports the shared timer service's wakeups per phase. Idle phases should
+show zero wakeups; while playing, both backends' progress timers should
+share wakeups rather than each waking the process.
+
+Usage: python benchmarks/idle_wakeups.py [--phase SECONDS]
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.runtime import get_runtime
+from players.apple_music import AppleMusicPlayer
+from players.base_player import PlayerState
+from players.gsmtc import PlaybackStatus
+from players.itunes import iTunesPlayer
+from testing.fakes import FakeEventSource, FakeiTunes, FakeSession, FakeSessionManager
+
+
+class _Sink:
+    """Accepts any manager call; the benchmark only counts wakeups"""
+
+    def __getattr__(self, name):
+        return lambda *args, **kwargs: None
+
+    async def read_apple_music_artwork(self, session):
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--phase", type=float, default=5.0, help="seconds per scenario phase")
+    args = parser.parse_args()
+
+    runtime = get_runtime()
+    timers = runtime.timers
+    heartbeat = runtime.call_every(30, lambda: None, name="status", deferrable=True)
+
+    manager = FakeSessionManager()
+    apple_music = AppleMusicPlayer(_Sink(), _Sink(), _Sink(), session_manager=manager)
+    itunes_app = FakeiTunes()
+    itunes_events = FakeEventSource()
+    itunes = iTunesPlayer(_Sink(), _Sink(), _Sink(), event_source=itunes_events,
+                          itunes_factory=lambda: itunes_app)
+    for player in (apple_music, itunes):
+        player.event_hub = _Sink()
+        player.start_monitoring()
+
+    session = FakeSession()
+    manager.add_session(session)
+    time.sleep(0.5)  # let both backends settle before measuring
+
+    results = []
+
+    def phase(label):
+        before = timers.stats["wakeups"]
+        merged = timers.stats["merged"]
+        started = time.time()
+        time.sleep(args.phase)
+        wakeups = timers.stats["wakeups"] - before
+        results.append((label, wakeups, wakeups * 60 / (time.time() - started),
+                        timers.stats["merged"] - merged))
+
+    phase("idle")
+
+    session.play("Paranoid Android", "Radiohead", "OK Computer", 386)
+    track = itunes_app.set_playing("Karma Police", "Radiohead", "OK Computer", 264)
+    itunes_events.fire_play(track)
+    phase("playing")
+
+    session.set_status(PlaybackStatus.PAUSED)
+    itunes_app.set_state(PlayerState.PAUSED)
+    itunes_events.fire_stop(track)
+    time.sleep(1.0)  # iTunes stop grace
+    phase("paused")
+
+    for player in (apple_music, itunes):
+        player.stop_monitoring()
+    heartbeat.cancel()
+
+    for label, wakeups, rate, merged in results:
+        print(f"  {label:<8} {wakeups:5d} wakeups  {rate:7.1f}/min  {merged:4d} merged")
+    stats = timers.get_stats()
+    print(f"  fired by timer: {stats['by_name']}")
+    runtime.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""
+Benchmark: iTunes COM calls, polling vs event-driven monitoring
+
+Drives iTunesPlayer against FakeiTunes/FakeEventSource (no Windows needed)
+through the same scenario in both modes - idle, playing, a track change,
+paused - and counts the cross-process property reads each phase costs,
+next to the player's own per-tick COM counters. In event mode iTunes then
+quits and starts again, and the time until monitoring is back is reported.
+
+Usage: python benchmarks/itunes_monitoring.py [--phase SECONDS]
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from players.base_player import PlayerState
+from players.itunes import iTunesPlayer
+from testing.fakes import FakeEventSource, FakeiTunes
+
+
+class _Sink:
+    """Accepts any manager call; the benchmark only counts COM reads"""
+
+    def __getattr__(self, name):
+        return lambda *args, **kwargs: None
+
+
+def run(mode, phase_seconds):
+    itunes = FakeiTunes()
+    events = FakeEventSource(available=(mode == "events"))
+    process = {"running": True}
+    player = iTunesPlayer(_Sink(), _Sink(), _Sink(), event_source=events, itunes_factory=lambda: itunes,
+                          process_check=lambda: process["running"])
+    player.event_hub = _Sink()
+
+    results = []
+
+    def phase(label):
+        before = itunes.com_calls
+        started = time.time()
+        time.sleep(phase_seconds)
+        calls = itunes.com_calls - before
+        results.append((label, calls, calls / (time.time() - started)))
+
+    player.start_monitoring()
+    phase("idle")
+
+    track = itunes.set_playing("Paranoid Android", "Radiohead", "OK Computer", 386)
+    events.fire_play(track)
+    phase("playing")
+
+    events.fire_stop(track)
+    track = itunes.set_playing("Karma Police", "Radiohead", "OK Computer", 264)
+    events.fire_play(track)
+    phase("track change")
+
+    itunes.set_state(PlayerState.PAUSED)
+    events.fire_stop(track)
+    phase("paused")
+
+    relaunch = None
+    if mode == "events":
+        process["running"] = False
+        events.fire_quitting()
+        time.sleep(0.5)
+        process["running"] = True
+        itunes.set_state(PlayerState.PLAYING)
+        started = time.time()
+        while player.last_known_state != "playing" and time.time() - started < 30:
+            time.sleep(0.05)
+        relaunch = time.time() - started if player.last_known_state == "playing" else None
+
+    player.stop_monitoring()
+    stats = player.get_com_stats()
+    print(f"{mode} (active mode: {stats['monitor_mode']})")
+    for label, calls, rate in results:
+        print(f"  {label:<13} {calls:5d} COM calls  {rate:6.2f}/s")
+    print(f"  {stats['ticks']} ticks, {stats['calls_per_tick']:.2f} COM calls/tick, "
+          f"track cache {stats['track_cache_hits']} hits / {stats['track_cache_misses']} misses")
+    if mode == "events":
+        print(f"  quit and restart: {'monitoring again after %.1fs' % relaunch if relaunch else 'NOT resumed'}")
+    return sum(calls for _, calls, _ in results)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--phase", type=float, default=5.0, help="seconds per scenario phase")
+    args = parser.parse_args()
+
+    polling = run("polling", args.phase)
+    events = run("events", args.phase)
+    print(f"total: polling {polling} calls, events {events} calls")
+
+
+if __name__ == "__main__":
+    main()
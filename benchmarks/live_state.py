@@ -0,0 +1,105 @@
+"""
+Benchmark: memory-mapped live state vs the rename-based progress file
+
+Writer: in-place seqlock updates vs temp file + os.replace per update.
+Reader: lock-free mmap snapshot vs open + json.load of the renamed file,
+measured while a writer thread updates continuously; torn or failed reads
+are counted for both.
+
+Usage: python benchmarks/live_state.py [--seconds S]
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.live_state import LiveStateWriter, LiveStateReader
+
+
+def payload(index):
+    return json.dumps({"title": "Track", "artist": "Artist", "album": "Album",
+                       "position_seconds": index, "check": index}, indent=2).encode("utf-8")
+
+
+def rename_write(path, data):
+    temp_path = path + ".tmp"
+    with open(temp_path, "wb") as f:
+        f.write(data)
+    os.replace(temp_path, path)
+
+
+def rename_read(path):
+    with open(path, "rb") as f:
+        return json.loads(f.read())
+
+
+def run_for(seconds, fn):
+    count = 0
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        fn(count)
+        count += 1
+    return count / seconds
+
+
+def measure_reads(seconds, write, read):
+    """Readers/sec while a writer thread updates as fast as it can"""
+    stop = threading.Event()
+
+    def writer():
+        index = 0
+        while not stop.is_set():
+            write(payload(index))
+            index += 1
+
+    thread = threading.Thread(target=writer, daemon=True)
+    thread.start()
+    reads = failures = 0
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        try:
+            data = read()
+            if data.get("check") != data.get("position_seconds"):
+                failures += 1
+        except (OSError, ValueError):
+            failures += 1
+        reads += 1
+    stop.set()
+    thread.join()
+    return reads / seconds, failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--seconds", type=float, default=2.0)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as scratch:
+        json_path = os.path.join(scratch, "track_progress.json")
+        state_path = os.path.join(scratch, "anp_state.bin")
+        rename_write(json_path, payload(0))
+        live_writer = LiveStateWriter(state_path)
+        live_writer.write(payload(0))
+        live_reader = LiveStateReader(state_path)
+
+        rename_rate = run_for(args.seconds, lambda i: rename_write(json_path, payload(i)))
+        mmap_rate = run_for(args.seconds, lambda i: live_writer.write(payload(i)))
+        print(f"writer  rename {rename_rate:12,.0f} updates/s   mmap {mmap_rate:12,.0f} updates/s")
+
+        rename_reads, rename_failures = measure_reads(
+            args.seconds, lambda data: rename_write(json_path, data), lambda: rename_read(json_path))
+        mmap_reads, mmap_failures = measure_reads(args.seconds, live_writer.write, live_reader.read)
+        print(f"reader  rename {rename_reads:12,.0f} reads/s ({rename_failures} failed)   "
+              f"mmap {mmap_reads:12,.0f} reads/s ({mmap_failures} failed, {live_reader.retries} retries)")
+
+        live_reader.close()
+        live_writer.close()
+
+
+if __name__ == "__main__":
+    main()
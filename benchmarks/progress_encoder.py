@@ -0,0 +1,94 @@
+"""
+Micro-benchmark: per-tick progress serialization, dict + json.dumps vs ProgressEncoder
+
+Measures CPU time per tick and the memory allocated per tick (tracemalloc
+peak between resets) for the original create_progress_data + json.dumps
+path and the incremental ProgressEncoder. Both produce identical bytes.
+
+Usage: python benchmarks/progress_encoder.py [--ticks N]
+"""
+import argparse
+import json
+import os
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.progress_encoder import ProgressEncoder, ProgressSnapshot
+from utils.time_utils import format_time
+
+TITLE, ARTIST, ALBUM, PLAYER = "Paranoid Android", "Radiohead", "OK Computer", "Apple Music"
+DURATION = 386.0
+
+
+def dict_path(position):
+    """The original per-tick path from ProgressTracker"""
+    data = {
+        "title": TITLE,
+        "artist": ARTIST,
+        "album": ALBUM,
+        "position_seconds": position,
+        "duration_seconds": DURATION,
+        "position_formatted": format_time(position),
+        "duration_formatted": format_time(DURATION),
+        "progress_percentage": (position / DURATION * 100) if DURATION > 0 else 0,
+        "is_playing": True,
+        "player": PLAYER,
+    }
+    data["timestamp"] = datetime.utcnow().strftime("%Y-%m-%d %H:%M:%S")
+    data["timestamp_unix"] = time.time()
+    return json.dumps(data, indent=2).encode("utf-8")
+
+
+def make_encoder_path():
+    encoder = ProgressEncoder()
+    snapshot = ProgressSnapshot()
+    snapshot.title, snapshot.artist, snapshot.album, snapshot.player = TITLE, ARTIST, ALBUM, PLAYER
+    snapshot.duration_seconds = DURATION
+    snapshot.is_playing = True
+
+    def encoder_path(position):
+        snapshot.position_seconds = position
+        return encoder.encode(snapshot)
+    return encoder_path
+
+
+def measure(label, tick, ticks):
+    # CPU time
+    start = time.process_time()
+    for i in range(ticks):
+        tick(i * 0.997)
+    cpu_us = (time.process_time() - start) / ticks * 1e6
+
+    # Allocations per tick
+    sample = min(ticks, 5000)
+    tracemalloc.start()
+    peak_total = 0
+    for i in range(sample):
+        tracemalloc.reset_peak()
+        before = tracemalloc.get_traced_memory()[0]
+        tick(i * 0.997)
+        peak_total += tracemalloc.get_traced_memory()[1] - before
+    tracemalloc.stop()
+
+    print(f"{label:<10} {cpu_us:7.2f} us/tick CPU   {peak_total / sample:8.0f} B/tick allocated (peak)")
+    return cpu_us
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--ticks", type=int, default=100000)
+    args = parser.parse_args()
+
+    encoder_path = make_encoder_path()
+    print(f"{args.ticks} ticks")
+    baseline = measure("dict+json", dict_path, args.ticks)
+    encoded = measure("encoder", encoder_path, args.ticks)
+    print(f"speedup    {baseline / encoded:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""
+Benchmark: snapshot publish latency for each durability mode
+
+Publishes a full track generation (nowplaying.txt, a cover image and
+track_progress.json) repeatedly into a scratch directory and reports the
+latency of SnapshotPublisher.publish for "none", "file" and "directory".
+
+Usage: python benchmarks/snapshot_publish.py [--generations N] [--dir PATH]
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.snapshot_publisher import SnapshotPublisher, DURABILITY_MODES
+
+
+def make_generation(index, output_dir, artwork):
+    text_path = os.path.join(output_dir, "nowplaying.txt")
+    artwork_path = os.path.join(output_dir, "anp_cover.png")
+    progress_path = os.path.join(output_dir, "track_progress.json")
+    progress = json.dumps({"title": f"Track {index}", "position_seconds": index}, indent=2)
+    return {
+        text_path: f"Artist\nTrack {index}\nAlbum".encode("utf-8"),
+        artwork_path: artwork,
+        progress_path: progress.encode("utf-8"),
+    }, (artwork_path, progress_path, text_path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--generations", type=int, default=200)
+    parser.add_argument("--artwork-kb", type=int, default=300)
+    parser.add_argument("--dir", default=None, help="output directory (default: a temp dir)")
+    args = parser.parse_args()
+
+    artwork = os.urandom(args.artwork_kb * 1024)
+    print(f"{args.generations} generations, 3 files each ({args.artwork_kb} KB cover)")
+
+    for mode in DURABILITY_MODES:
+        with tempfile.TemporaryDirectory(dir=args.dir) as output_dir:
+            _, order = make_generation(0, output_dir, artwork)
+            publisher = SnapshotPublisher(
+                durability=mode,
+                manifest_file=os.path.join(output_dir, "anp_snapshot.json"),
+                publish_order=order,
+                manifest_targets=(order[0], order[2]),
+            )
+
+            samples = []
+            for index in range(args.generations):
+                files, _ = make_generation(index, output_dir, artwork)
+                start = time.perf_counter()
+                results = publisher.publish(files)
+                samples.append((time.perf_counter() - start) * 1000)
+                assert all(results.values())
+
+            samples.sort()
+            p95 = samples[int(len(samples) * 0.95) - 1]
+            print(f"{mode:<10} mean {statistics.mean(samples):7.2f} ms   "
+                  f"p50 {statistics.median(samples):7.2f} ms   p95 {p95:7.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
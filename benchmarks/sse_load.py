@@ -0,0 +1,126 @@
+"""
+Load test: Server-Sent Events fan-out to many overlay clients
+
+Starts an EventServer on a free port, connects N streaming clients plus one
+client that never reads, publishes progress events from a worker thread and
+reports delivery and publish-to-receive latency. The stalled client must not
+delay the others; afterwards a burst of large events shows that it is
+dropped once its socket and bounded queue are full.
+
+Usage: python benchmarks/sse_load.py [--clients N] [--events N] [--rate HZ]
+"""
+import argparse
+import asyncio
+import json
+import os
+import socket
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.event_server import EventHub, EventServer, EVENT_PROGRESS
+
+
+async def stream_client(port, expected, latencies, ready):
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    writer.write(b"GET /events HTTP/1.1\r\nHost: localhost\r\n\r\n")
+    await writer.drain()
+    await reader.readuntil(b"\r\n\r\n")
+    ready.release()
+    received = 0
+    try:
+        while received < expected:
+            frame = await reader.readuntil(b"\n\n")
+            received_at = time.perf_counter()
+            lines = frame.decode("utf-8").splitlines()
+            if lines[0] != f"event: {EVENT_PROGRESS}":
+                continue
+            data = json.loads(lines[1][len("data: "):])
+            latencies.append(received_at - data["sent"])
+            received += 1
+    except (asyncio.IncompleteReadError, ConnectionError):
+        pass
+    finally:
+        writer.close()
+    return received
+
+
+async def stalled_client(port, ready):
+    """Connects with a tiny receive window and then never reads"""
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, 4096)
+    sock.connect(("127.0.0.1", port))
+    reader, writer = await asyncio.open_connection(sock=sock, limit=1024)
+    writer.transport.pause_reading()
+    writer.write(b"GET /events HTTP/1.1\r\nHost: localhost\r\n\r\n")
+    await writer.drain()
+    ready.release()
+    return writer
+
+
+def publish(hub, events, rate, padding):
+    interval = 1.0 / rate if rate else 0
+    for index in range(events):
+        hub.publish(EVENT_PROGRESS, {"index": index, "padding": padding,
+                                     "sent": time.perf_counter()})
+        if interval:
+            time.sleep(interval)
+
+
+async def run(args):
+    hub = EventHub()
+    server = EventServer(hub, port=0, client_buffer=args.buffer)
+    if not server.start():
+        raise SystemExit("Event server failed to start")
+
+    ready = asyncio.Semaphore(0)
+    latencies = []
+    clients = [asyncio.create_task(stream_client(server.port, args.events, latencies, ready))
+               for _ in range(args.clients)]
+    stalled = await stalled_client(server.port, ready)
+    for _ in range(args.clients + 1):
+        await asyncio.wait_for(ready.acquire(), 10)
+    while server.get_stats()["clients"] < args.clients + 1:
+        await asyncio.sleep(0.01)
+
+    started = time.perf_counter()
+    publisher = threading.Thread(target=publish, args=(hub, args.events, args.rate, "x" * args.padding))
+    publisher.start()
+    received = await asyncio.wait_for(asyncio.gather(*clients), args.events / max(args.rate, 1) + 30)
+    elapsed = time.perf_counter() - started
+    publisher.join()
+
+    # The streams are done; keep publishing until the stalled client overflows
+    burst = 0
+    while server.get_stats()["clients_dropped"] == 0 and burst < 10000:
+        hub.publish(EVENT_PROGRESS, {"index": burst, "padding": "x" * 16384, "sent": 0})
+        burst += 1
+        await asyncio.sleep(0.001)
+    stalled.close()
+    stats = server.get_stats()
+    server.stop()
+
+    latencies.sort()
+    total = args.clients * args.events
+    p50 = latencies[len(latencies) // 2] * 1000 if latencies else 0
+    p99 = latencies[int(len(latencies) * 0.99)] * 1000 if latencies else 0
+    print(f"{args.clients} clients, {args.events} events at {args.rate} Hz in {elapsed:.2f}s")
+    print(f"delivered {sum(received)}/{total}   p50 {p50:.2f} ms   p99 {p99:.2f} ms")
+    print(f"server: {stats['events_sent']} frames sent, {stats['clients_dropped']} client(s) dropped")
+    print(f"stalled client dropped after {burst} extra 16 KB events")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--clients", type=int, default=300)
+    parser.add_argument("--events", type=int, default=200)
+    parser.add_argument("--rate", type=float, default=50.0)
+    parser.add_argument("--buffer", type=int, default=64)
+    parser.add_argument("--padding", type=int, default=256, help="bytes of padding per event")
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+"""
+Benchmark: track change to files on disk
+
+Drives a FakePlayer through a series of track changes with the real
+write-behind writer, progress tracker and artwork pipeline writing into a
+scratch directory, then prints the per-stage latency percentiles the
+TrackLatencyTracker collected and writes its JSON report. Even tracks carry
+player artwork; odd tracks go through the fallback chain (Last.fm is stubbed
+out, so they end with the default cover).
+
+Usage: python benchmarks/track_latency.py [--changes N] [--interval SECONDS]
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.artwork_cache import ArtworkCache
+from core.artwork_manager import ArtworkManager
+from core.file_manager import FileManager
+from core.io_writer import WriteBehindWriter
+from core.progress_tracker import ProgressTracker
+from core.runtime import get_runtime
+from core.snapshot_publisher import SnapshotPublisher
+from core.track_latency import TrackLatencyTracker, STAGES
+from testing.fakes import FakePlayer
+
+
+class _NoLastFm:
+    """Last.fm stand-in that never finds anything"""
+
+    def get_album_artwork_url(self, artist, album):
+        return None
+
+    def get_track_artwork_url(self, artist, title):
+        return None
+
+
+class _Sink:
+    """Accepts any event hub call"""
+
+    def __getattr__(self, name):
+        return lambda *args, **kwargs: None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--changes", type=int, default=100)
+    parser.add_argument("--interval", type=float, default=0.05, help="seconds between track changes")
+    args = parser.parse_args()
+
+    output_dir = tempfile.mkdtemp(prefix="anp-latency-")
+    text_file = os.path.join(output_dir, "nowplaying.txt")
+    artwork_file = os.path.join(output_dir, "anp_cover.png")
+    progress_file = os.path.join(output_dir, "track_progress.json")
+
+    tracker = TrackLatencyTracker(text_file, artwork_file, progress_file)
+    writer = WriteBehindWriter(SnapshotPublisher(manifest_file=None,
+                                                 publish_order=(artwork_file, progress_file, text_file)),
+                               latency=tracker)
+    file_manager = FileManager(writer)
+    file_manager.output_file, file_manager.artwork_file = text_file, artwork_file
+    file_manager.default_artwork = os.path.join(output_dir, "default.bmp")
+    with open(file_manager.default_artwork, "wb") as f:
+        f.write(os.urandom(50 * 1024))
+    progress_tracker = ProgressTracker(writer=writer, live_state=False)
+    progress_tracker.progress_file = progress_file
+    artwork_manager = ArtworkManager(file_manager)
+    artwork_manager.lastfm_client = _NoLastFm()
+    artwork_manager.artwork_cache = ArtworkCache(cache_dir=os.path.join(output_dir, "cache"))
+    artwork_manager.pipeline.latency = tracker
+
+    player = FakePlayer("Fake", file_manager, progress_tracker, artwork_manager)
+    player.latency = tracker
+    player.event_hub = _Sink()
+    player.start_monitoring()
+
+    cover = os.urandom(200 * 1024)
+    for index in range(args.changes):
+        title, artist, album = f"Track {index}", "Artist", f"Album {index}"
+        detected_at = time.perf_counter()
+        generation = player.begin_artwork()
+        player.update_track_info(title, artist, album, detected_at)
+        player.submit_artwork(generation, artist, album, title, cover if index % 2 == 0 else None)
+        player.update_progress(title, artist, album, 0, 240, True)
+        time.sleep(args.interval)
+    file_manager.flush()
+
+    stats = tracker.get_stats()
+    print(f"\n{stats['changes']} changes: {stats['completed']} complete, {stats['superseded']} superseded")
+    groups = list(stats["backends"].items())
+    groups += [(f"artwork: {source}", stages) for source, stages in stats["artwork_sources"].items()]
+    for group, stages in groups:
+        print(f"  {group}")
+        for stage in STAGES:
+            hist = stages.get(stage)
+            if hist:
+                print(f"    {stage:<17} {hist['count']:5d}  p50 {hist['p50_ms']:7.2f}  p95 {hist['p95_ms']:7.2f}  "
+                      f"p99 {hist['p99_ms']:7.2f}  max {hist['max_ms']:7.2f} ms")
+    print(f"\nReport: {tracker.dump(os.path.join(output_dir, 'track_latency.json'))}")
+    player.stop_monitoring()
+    writer.stop()
+    get_runtime().stop()
+
+
+if __name__ == "__main__":
+    main()
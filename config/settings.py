@@ -21,6 +21,66 @@ print(f"PROGRESS_FILE: {os.path.abspath(PROGRESS_FILE)}")
 print(f"DEFAULT_ARTWORK: {DEFAULT_ARTWORK}")
 print("========================")
 
+# Artwork cache
+ARTWORK_CACHE_DIR = os.path.abspath("cache/artwork")
+ARTWORK_CACHE_MAX_ENTRIES = 500
+ARTWORK_CACHE_MAX_BYTES = 200 * 1024 * 1024  # 200 MB
+ARTWORK_CACHE_INDEX_SAVE_INTERVAL = 60.0  # seconds - max rate of index writes for recency changes from cache hits
+
+# Write-behind I/O
+IO_WRITER_FLUSH_TIMEOUT = 5.0  # seconds to wait for queued writes on shutdown
+
+# Snapshot publishing
+SNAPSHOT_DURABILITY = "none"  # "none", "file" (fsync files) or "directory" (fsync files + directory)
+SNAPSHOT_MANIFEST_FILE = "../NPlaying/anp_snapshot.json"  # hashes of the last generation, for readers that verify consistency (None = no manifest)
+SNAPSHOT_PLACEHOLDER_ARTWORK = False  # True: show the default cover with a new album's text until its cover resolves
+
+# Progress publishing
+PROGRESS_MODE = "interval"  # "interval" rewrites every tick, "anchor" only on state changes
+PROGRESS_DRIFT_THRESHOLD = 1.5  # seconds of drift from the anchor that count as a seek
+
+# Memory-mapped live state (in-place updates for high-frequency local readers)
+LIVE_STATE_ENABLED = False
+LIVE_STATE_FILE = "../NPlaying/anp_state.bin"
+LIVE_STATE_CAPACITY = 16384  # bytes reserved for the JSON payload
+
+# Local event server (Server-Sent Events for browser overlays)
+EVENT_SERVER_ENABLED = False
+EVENT_SERVER_HOST = "127.0.0.1"
+EVENT_SERVER_PORT = 8975
+EVENT_SERVER_CLIENT_BUFFER = 64  # queued events per client before it is dropped as too slow
+EVENT_SERVER_KEEPALIVE = 15.0  # seconds between keep-alive comments on idle streams
+
+# Shared runtime
+RUNTIME_EXECUTOR_WORKERS = 4  # threads for blocking work: artwork lookups, image resizing (output files have their own writer thread)
+
+# Timer service - timers may fire late by a fraction of their delay so nearby deadlines share a wakeup
+TIMER_SLACK_RATIO = 0.1  # allowed lateness as a fraction of the delay
+TIMER_SLACK_MAX = 0.25  # seconds - upper bound on the allowed lateness
+
+# Call deadlines - an external call still running past its deadline counts as hung
+CALL_DEADLINE_COM = 5.0  # seconds for one iTunes COM call
+CALL_DEADLINE_WINRT = 5.0  # seconds for one GSMTC call or await
+CALL_DEADLINE_HTTP = 45.0  # seconds for one HTTP GET including retries (above the client's own timeouts)
+CALL_DEADLINE_DISK = 10.0  # seconds for one snapshot publish
+CALL_LATENCY_SAMPLES = 500  # recent latencies kept per call site for percentiles
+WATCHDOG_RESTART_BACKOFF = (5.0, 300.0)  # (first, max) seconds between restarts of a backend that keeps hanging
+
+# Last.fm lookup cache
+LASTFM_CACHE_TTL = 7 * 24 * 3600  # seconds to remember found artwork URLs
+LASTFM_NEGATIVE_CACHE_TTL = 6 * 3600  # seconds to remember "no artwork" answers
+LASTFM_CACHE_FILE = os.path.abspath("cache/lastfm_lookups.json")  # None = memory only
+LASTFM_CACHE_SAVE_INTERVAL = 60.0  # seconds - max rate of lookup cache file writes
+
+# HTTP client (shared connection pools for Last.fm and artwork downloads)
+HTTP_POOL_CONNECTIONS = 4  # number of per-host pools kept alive
+HTTP_POOL_MAXSIZE = 4  # connections kept per host
+HTTP_MAX_RETRIES = 2
+HTTP_RETRY_BACKOFF = 0.3  # seconds, doubled per retry
+HTTP_CONNECT_TIMEOUT = 3.05  # seconds
+LASTFM_READ_TIMEOUT = 5.0  # seconds
+ARTWORK_READ_TIMEOUT = 15.0  # seconds
+
 # Icons
 ICON_DEFAULT = "media/npdf.ico"
 ICON_APPLE = "media/npam.ico"
@@ -28,8 +88,29 @@ ICON_ITUNES = "media/npit.ico"
 
 # Timing
 PROGRESS_UPDATE_INTERVAL = 1.0  # seconds
-APPLE_MUSIC_POLLING_INTERVAL = 2.0  # seconds
-ITUNES_POLLING_INTERVAL = 1.0  # seconds
+
+# iTunes monitoring
+ITUNES_MONITOR_MODE = "events"  # "events" (COM events, position polled only while playing) or "polling"
+ITUNES_EVENT_RESYNC_INTERVAL = 30.0  # minimum seconds between full status checks in case an event was missed (done on other wakeups only)
+ITUNES_STOP_GRACE = 0.5  # seconds to wait for a play event after a stop event before clearing
+ITUNES_TRACK_CACHE_TTL = 30.0  # seconds before cached track metadata is read again
+
+# Adaptive polling - (min, max) seconds between polls per playback state
+POLL_INTERVAL_BOUNDS = {
+    "playing": (0.15, 5.0),  # max while mid-track (capped by PROGRESS_UPDATE_INTERVAL in interval mode), min near the track end
+    "paused": (1.0, 4.0),  # polling backends notice a resume at most this late
+    "stopped": (1.0, 8.0),
+    "absent": (5.0, 60.0),  # player closed or unreachable
+}
+POLL_BACKOFF_FACTOR = 2.0  # growth per unchanged poll while paused, stopped or absent
+POLL_TRACK_END_LEAD = 1.0  # seconds before the predicted track end to start fast polling
+POLL_TRACK_END_GRACE = 3.0  # seconds after the predicted track end to keep fast polling
+
+# Apple Music event coalescing - seconds of quiet before a burst of GSMTC events is handled
+GSMTC_DEBOUNCE_SESSIONS = 0.2
+GSMTC_DEBOUNCE_MEDIA = 0.05
+GSMTC_DEBOUNCE_PLAYBACK = 0.05
+GSMTC_DEBOUNCE_MAX_DELAY = 0.25  # a continuous storm is still handled at least this often
 
 # Application info
 APP_NAME = "ANP Tray App"
@@ -43,4 +124,30 @@ APP_DESCRIPTION = ("Displays info from Apple Music or iTunes\n"
 
 # Player types
 PLAYER_APPLE_MUSIC = "Apple Music"
-PLAYER_ITUNES = "iTunes"
\ No newline at end of file
+PLAYER_ITUNES = "iTunes"
+
+# Player monitoring
+PLAYER_MONITOR_MODE = "single"  # "single" (one player, switched from the menu) or "concurrent" (all available players)
+PLAYER_PRIORITY = [PLAYER_APPLE_MUSIC, PLAYER_ITUNES]  # concurrent mode: preferred owner of the outputs first
+PLAYER_ARBITRATION = "recent"  # concurrent mode: "recent" (last player to start playing wins) or "priority"
+PLAYER_AVAILABILITY_TTL = 5.0  # seconds an availability check is reused
+PLAYER_REPROBE_INTERVAL = 15.0  # concurrent mode: seconds between checks for players that were not available yet
+PLAYER_STANDBY_TIMEOUT = 600.0  # seconds a switched-away backend stays warm before releasing its connection
+ITUNES_PROCESS_NAME = "iTunes.exe"  # checked before touching COM, which would launch iTunes
+# Backend isolation - "process" runs each player backend in its own supervised worker process
+PLAYER_ISOLATION = "inprocess"  # "inprocess" or "process"
+WORKER_HEARTBEAT_INTERVAL = 2.0  # seconds between heartbeats from an idle worker
+WORKER_HEARTBEAT_TIMEOUT = 10.0  # seconds of silence before a worker counts as stalled and is killed
+WORKER_RESTART_BACKOFF = (1.0, 60.0)  # (first, max) seconds before restarting a worker that keeps failing
+WORKER_STABLE_AFTER = 60.0  # seconds a worker must stay up before its restart backoff starts over
+WORKER_CALL_TIMEOUT = 10.0  # seconds to wait for a worker to answer a call (including its startup)
+
+# Track-change latency - stage timestamps from a detected track change to its files on disk
+TRACK_LATENCY_SAMPLES = 200  # recent track changes kept per backend and artwork source for percentiles
+TRACK_LATENCY_RECENT = 50  # recent traces kept with all stage timestamps for the JSON report
+TRACK_LATENCY_FILE = os.path.abspath("track_latency.json")  # report written by the "l" command / tray menu
+
+# Tracing - timed spans kept in memory and written as Chrome/Perfetto trace-event JSON
+TRACING_ENABLED = False  # start recording at launch (the "t" command / tray menu toggle it at runtime)
+TRACE_BUFFER_SIZE = 20000  # spans kept; the oldest are dropped first
+TRACE_FILE = os.path.abspath("anp_trace.json")  # open in chrome://tracing or ui.perfetto.dev
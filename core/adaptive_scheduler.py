@@ -0,0 +1,107 @@
+"""
+Adaptive polling scheduler - polling delays from playback state and predicted track end
+"""
+import time
+from core.progress_tracker import PROGRESS_MODE_INTERVAL
+from config.settings import (POLL_INTERVAL_BOUNDS, POLL_BACKOFF_FACTOR, POLL_TRACK_END_LEAD,
+                             POLL_TRACK_END_GRACE, PROGRESS_MODE, PROGRESS_UPDATE_INTERVAL)
+
+SCHEDULE_PLAYING = "playing"
+SCHEDULE_PAUSED = "paused"
+SCHEDULE_STOPPED = "stopped"
+SCHEDULE_ABSENT = "absent"
+SCHEDULE_STATES = (SCHEDULE_PLAYING, SCHEDULE_PAUSED, SCHEDULE_STOPPED, SCHEDULE_ABSENT)
+
+
+class AdaptiveScheduler:
+    """Decides how long a backend sleeps before its next poll.
+
+    Playing: the slow playing interval, except around the predicted end of
+    the track (from position and duration), where it polls at the playing
+    minimum from POLL_TRACK_END_LEAD before until POLL_TRACK_END_GRACE after.
+    Paused, stopped and absent: start at the state's minimum and back off by
+    POLL_BACKOFF_FACTOR per unchanged poll up to its maximum.
+
+    In interval progress mode the playing maximum is capped at
+    PROGRESS_UPDATE_INTERVAL so the progress file keeps ticking.
+
+    Not thread safe - each backend owns one and drives it from its loop.
+    """
+
+    def __init__(self, bounds=None, backoff_factor=POLL_BACKOFF_FACTOR,
+                 track_end_lead=POLL_TRACK_END_LEAD, track_end_grace=POLL_TRACK_END_GRACE,
+                 cap_to_progress=True):
+        self.bounds = dict(POLL_INTERVAL_BOUNDS if bounds is None else bounds)
+        if cap_to_progress and PROGRESS_MODE == PROGRESS_MODE_INTERVAL:
+            low, high = self.bounds[SCHEDULE_PLAYING]
+            self.bounds[SCHEDULE_PLAYING] = (low, min(high, PROGRESS_UPDATE_INTERVAL))
+
+        self.backoff_factor = backoff_factor
+        self.track_end_lead = track_end_lead
+        self.track_end_grace = track_end_grace
+
+        self.state = SCHEDULE_ABSENT
+        self._idle_polls = 0
+        self._predicted_end = None  # time.monotonic() at which the track should end
+
+        self.polls = 0
+        self.state_changes = 0
+        self.track_end_polls = 0
+
+    def observe(self, state, position_seconds=None, duration_seconds=None, now=None):
+        """Record what the last poll saw - returns True if the state changed"""
+        if now is None:
+            now = time.monotonic()
+
+        changed = state != self.state
+        if changed:
+            self.state = state
+            self._idle_polls = 0
+            self.state_changes += 1
+
+        if state == SCHEDULE_PLAYING and duration_seconds and position_seconds is not None:
+            self._predicted_end = now + max(duration_seconds - position_seconds, 0)
+        elif state != SCHEDULE_PLAYING:
+            self._predicted_end = None
+        return changed
+
+    def near_track_end(self, now=None):
+        """True inside the fast-polling window around the predicted track end"""
+        if self.state != SCHEDULE_PLAYING or self._predicted_end is None:
+            return False
+        if now is None:
+            now = time.monotonic()
+        remaining = self._predicted_end - now
+        return -self.track_end_grace < remaining <= self.track_end_lead
+
+    def next_delay(self, now=None):
+        """Seconds to sleep before the next poll"""
+        if now is None:
+            now = time.monotonic()
+        self.polls += 1
+        low, high = self.bounds[self.state]
+
+        if self.state == SCHEDULE_PLAYING:
+            if self._predicted_end is None:
+                return high
+            remaining = self._predicted_end - now
+            if remaining > self.track_end_lead:
+                # Wake up exactly when the fast window opens
+                return max(min(high, remaining - self.track_end_lead), low)
+            if remaining > -self.track_end_grace:
+                self.track_end_polls += 1
+                return low
+            # Still the same track well past its end (streams, repeat) - slow again
+            return high
+
+        delay = min(low * (self.backoff_factor ** self._idle_polls), high)
+        self._idle_polls += 1
+        return delay
+
+    def get_stats(self):
+        return {
+            "state": self.state,
+            "polls": self.polls,
+            "state_changes": self.state_changes,
+            "track_end_polls": self.track_end_polls,
+        }
@@ -0,0 +1,203 @@
+"""
+Persistent artwork cache - content addressed with LRU eviction
+"""
+import hashlib
+import json
+import os
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from config.settings import (ARTWORK_CACHE_DIR, ARTWORK_CACHE_MAX_ENTRIES, ARTWORK_CACHE_MAX_BYTES,
+                             ARTWORK_CACHE_INDEX_SAVE_INTERVAL)
+
+INDEX_FILENAME = "index.json"
+INDEX_VERSION = 1
+
+
+def normalize_key(artist, album):
+    """Build a normalized (artist, album) cache key"""
+    parts = []
+    for value in (artist, album):
+        value = unicodedata.normalize("NFKC", value or "")
+        parts.append(" ".join(value.casefold().split()))
+    return "\x1f".join(parts)
+
+
+def content_hash(data):
+    """Content hash used to address cached artwork blobs"""
+    return hashlib.sha256(data).hexdigest()
+
+
+class ArtworkCache:
+    def __init__(self, cache_dir=ARTWORK_CACHE_DIR, max_entries=ARTWORK_CACHE_MAX_ENTRIES,
+                 max_bytes=ARTWORK_CACHE_MAX_BYTES, save_interval=ARTWORK_CACHE_INDEX_SAVE_INTERVAL):
+        self.cache_dir = cache_dir
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.save_interval = save_interval
+        self._lock = threading.Lock()
+
+        # key -> {"hash": str, "size": int, "last_used": float}, oldest first
+        self._entries = OrderedDict()
+        # hash -> number of keys referencing the blob
+        self._refcounts = {}
+        self._total_bytes = 0
+        # Recency changed by hits since the index was last written
+        self._dirty = False
+        self._saved_at = time.monotonic()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        self._load_index()
+        print(f"ArtworkCache initialized: {self.cache_dir} ({len(self._entries)} entries)")
+
+    def _blob_path(self, digest):
+        return os.path.join(self.cache_dir, f"{digest}.img")
+
+    def _index_path(self):
+        return os.path.join(self.cache_dir, INDEX_FILENAME)
+
+    def _load_index(self):
+        """Load the persisted index, dropping entries whose blobs are gone"""
+        try:
+            with open(self._index_path(), "r", encoding="utf-8") as f:
+                index = json.load(f)
+            if index.get("version") != INDEX_VERSION:
+                return
+
+            for key, entry in index.get("entries", []):
+                digest = entry.get("hash")
+                if not digest or not os.path.exists(self._blob_path(digest)):
+                    continue
+                self._add_entry(key, digest, int(entry.get("size", 0)), entry.get("last_used", 0))
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            print(f"Artwork cache index load failed: {e}")
+
+    def _save_index(self):
+        """Persist the index atomically - caller holds the lock"""
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            index_path = self._index_path()
+            temp_path = index_path + ".tmp"
+            with open(temp_path, "w", encoding="utf-8") as f:
+                json.dump({"version": INDEX_VERSION, "entries": list(self._entries.items())}, f)
+            os.replace(temp_path, index_path)
+            self._dirty = False
+            self._saved_at = time.monotonic()
+        except Exception as e:
+            print(f"Artwork cache index save failed: {e}")
+
+    def _add_entry(self, key, digest, size, last_used):
+        if digest not in self._refcounts:
+            self._refcounts[digest] = 0
+            self._total_bytes += size
+        self._refcounts[digest] += 1
+        self._entries[key] = {"hash": digest, "size": size, "last_used": last_used}
+
+    def _drop_entry(self, key):
+        """Remove a key and delete its blob once nothing references it"""
+        entry = self._entries.pop(key, None)
+        if not entry:
+            return
+        digest = entry["hash"]
+        self._refcounts[digest] -= 1
+        if self._refcounts[digest] <= 0:
+            del self._refcounts[digest]
+            self._total_bytes -= entry["size"]
+            try:
+                os.remove(self._blob_path(digest))
+            except OSError:
+                pass
+
+    def _evict(self):
+        while self._entries and (len(self._entries) > self.max_entries or
+                                 self._total_bytes > self.max_bytes):
+            oldest_key = next(iter(self._entries))
+            self._drop_entry(oldest_key)
+            self.evictions += 1
+
+    def get(self, artist, album):
+        """Return cached artwork bytes for (artist, album) or None - THREAD SAFE"""
+        key = normalize_key(artist, album)
+        with self._lock:
+            entry = self._entries.get(key)
+            if not entry:
+                self.misses += 1
+                return None
+
+            try:
+                with open(self._blob_path(entry["hash"]), "rb") as f:
+                    data = f.read()
+            except OSError:
+                data = None
+
+            if not data:
+                # Blob vanished from disk - forget about it
+                self._drop_entry(key)
+                self._save_index()
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            entry["last_used"] = time.time()
+            self._dirty = True
+            if time.monotonic() - self._saved_at >= self.save_interval:
+                self._save_index()
+            self.hits += 1
+            return data
+
+    def put(self, artist, album, data):
+        """Store artwork bytes for (artist, album) - THREAD SAFE"""
+        if not data:
+            return False
+
+        key = normalize_key(artist, album)
+        digest = content_hash(data)
+        with self._lock:
+            try:
+                blob_path = self._blob_path(digest)
+                if digest not in self._refcounts or not os.path.exists(blob_path):
+                    os.makedirs(self.cache_dir, exist_ok=True)
+                    temp_path = blob_path + ".tmp"
+                    with open(temp_path, "wb") as f:
+                        f.write(data)
+                    os.replace(temp_path, blob_path)
+
+                existing = self._entries.get(key)
+                if existing and existing["hash"] == digest:
+                    self._entries.move_to_end(key)
+                    existing["last_used"] = time.time()
+                else:
+                    self._drop_entry(key)
+                    self._add_entry(key, digest, len(data), time.time())
+                self._evict()
+                self._save_index()
+                return True
+            except Exception as e:
+                print(f"Artwork cache store failed: {e}")
+                return False
+
+    def flush(self):
+        """Persist recency changes still held in memory - THREAD SAFE"""
+        with self._lock:
+            if self._dirty:
+                self._save_index()
+
+    def get_stats(self):
+        """Get cache counters"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "blobs": len(self._refcounts),
+                "bytes": self._total_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": (self.hits / lookups) if lookups else 0.0,
+            }
@@ -4,17 +4,58 @@ Artwork management for music players - RESTORED WORKING V1
 import os
 import tempfile
 from core.file_manager import FileManager
+from core.artwork_cache import ArtworkCache
+from core.artwork_pipeline import ArtworkPipeline
+from core.event_server import get_event_hub
+from core.tracing import annotate, span
 from utils.lastfm_api import LastFmClient
 from config.settings import ARTWORK_FILE
 
 class ArtworkManager:
-    def __init__(self):
-        self.file_manager = FileManager()
+    def __init__(self, file_manager=None):
+        # Share the app's FileManager so every output goes through one writer
+        self.file_manager = file_manager or FileManager()
         self.lastfm_client = LastFmClient()
+        self.artwork_cache = ArtworkCache()
         self.artwork_file = ARTWORK_FILE
+        self.pipeline = ArtworkPipeline(self)
+    
+    def begin_track(self):
+        """Invalidate pending artwork jobs for a new track - returns the job generation"""
+        return self.pipeline.begin_track()
+    
+    def submit_artwork(self, generation, artist, album, title=None, direct_artwork=None):
+        """Publish artwork for a track in the background"""
+        return self.pipeline.submit(generation, artist, album, title, direct_artwork)
+    
+    def cancel_pending(self):
+        """Drop pending artwork jobs (pause/stop/player switch)"""
+        self.pipeline.cancel_pending()
+    
+    def shutdown(self):
+        """Stop the artwork workers and persist the cache index and Last.fm lookups"""
+        self.pipeline.shutdown()
+        self.artwork_cache.flush()
+        self.lastfm_client.flush()
+    
+    def publish_artwork(self, data, source="player"):
+        """Write resolved artwork bytes to the artwork file"""
+        with span("artwork.publish", "artwork", source=source, bytes=len(data) if data else 0):
+            if self.file_manager.save_artwork_bytes(data):
+                print(f"Artwork published from {source}: {len(data)} bytes")
+                get_event_hub().publish_artwork(data, source)
+                return True
+            return False
     
     async def save_apple_music_artwork(self, session):
-        """Save artwork directly from Apple Music session - WORKING V1 METHOD"""
+        """Save artwork directly from Apple Music session"""
+        data = await self.read_apple_music_artwork(session)
+        if not data:
+            return False
+        return self.publish_artwork(data, "Apple Music")
+    
+    async def read_apple_music_artwork(self, session):
+        """Read artwork bytes directly from Apple Music session - WORKING V1 METHOD"""
         try:
             import winrt.windows.storage.streams as streams
             import winrt.windows.storage as storage
@@ -22,15 +63,16 @@ class ArtworkManager:
             # Get media properties which includes thumbnail
             info = await session.try_get_media_properties_async()
             if not info or not info.thumbnail:
-                return False
+                return None
             
             # Open the thumbnail stream
             input_stream = await info.thumbnail.open_read_async()
             if not input_stream:
-                return False
+                return None
             
             # Create temp file in the same directory as the target to avoid cross-drive issues
             target_dir = os.path.dirname(os.path.abspath(self.artwork_file))
+            os.makedirs(target_dir, exist_ok=True)
             temp_file_path = os.path.join(target_dir, "anp_cover_temp.png")
             
             try:
@@ -58,15 +100,15 @@ class ArtworkManager:
                 output_stream.close()
                 input_stream.close()
                 
-                # Now move temp file to final location using safe cross-drive method
+                # Read the copied thumbnail back; publishing happens separately
                 if os.path.exists(temp_file_path) and os.path.getsize(temp_file_path) > 0:
-                    if self.file_manager.safe_move_file(temp_file_path, self.artwork_file):
-                        print(f"Apple Music artwork saved: {os.path.getsize(self.artwork_file)} bytes")
-                        return True
-                    else:
-                        return False
+                    with open(temp_file_path, 'rb') as f:
+                        data = f.read()
+                    print(f"Apple Music artwork read: {len(data)} bytes")
+                    annotate(bytes=len(data))
+                    return data
                 else:
-                    return False
+                    return None
                     
             except Exception as direct_e:
                 # Clean up streams
@@ -76,7 +118,7 @@ class ArtworkManager:
                     pass
                 
                 # Try simpler approach using Python file operations
-                return await self._save_apple_music_artwork_fallback(session)
+                return await self._read_apple_music_artwork_fallback(session)
                 
             finally:
                 # Clean up temp file if it still exists
@@ -88,25 +130,21 @@ class ArtworkManager:
             
         except Exception as e:
             print(f"Apple Music artwork error: {e}")
-            return False
+            return None
     
-    async def _save_apple_music_artwork_fallback(self, session):
-        """Fallback method for Apple Music artwork using Python file operations - WORKING V1"""
+    async def _read_apple_music_artwork_fallback(self, session):
+        """Fallback method for Apple Music artwork reading the stream in chunks - WORKING V1"""
         try:
             import winrt.windows.storage.streams as streams
             
             info = await session.try_get_media_properties_async()
             if not info or not info.thumbnail:
-                return False
+                return None
 
             stream = await info.thumbnail.open_read_async()
             if not stream:
-                return False
+                return None
 
-            # Create temporary file in same directory as target to avoid cross-drive issues
-            target_dir = os.path.dirname(os.path.abspath(self.artwork_file))
-            temp_path = os.path.join(target_dir, "anp_temp_artwork.tmp")
-            
             try:
                 artwork_data = bytearray()
                 chunk_size = 1024
@@ -133,33 +171,21 @@ class ArtworkManager:
                     except Exception as chunk_e:
                         break
                 
-                stream.close()
-                
                 if artwork_data and len(artwork_data) > 1000:
-                    # Write to temp file first
-                    with open(temp_path, 'wb') as f:
-                        f.write(artwork_data)
-                    
-                    # Use safe cross-drive move
-                    if self.file_manager.safe_move_file(temp_path, self.artwork_file):
-                        print(f"Apple Music artwork saved (fallback method): {len(artwork_data)} bytes")
-                        return True
-                    else:
-                        return False
+                    print(f"Apple Music artwork read (fallback method): {len(artwork_data)} bytes")
+                    return bytes(artwork_data)
                 else:
-                    return False
+                    return None
                     
             finally:
-                # Clean up temp file
                 try:
-                    if os.path.exists(temp_path):
-                        os.remove(temp_path)
+                    stream.close()
                 except:
                     pass
             
         except Exception as e:
             print(f"Apple Music artwork fallback error: {e}")
-            return False
+            return None
 
     async def _buffer_to_bytes_alternative(self, buffer):
         """Alternative method to extract bytes from WinRT buffer - WORKING V1"""
@@ -202,58 +228,109 @@ class ArtworkManager:
                 return None
     
     def save_itunes_artwork(self, track):
-        """Save artwork from iTunes track - WORKING V1"""
+        """Save artwork from iTunes track"""
+        data = self.read_itunes_artwork(track)
+        if not data:
+            return False
+        return self.publish_artwork(data, "iTunes")
+    
+    def read_itunes_artwork(self, track):
+        """Read artwork bytes from iTunes track - must run on the COM thread"""
+        target_dir = os.path.dirname(os.path.abspath(self.artwork_file))
+        temp_path = os.path.join(target_dir, "anp_itunes_temp.png")
         try:
             if track.Artwork.Count > 0:
                 art = track.Artwork.Item(1)
                 if art:
-                    art.SaveArtworkToFile(self.artwork_file)
-                    artwork_saved = os.path.isfile(self.artwork_file)
-                    if artwork_saved:
-                        print(f"iTunes artwork saved: {os.path.getsize(self.artwork_file)} bytes")
-                        return True
+                    os.makedirs(target_dir, exist_ok=True)
+                    art.SaveArtworkToFile(temp_path)
+                    if os.path.isfile(temp_path):
+                        with open(temp_path, 'rb') as f:
+                            data = f.read()
+                        if data:
+                            print(f"iTunes artwork read: {len(data)} bytes")
+                            annotate(bytes=len(data))
+                            return data
         except Exception as e:
             print(f"iTunes artwork error: {e}")
-        return False
+        finally:
+            try:
+                if os.path.exists(temp_path):
+                    os.remove(temp_path)
+            except:
+                pass
+        return None
     
-    def save_artwork_with_fallback(self, artist, album, title=None):
-        """Try to save artwork using Last.fm API with fallback chain"""
-        # Try album first
-        url = self.lastfm_client.get_album_artwork_url(artist, album)
-        
-        # If no album artwork and we have a title, try title as album
-        if not url and title:
-            url = self.lastfm_client.get_track_artwork_url(artist, title)
-        
-        if url:
-            if self.file_manager.save_artwork_from_url(url):
-                print("Last.fm artwork saved successfully")
-                return True
+    def resolve_fallback_artwork(self, artist, album, title=None, is_current=None):
+        """Resolve artwork bytes from cache, Last.fm or default - returns (data, source)
+
+        is_current lets a background job bail out before each network step
+        once the track it was started for is no longer playing.
+        """
+        with span("artwork.resolve_fallback", "artwork", artist=artist, album=album):
+            # Cache hit resolves without touching the network
+            cached = self.artwork_cache.get(artist, album)
+            annotate(cache_hit=bool(cached))
+            if cached:
+                return cached, "cache"
+            
+            if is_current and not is_current():
+                return None, None
+            
+            # Try album first
+            url = self.lastfm_client.get_album_artwork_url(artist, album)
+            
+            # If no album artwork and we have a title, try title as album
+            if not url and title:
+                url = self.lastfm_client.get_track_artwork_url(artist, title)
+            
+            if is_current and not is_current():
+                return None, None
+            
+            if url:
+                data = self.file_manager.download_artwork(url)
+                if data:
+                    self.artwork_cache.put(artist, album, data)
+                    annotate(source="lastfm", bytes=len(data))
+                    return data, "lastfm"
+                print("Last.fm artwork URL found but download failed")
             else:
-                print("Last.fm artwork URL found but save failed")
-        else:
-            print("No Last.fm artwork found")
-        
-        # Fall back to default artwork
-        print("Using default artwork")
-        return self.file_manager.save_default_artwork()
+                print("No Last.fm artwork found")
+            
+            # Fall back to default artwork
+            print("Using default artwork")
+            annotate(source="default")
+            return self.file_manager.load_default_artwork(), "default"
+    
+    def save_artwork_with_fallback(self, artist, album, title=None):
+        """Try to save artwork using cache, then Last.fm API with fallback chain"""
+        data, source = self.resolve_fallback_artwork(artist, album, title)
+        if not data:
+            return False
+        return self.publish_artwork(data, source)
+    
+    def get_cache_stats(self):
+        """Get artwork cache counters"""
+        return self.artwork_cache.get_stats()
     
     async def handle_apple_music_artwork(self, session, artist, album, title=None):
         """Complete artwork handling chain for Apple Music - WORKING V1"""
-        # Try Apple Music direct artwork first
-        if await self.save_apple_music_artwork(session):
-            return True
-        
-        # Fallback to Last.fm and default
-        print("Apple Music artwork failed, trying fallback...")
-        return self.save_artwork_with_fallback(artist, album, title)
+        with span("artwork.handle_apple_music", "artwork", artist=artist, album=album):
+            # Try Apple Music direct artwork first
+            if await self.save_apple_music_artwork(session):
+                return True
+            
+            # Fallback to Last.fm and default
+            print("Apple Music artwork failed, trying fallback...")
+            return self.save_artwork_with_fallback(artist, album, title)
     
     def handle_itunes_artwork(self, track, artist, album, title=None):
         """Complete artwork handling chain for iTunes - WORKING V1"""
-        # Try iTunes direct artwork first
-        if self.save_itunes_artwork(track):
-            return True
-        
-        # Fallback to Last.fm and default
-        print("iTunes artwork failed, trying fallback...")
-        return self.save_artwork_with_fallback(artist, album, title)
\ No newline at end of file
+        with span("artwork.handle_itunes", "artwork", artist=artist, album=album):
+            # Try iTunes direct artwork first
+            if self.save_itunes_artwork(track):
+                return True
+            
+            # Fallback to Last.fm and default
+            print("iTunes artwork failed, trying fallback...")
+            return self.save_artwork_with_fallback(artist, album, title)
@@ -83,7 +83,7 @@ class ArtworkManager:
         try:
             print(f"Fetching artwork from Last.fm for: {artist} - {album}")
             
-            import requests
+            from utils.http_client import get_http_client
             
             url = "http://ws.audioscrobbler.com/2.0/"
             params = {
@@ -94,7 +94,7 @@ class ArtworkManager:
                 'format': 'json'
             }
             
-            response = requests.get(url, params=params, timeout=10)
+            response = get_http_client().get(url, params=params, read_timeout=10)
             
             if response.status_code == 200:
                 data = response.json()
@@ -0,0 +1,96 @@
+"""
+Asynchronous artwork pipeline - resolves artwork off the player threads
+"""
+import threading
+from core.runtime import get_runtime
+from core.track_latency import get_track_latency
+from core.tracing import annotate, span
+
+
+class ArtworkPipeline:
+    def __init__(self, artwork_manager, executor=None, latency=None):
+        self.artwork_manager = artwork_manager
+        # Lookups share the runtime's bounded executor
+        self.executor = executor or get_runtime().executor
+        self.latency = latency or get_track_latency()
+        self._closed = False
+        self._lock = threading.Lock()
+        self._generation = 0
+        self._future = None
+        self.stats = {"submitted": 0, "published": 0, "stale": 0, "failed": 0}
+
+    def begin_track(self):
+        """Start a new artwork generation and invalidate any pending job - THREAD SAFE
+
+        Takes the publish lock, so once this returns no older job can land.
+        """
+        with self._lock:
+            self._generation += 1
+            if self._future:
+                self._future.cancel()
+                self._future = None
+            return self._generation
+
+    def cancel_pending(self):
+        """Drop any pending job without starting a new track"""
+        self.begin_track()
+
+    def is_current(self, generation):
+        """Check whether a job generation is still the newest one"""
+        return generation == self._generation
+
+    def submit(self, generation, artist, album, title=None, direct_artwork=None):
+        """Publish player artwork, or resolve the fallback chain on a worker"""
+        with self._lock:
+            if self._closed or not self.is_current(generation):
+                self.stats["stale"] += 1
+                return None
+            self.stats["submitted"] += 1
+            try:
+                self._future = self.executor.submit(
+                    self._resolve_and_publish, generation, artist, album, title, direct_artwork
+                )
+            except RuntimeError:
+                return None  # executor shut down
+            return self._future
+
+    def _resolve_and_publish(self, generation, artist, album, title, direct_artwork):
+        """Worker: resolve artwork bytes then publish if the job is still current"""
+        with span("artwork.pipeline", "artwork", generation=generation, direct=bool(direct_artwork)):
+            try:
+                if direct_artwork:
+                    data, source = direct_artwork, "player"
+                else:
+                    data, source = self.artwork_manager.resolve_fallback_artwork(
+                        artist, album, title, is_current=lambda: self.is_current(generation)
+                    )
+
+                annotate(source=source, bytes=len(data) if data else 0)
+                with self._lock:
+                    if not self.is_current(generation) or not data:
+                        self.stats["stale" if data else "failed"] += 1
+                        return False
+
+                    # Publish while holding the lock so begin_track() cannot interleave
+                    self.latency.artwork_resolved(source)
+                    if self.artwork_manager.publish_artwork(data, source):
+                        self.stats["published"] += 1
+                        return True
+                    self.stats["failed"] += 1
+                    return False
+
+            except Exception as e:
+                print(f"Artwork pipeline error: {e}")
+                self.stats["failed"] += 1
+                return False
+
+    def get_stats(self):
+        """Get pipeline counters"""
+        with self._lock:
+            return dict(self.stats)
+
+    def shutdown(self):
+        """Stop accepting jobs and drop the queued one - the executor belongs to the runtime"""
+        with self._lock:
+            self._closed = True
+        self.cancel_pending()
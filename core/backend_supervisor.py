@@ -0,0 +1,352 @@
+"""
+Backend supervisor - runs player backends in child processes and restarts them when they fail
+"""
+import itertools
+import multiprocessing
+import threading
+import time
+from concurrent.futures import Future
+from multiprocessing.connection import wait
+from core.backend_worker import worker_main
+from config.settings import (WORKER_HEARTBEAT_TIMEOUT, WORKER_RESTART_BACKOFF, WORKER_STABLE_AFTER,
+                             WORKER_CALL_TIMEOUT)
+
+
+class _Worker:
+    """One supervised backend process and what the parent knows about it"""
+
+    def __init__(self, player):
+        self.player = player
+        self.name = player.name
+        self.process = None
+        self.conn = None
+        self.spawning = False  # a thread is starting the process outside the supervisor lock
+        self.send_lock = threading.Lock()
+        self.pid = None
+        self.desired = None  # "start" replays after a restart; anything else leaves it idle
+        self.started_at = None
+        self.last_message_at = None
+        self.restart_at = None
+        self.failures = 0  # restarts since the process was last stable
+        self.pending = {}  # request id -> Future
+        self.stats = {"spawns": 0, "restarts": 0, "deltas": 0, "heartbeats": 0, "crashes": 0, "stalls": 0}
+
+    def alive(self):
+        return self.process is not None and self.conn is not None
+
+
+class BackendSupervisor:
+    """Starts one worker process per backend and keeps it alive.
+
+    A single supervisor thread waits on every worker pipe and process
+    handle at once, so it only wakes up for a message, a process exit or
+    the next heartbeat deadline. A worker that exits or stays silent for
+    WORKER_HEARTBEAT_TIMEOUT is killed and restarted after a backoff that
+    doubles per failure (WORKER_RESTART_BACKOFF) and starts over once a
+    process has stayed up for WORKER_STABLE_AFTER.
+    """
+
+    def __init__(self, context=None, clock=time.monotonic, heartbeat_timeout=WORKER_HEARTBEAT_TIMEOUT,
+                 restart_backoff=WORKER_RESTART_BACKOFF, stable_after=WORKER_STABLE_AFTER):
+        # spawn everywhere: it is the only start method on Windows, and a fork
+        # would copy the parent's runtime threads into a half-working child
+        self.context = context or multiprocessing.get_context("spawn")
+        self.clock = clock
+        self.heartbeat_timeout = heartbeat_timeout
+        self.restart_backoff = restart_backoff
+        self.stable_after = stable_after
+        self._workers = {}
+        self._lock = threading.RLock()
+        self._spawned = threading.Condition(self._lock)
+        self._request_ids = itertools.count(1)
+        self._wake_reader, self._wake_writer = multiprocessing.Pipe(duplex=False)
+        self._thread = None
+        self._running = False
+
+    def add(self, player):
+        """Supervise a backend for player (a RemotePlayer)"""
+        with self._lock:
+            self._workers[player.name] = _Worker(player)
+
+    def command(self, name, command):
+        """Send start/stop/standby to a backend, starting its process if needed - THREAD SAFE"""
+        with self._lock:
+            worker = self._workers[name]
+            worker.desired = command
+        if command == "start":
+            self._ensure_process(worker)
+        with self._lock:
+            # A worker that is still starting gets "start" replayed once it is ready
+            if worker.alive() and worker.pid:
+                self._send(worker, (command,))
+
+    def request(self, name, method, timeout=WORKER_CALL_TIMEOUT):
+        """Call a no-argument player method in the backend process - None on failure"""
+        future = Future()
+        with self._lock:
+            worker = self._workers[name]
+        self._ensure_process(worker)
+        with self._lock:
+            if not worker.alive():
+                return None
+            request_id = next(self._request_ids)
+            worker.pending[request_id] = future
+            self._send(worker, ("call", request_id, method))
+        try:
+            return future.result(timeout)
+        except Exception:
+            with self._lock:
+                worker.pending.pop(request_id, None)
+            return None
+
+    def inject_fault(self, name, fault):
+        """Make a backend process crash or freeze - for supervision tests"""
+        with self._lock:
+            worker = self._workers[name]
+            if worker.alive():
+                self._send(worker, ("fault", fault))
+
+    def restart(self, name):
+        """Kill a backend process and start it again right away"""
+        with self._lock:
+            worker = self._workers[name]
+            detached = self._detach(worker)
+            worker.restart_at = self.clock()
+        self._reap(detached)
+        self._wake()
+
+    def shutdown(self, timeout=3.0):
+        """Ask every worker to exit, then kill what is left"""
+        with self._lock:
+            self._running = False
+            workers = list(self._workers.values())
+            for worker in workers:
+                worker.restart_at = None
+                if worker.alive():
+                    self._send(worker, ("shutdown",))
+        self._wake()
+        # The supervisor thread must be out of wait() before the pipes are closed
+        if self._thread and self._thread is not threading.current_thread():
+            self._thread.join(timeout)
+        deadline = self.clock() + timeout
+        for worker in workers:
+            if worker.process is not None:
+                worker.process.join(max(deadline - self.clock(), 0))
+            with self._lock:
+                detached = self._detach(worker)
+            self._reap(detached)
+        print("Backend supervisor stopped")
+
+    def get_stats(self):
+        """Per-backend process state and counters"""
+        now = self.clock()
+        with self._lock:
+            stats = {}
+            for name, worker in self._workers.items():
+                if worker.alive():
+                    state = "running" if worker.pid else "starting"
+                elif worker.restart_at is not None:
+                    state = "backoff"
+                else:
+                    state = "stopped"
+                stats[name] = dict(worker.stats, state=state, pid=worker.pid,
+                                   uptime=(now - worker.started_at) if worker.alive() else 0.0,
+                                   last_message_age=(now - worker.last_message_at) if worker.alive() else None)
+            return stats
+
+    # Process management - spawning, killing and joining happen outside _lock,
+    # so commands and the tray status never wait on a process
+
+    def _ensure_process(self, worker):
+        """Start worker's process unless it is running - call WITHOUT _lock"""
+        with self._lock:
+            while worker.spawning:
+                self._spawned.wait()
+            if worker.alive():
+                return
+            worker.spawning = True
+            worker.restart_at = None
+        try:
+            parent_conn, child_conn = self.context.Pipe()
+            process = self.context.Process(target=worker_main, name=f"backend-{worker.name}", daemon=True,
+                                           args=(child_conn, worker.name, worker.player.kind,
+                                                 worker.player.options))
+            process.start()
+            child_conn.close()
+        except Exception:
+            with self._lock:
+                worker.spawning = False
+                self._spawned.notify_all()
+            raise
+        with self._lock:
+            worker.spawning = False
+            self._spawned.notify_all()
+            worker.process = process
+            worker.conn = parent_conn
+            worker.pid = None
+            worker.started_at = worker.last_message_at = self.clock()
+            worker.stats["spawns"] += 1
+            self._start_thread()
+        self._wake()
+
+    def _send(self, worker, message):
+        with worker.send_lock:
+            try:
+                worker.conn.send(message)
+            except (OSError, ValueError) as e:
+                print(f"Backend process {worker.name}: send failed: {e}")
+
+    def _detach(self, worker):
+        """Take the process, pipe and pending calls away from worker - caller holds _lock.
+        
+        The result goes to _reap() once the lock is released.
+        """
+        detached = (worker.process, worker.conn, list(worker.pending.values()))
+        worker.process = worker.conn = None
+        worker.pid = None
+        worker.pending.clear()
+        return detached
+
+    def _reap(self, detached):
+        """Close, kill and join a detached process and fail its pending calls - call WITHOUT _lock"""
+        process, conn, pending = detached
+        if conn is not None:
+            conn.close()
+        if process is not None:
+            if process.is_alive():
+                process.kill()
+            process.join(1.0)
+        for future in pending:
+            future.set_result(None)
+
+    def _start_thread(self):
+        if self._running:
+            return
+        self._running = True
+        self._thread = threading.Thread(target=self._run, name="backend-supervisor", daemon=True)
+        self._thread.start()
+
+    def _wake(self):
+        try:
+            self._wake_writer.send_bytes(b"")
+        except OSError:
+            pass
+
+    # Supervisor thread
+
+    def _run(self):
+        while True:
+            with self._lock:
+                if not self._running:
+                    return
+                waitables = {self._wake_reader: None}
+                for worker in self._workers.values():
+                    if worker.alive():
+                        waitables[worker.conn] = worker
+                        waitables[worker.process.sentinel] = worker
+                timeout = self._next_deadline()
+
+            try:
+                ready_list = wait(list(waitables), timeout)
+            except OSError as e:
+                print(f"Backend supervisor wait error: {e}")
+                ready_list = []
+            for ready in ready_list:
+                worker = waitables[ready]
+                if worker is None:
+                    while self._wake_reader.poll():
+                        self._wake_reader.recv_bytes()
+                elif ready is worker.conn:
+                    self._receive(worker)
+                else:
+                    self._lost(worker, "exited", crashed=True)
+            self._check_workers()
+
+    def _next_deadline(self):
+        now = self.clock()
+        deadlines = []
+        for worker in self._workers.values():
+            if worker.alive():
+                deadlines.append(worker.last_message_at + self.heartbeat_timeout)
+            elif worker.restart_at is not None:
+                deadlines.append(worker.restart_at)
+        return max(min(deadlines) - now, 0) if deadlines else None
+
+    def _receive(self, worker):
+        """Drain one worker's pipe and replay its deltas"""
+        deltas = []
+        with self._lock:
+            conn = worker.conn
+            if conn is None:
+                return
+            try:
+                while conn.poll():
+                    message = conn.recv()
+                    worker.last_message_at = self.clock()
+                    kind = message[0]
+                    if kind == "hb":
+                        worker.stats["heartbeats"] += 1
+                    elif kind == "ready":
+                        worker.pid = message[1]
+                        print(f"Backend process {worker.name} running (pid {worker.pid})")
+                        if worker.desired == "start":
+                            self._send(worker, ("start",))
+                    elif kind == "reply":
+                        future = worker.pending.pop(message[1], None)
+                        if future:
+                            future.set_result(message[2])
+                    else:
+                        worker.stats["deltas"] += 1
+                        deltas.append(message)
+            except (EOFError, OSError):
+                deltas.append(None)
+
+        # Replayed outside the lock: publishing takes the arbiter and writer locks
+        for delta in deltas:
+            if delta is None:
+                self._lost(worker, "closed its pipe", crashed=True)
+                return
+            try:
+                worker.player.apply_delta(delta)
+            except Exception as e:
+                print(f"Backend process {worker.name}: delta {delta[0]} failed: {e}")
+
+    def _check_workers(self):
+        now = self.clock()
+        for worker in list(self._workers.values()):
+            with self._lock:
+                silent = worker.alive() and now - worker.last_message_at >= self.heartbeat_timeout
+                due = not worker.alive() and worker.restart_at is not None and now >= worker.restart_at
+            if silent:
+                self._lost(worker, f"silent for {now - worker.last_message_at:.1f}s", crashed=False)
+            elif due:
+                with self._lock:
+                    if not self._running:
+                        continue
+                    worker.stats["restarts"] += 1
+                print(f"Restarting backend process {worker.name}")
+                self._ensure_process(worker)
+
+    def _lost(self, worker, reason, crashed):
+        """Kill a failed worker and schedule its restart"""
+        with self._lock:
+            if not worker.alive():
+                return
+            now = self.clock()
+            if now - worker.started_at >= self.stable_after:
+                worker.failures = 0
+            first, longest = self.restart_backoff
+            delay = min(first * 2 ** worker.failures, longest)
+            worker.failures += 1
+            exitcode = worker.process.exitcode
+            detached = self._detach(worker)
+            running = self._running
+            if running:
+                worker.stats["crashes" if crashed else "stalls"] += 1
+                worker.restart_at = now + delay
+        self._reap(detached)
+        if not running:
+            return  # shutting down - exits are expected
+        print(f"Backend process {worker.name} {reason}"
+              f"{f' (exit code {exitcode})' if exitcode is not None else ''} - restarting in {delay:.1f}s")
+        worker.player.on_worker_lost()
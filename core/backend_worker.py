@@ -0,0 +1,183 @@
+"""
+Backend worker process - runs one player backend and streams its state to the parent
+
+The player runs unchanged, with stand-ins for the output managers: nothing is
+written here. Whatever the player publishes goes over the pipe as a compact
+delta, and the parent's RemotePlayer replays it through the normal publishing
+path. The parent supervises this process through the same pipe.
+
+Child -> parent:
+    ("ready", pid)                               started and accepting commands
+    ("hb",)                                      heartbeat, only sent when nothing else was
+    ("track", title, artist, album, age)         a new track is shown, age seconds after it was detected
+    ("progress", position, duration, playing)    progress of the last track sent
+    ("progress_full", title, artist, album, position, duration, playing)
+    ("artwork", artist, album, title, data)      player artwork (data may be None: use fallbacks)
+    ("clear",)                                   outputs cleared
+    ("reply", request_id, value)                 answer to a "call"
+
+Parent -> child:
+    ("start",) ("stop",) ("standby",)            monitoring control
+    ("call", request_id, method)                 e.g. is_available
+    ("fault", "crash" | "freeze")                break on purpose, for supervision tests
+    ("shutdown",)
+"""
+import os
+import threading
+import time
+from core.runtime import get_runtime
+from core.track_latency import get_track_latency
+from config.settings import ARTWORK_FILE, WORKER_HEARTBEAT_INTERVAL
+
+BACKEND_APPLE_MUSIC = "apple_music"
+BACKEND_ITUNES = "itunes"
+
+
+class DeltaChannel:
+    """The player's event hub inside the worker: publishes become deltas on the pipe"""
+
+    def __init__(self, conn, clock=time.monotonic):
+        self.conn = conn
+        self.clock = clock
+        self._lock = threading.Lock()
+        self._track = None  # text of the last track sent, so progress can leave it out
+        self.last_sent = clock()
+
+    def send(self, message):
+        with self._lock:
+            try:
+                self.conn.send(message)
+            except (OSError, ValueError):
+                return  # parent gone; the command loop notices and exits
+            self.last_sent = self.clock()
+
+    def heartbeat(self):
+        """Timer callback - any delta counts as a heartbeat, so only idle workers send one"""
+        if self.clock() - self.last_sent >= WORKER_HEARTBEAT_INTERVAL * 0.5:
+            self.send(("hb",))
+
+    def freeze(self):
+        """Hold the pipe forever, like a process stuck with the GIL held"""
+        self._lock.acquire()
+        threading.Event().wait()
+
+    def publish_now_playing(self, title, artist, album, player):
+        self._track = (title, artist, album)
+        # Clocks differ between processes - the parent rebuilds the detection time from the age
+        self.send(("track", title, artist, album, get_track_latency().current_age()))
+
+    def publish_progress(self, title, artist, album, position_seconds, duration_seconds, is_playing, player):
+        if (title, artist, album) == self._track:
+            self.send(("progress", position_seconds, duration_seconds, is_playing))
+        else:
+            self.send(("progress_full", title, artist, album, position_seconds, duration_seconds, is_playing))
+
+    def publish_clear(self):
+        self._track = None
+        self.send(("clear",))
+
+    def publish_artwork(self, data, source):
+        pass  # artwork goes out through WorkerArtworkManager.submit_artwork
+
+
+class _Discard:
+    """File manager and progress tracker stand-in - the parent writes every output"""
+
+    def __getattr__(self, name):
+        return _discard
+
+
+def _discard(*args, **kwargs):
+    return None
+
+
+def _worker_artwork_manager(channel):
+    """An ArtworkManager that reads player artwork here and sends it to the parent"""
+    from core.artwork_manager import ArtworkManager
+
+    class WorkerArtworkManager(ArtworkManager):
+        def __init__(self):
+            # No cache, pipeline or HTTP client - fallbacks resolve in the parent
+            self.artwork_file = ARTWORK_FILE
+            self._generation = 0
+
+        def begin_track(self):
+            self._generation += 1
+            return self._generation
+
+        def submit_artwork(self, generation, artist, album, title=None, direct_artwork=None):
+            channel.send(("artwork", artist, album, title, direct_artwork))
+
+        def cancel_pending(self):
+            pass
+
+        def shutdown(self):
+            pass
+
+    return WorkerArtworkManager()
+
+
+def create_backend(kind, name, channel, options):
+    """Build the player for a worker process.
+
+    kind is BACKEND_APPLE_MUSIC, BACKEND_ITUNES, or a picklable factory called
+    as factory(name, file_manager, progress_tracker, artwork_manager, **options),
+    which is how the benchmarks run their scripted fakes in a worker.
+    """
+    outputs = _Discard()
+    artwork = _worker_artwork_manager(channel)
+    if kind == BACKEND_ITUNES:
+        from players.itunes import iTunesPlayer
+        player = iTunesPlayer(outputs, outputs, artwork)
+    elif kind == BACKEND_APPLE_MUSIC:
+        from players.apple_music import AppleMusicPlayer
+        player = AppleMusicPlayer(outputs, outputs, artwork)
+    elif callable(kind):
+        player = kind(name, outputs, outputs, artwork, **options)
+    else:
+        raise ValueError(f"Unknown backend kind: {kind}")
+    player.event_hub = channel
+    return player
+
+
+def worker_main(conn, name, kind, options):
+    """Entry point of a backend process - returns when the parent shuts it down or goes away"""
+    channel = DeltaChannel(conn)
+    runtime = get_runtime()
+    player = create_backend(kind, name, channel, options or {})
+    heartbeat = runtime.call_every(WORKER_HEARTBEAT_INTERVAL, channel.heartbeat, name="worker-heartbeat")
+    channel.send(("ready", os.getpid()))
+
+    try:
+        while True:
+            try:
+                message = conn.recv()
+            except (EOFError, OSError):
+                print(f"{name} worker: parent went away")
+                break
+
+            command = message[0]
+            if command == "shutdown":
+                break
+            elif command == "start":
+                player.start_monitoring()
+            elif command == "stop":
+                player.stop_monitoring()
+            elif command == "standby":
+                player.standby()
+            elif command == "call":
+                _, request_id, method = message
+                try:
+                    value = getattr(player, method)()
+                except Exception as e:
+                    print(f"{name} worker: {method} failed: {e}")
+                    value = None
+                channel.send(("reply", request_id, value))
+            elif command == "fault":
+                if message[1] == "crash":
+                    os._exit(70)
+                runtime.call_soon(channel.freeze)
+    finally:
+        heartbeat.cancel()
+        player.stop_monitoring()
+        runtime.stop()
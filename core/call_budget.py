@@ -0,0 +1,261 @@
+"""
+Call budgets - deadlines, latency percentiles and a watchdog for external calls
+
+Every call that leaves the process (COM, WinRT, HTTP, disk) runs inside a
+budget: its latency is recorded per call site, and a call still running past
+its deadline is reported as hung. Awaited calls are cancelled at the deadline;
+blocking calls cannot be interrupted, so the watchdog restarts the backend
+that made them instead. Every budgeted call is also a tracing span named
+after its call site.
+"""
+import asyncio
+import itertools
+import math
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from core.tracing import span
+from config.settings import CALL_LATENCY_SAMPLES, WATCHDOG_RESTART_BACKOFF
+
+RECENT_HANGS = 20  # hung calls kept for the status display
+
+
+class CallTimeout(TimeoutError):
+    """An awaited external call ran past its deadline and was cancelled"""
+
+    def __init__(self, site, deadline):
+        super().__init__(f"{site} did not finish within {deadline:.1f}s")
+        self.site = site
+        self.deadline = deadline
+
+
+class _SiteStats:
+    __slots__ = ("calls", "failures", "hangs", "max_ms", "samples")
+
+    def __init__(self, samples):
+        self.calls = 0
+        self.failures = 0
+        self.hangs = 0
+        self.max_ms = 0.0
+        self.samples = deque(maxlen=samples)
+
+    def as_dict(self):
+        ordered = sorted(self.samples)
+        return {
+            "calls": self.calls,
+            "failures": self.failures,
+            "hangs": self.hangs,
+            "p50_ms": percentile(ordered, 0.50),
+            "p95_ms": percentile(ordered, 0.95),
+            "p99_ms": percentile(ordered, 0.99),
+            "max_ms": self.max_ms,
+        }
+
+
+class _InFlight:
+    __slots__ = ("backend", "site", "started", "deadline", "check_at", "thread", "hung")
+
+    def __init__(self, backend, site, started, deadline):
+        self.backend = backend
+        self.site = site
+        self.started = started
+        self.deadline = deadline
+        self.check_at = started + deadline
+        self.thread = threading.current_thread().name
+        self.hung = False
+
+
+class _BackendState:
+    __slots__ = ("on_hang", "restarts", "consecutive", "next_restart_at", "restarting")
+
+    def __init__(self, on_hang):
+        self.on_hang = on_hang
+        self.restarts = 0
+        self.consecutive = 0  # restarts without a completed call in between
+        self.next_restart_at = 0.0
+        self.restarting = False
+
+
+def percentile(ordered, q):
+    """Nearest-rank percentile of an already sorted list (0.0 when empty)"""
+    if not ordered:
+        return 0.0
+    return ordered[max(0, math.ceil(q * len(ordered)) - 1)]
+
+
+class CallBudget:
+    """Per-call deadlines with a watchdog thread that restarts hung backends.
+
+    The watchdog only wakes up at the deadline of a call that is in flight,
+    so an idle app costs it nothing. When a backend keeps hanging, its
+    restarts back off from WATCHDOG_RESTART_BACKOFF[0] to [1] seconds apart;
+    one completed call resets the backoff.
+    """
+
+    def __init__(self, executor=None, clock=time.monotonic, samples=CALL_LATENCY_SAMPLES,
+                 restart_backoff=WATCHDOG_RESTART_BACKOFF):
+        self.executor = executor
+        self.clock = clock
+        self.samples = samples
+        self.restart_backoff = restart_backoff
+        self._cond = threading.Condition()
+        self._sites = {}  # site -> _SiteStats
+        self._in_flight = {}  # token -> _InFlight
+        self._backends = {}  # backend -> _BackendState
+        self._tokens = itertools.count()
+        self._wait_until = None  # when the watchdog wakes up next (inf: only when notified)
+        self._thread = None
+        self._running = False
+        self.recent_hangs = deque(maxlen=RECENT_HANGS)
+        self.stats = {"checks": 0, "hangs": 0, "restarts": 0}
+
+    def start(self):
+        with self._cond:
+            if self._running:
+                return
+            self._running = True
+            self._thread = threading.Thread(target=self._watch, name="runtime-watchdog", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        with self._cond:
+            self._running = False
+            self._cond.notify_all()
+
+    def register(self, backend, on_hang):
+        """Call on_hang(record) on the executor when a call of backend hangs - THREAD SAFE"""
+        with self._cond:
+            self._backends[backend] = _BackendState(on_hang)
+
+    @contextmanager
+    def call(self, backend, site, deadline):
+        """Time a blocking call; the watchdog reports it if it outlives deadline - THREAD SAFE"""
+        token = self._begin(backend, site, deadline)
+        ok = False
+        try:
+            with span(site, backend):
+                yield
+            ok = True
+        finally:
+            self._end(token, ok)
+
+    async def wait_for(self, backend, site, awaitable, deadline):
+        """Await with a deadline - raises CallTimeout and reports the hang when it runs over"""
+        token = self._begin(backend, site, deadline)
+        ok = False
+        try:
+            with span(site, backend):
+                result = await asyncio.wait_for(awaitable, deadline)
+            ok = True
+            return result
+        except asyncio.TimeoutError:
+            self._report(token)
+            raise CallTimeout(site, deadline) from None
+        finally:
+            self._end(token, ok)
+
+    def get_stats(self):
+        """Latency percentiles per call site, calls in flight and recent hangs - THREAD SAFE"""
+        now = self.clock()
+        with self._cond:
+            return {
+                "sites": {site: stats.as_dict() for site, stats in self._sites.items()},
+                "in_flight": [{"backend": call.backend, "site": call.site, "thread": call.thread,
+                               "seconds": now - call.started, "hung": call.hung}
+                              for call in self._in_flight.values()],
+                "recent_hangs": list(self.recent_hangs),
+                "backend_restarts": {name: state.restarts for name, state in self._backends.items()},
+                **self.stats,
+            }
+
+    def _begin(self, backend, site, deadline):
+        call = _InFlight(backend, site, self.clock(), deadline)
+        with self._cond:
+            token = next(self._tokens)
+            self._in_flight[token] = call
+            # Only wake the watchdog when this deadline comes before its next check
+            if self._wait_until is not None and call.check_at < self._wait_until:
+                self._wait_until = None
+                self._cond.notify()
+        return token
+
+    def _end(self, token, ok):
+        now = self.clock()
+        with self._cond:
+            call = self._in_flight.pop(token, None)
+            if call is None:
+                return
+            stats = self._sites.get(call.site)
+            if stats is None:
+                stats = self._sites[call.site] = _SiteStats(self.samples)
+            latency_ms = (now - call.started) * 1000
+            stats.calls += 1
+            stats.samples.append(latency_ms)
+            stats.max_ms = max(stats.max_ms, latency_ms)
+            if not ok:
+                stats.failures += 1
+            elif not call.hung:
+                state = self._backends.get(call.backend)
+                if state is not None:
+                    state.consecutive = 0
+
+    def _watch(self):
+        with self._cond:
+            while self._running:
+                self.stats["checks"] += 1
+                now = self.clock()
+                for token, call in list(self._in_flight.items()):
+                    if call.check_at <= now:
+                        self._report_locked(token, call, now)
+                self._wait_until = min((call.check_at for call in self._in_flight.values()), default=math.inf)
+                self._cond.wait(None if self._wait_until == math.inf else max(self._wait_until - now, 0))
+                self._wait_until = None
+
+    def _report(self, token):
+        with self._cond:
+            call = self._in_flight.get(token)
+            if call is not None:
+                self._report_locked(token, call, self.clock())
+
+    def _report_locked(self, token, call, now):
+        """Record a hung call once and restart its backend when the backoff allows"""
+        if not call.hung:
+            call.hung = True
+            self.stats["hangs"] += 1
+            self._sites.setdefault(call.site, _SiteStats(self.samples)).hangs += 1
+            self.recent_hangs.append({"backend": call.backend, "site": call.site, "thread": call.thread,
+                                      "seconds": now - call.started, "at": time.time()})
+            print(f"Watchdog: {call.backend} call {call.site} on {call.thread} "
+                  f"has run {now - call.started:.1f}s (deadline {call.deadline:.1f}s)")
+
+        state = self._backends.get(call.backend)
+        if state is None or state.restarting:
+            call.check_at = math.inf
+            return
+        if now < state.next_restart_at:
+            call.check_at = state.next_restart_at  # look again once the backoff has passed
+            return
+
+        call.check_at = math.inf
+        first, longest = self.restart_backoff
+        state.next_restart_at = now + min(first * 2 ** state.consecutive, longest)
+        state.consecutive += 1
+        state.restarts += 1
+        state.restarting = True
+        self.stats["restarts"] += 1
+        record = {"backend": call.backend, "site": call.site, "thread": call.thread}
+        try:
+            self.executor.submit(self._restart, state, record)
+        except RuntimeError:
+            state.restarting = False  # executor shut down
+
+    def _restart(self, state, record):
+        print(f"Watchdog: restarting {record['backend']} after hung call {record['site']}")
+        try:
+            state.on_hang(record)
+        except Exception as e:
+            print(f"Watchdog restart of {record['backend']} failed: {e}")
+        finally:
+            with self._cond:
+                state.restarting = False
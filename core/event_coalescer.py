@@ -0,0 +1,143 @@
+"""
+Debounced single-flight event coalescing for player event callbacks
+"""
+import asyncio
+import time
+from collections import deque
+
+
+class EventCoalescer:
+    """Turns bursts of player events into as few handler runs as possible.
+
+    post() may be called from any thread. It only appends to a deque and
+    wakes the loop once per burst, so callbacks never block on a lock.
+
+    Each kind waits for its debounce window of quiet (but never longer than
+    max_delay after the first event of the burst), then becomes ready.
+    Ready handlers run one at a time on the loop; events that arrive while a
+    handler runs fold into a single follow-up run, so the latest state wins.
+    A kind that covers others (a full track check covers a progress
+    refresh) absorbs them when it runs.
+
+    While a handler runs, burst_posted_at is the time.perf_counter() of the
+    first event it handles, so latency can be measured from the event itself.
+    """
+
+    def __init__(self, loop, max_delay, name="event-coalescer"):
+        self.loop = loop
+        self.max_delay = max_delay
+        self.name = name
+        self._handlers = {}  # kind -> (coroutine function, debounce, covered kinds)
+        self._order = []  # registration order is run priority
+        self._inbox = deque()
+        self._wake_scheduled = False
+        self._timers = {}  # kind -> debounce TimerHandle
+        self._burst_started = {}  # kind -> loop time of the first event of the burst
+        self._first_posted = {}  # kind -> perf_counter of the first event not handled yet
+        self._ready = set()
+        self._runner = None
+        self._closed = False
+        self.burst_posted_at = None
+        self.stats = {}
+
+    def register(self, kind, handler, debounce, covers=()):
+        self._handlers[kind] = (handler, debounce, frozenset(covers))
+        self._order.append(kind)
+        self.stats[kind] = {"received": 0, "coalesced": 0, "executed": 0}
+
+    def post(self, kind, immediate=False):
+        """Queue an event - safe from any thread"""
+        if self._closed:
+            return
+        self._inbox.append((kind, immediate, time.perf_counter()))
+        # Clearing happens in _drain before the inbox is emptied, so an
+        # event is either drained by a running _drain or schedules a new one
+        if not self._wake_scheduled:
+            self._wake_scheduled = True
+            try:
+                self.loop.call_soon_threadsafe(self._drain)
+            except RuntimeError:
+                pass  # loop closed
+
+    def close(self):
+        """Drop pending work - call on the loop thread"""
+        self._closed = True
+        for timer in self._timers.values():
+            timer.cancel()
+        self._timers.clear()
+        self._ready.clear()
+        self._first_posted.clear()
+        if self._runner and not self._runner.done():
+            self._runner.cancel()
+
+    def get_stats(self):
+        totals = {"received": 0, "coalesced": 0, "executed": 0}
+        for stats in self.stats.values():
+            for name in totals:
+                totals[name] += stats[name]
+        totals["kinds"] = {kind: dict(stats) for kind, stats in self.stats.items()}
+        return totals
+
+    def _drain(self):
+        self._wake_scheduled = False
+        now = self.loop.time()
+        while self._inbox:
+            kind, immediate, posted_at = self._inbox.popleft()
+            stats = self.stats[kind]
+            stats["received"] += 1
+            if kind in self._ready or kind in self._timers:
+                stats["coalesced"] += 1
+            if self._closed:
+                continue
+            self._first_posted.setdefault(kind, posted_at)
+            if kind in self._ready:
+                continue
+
+            timer = self._timers.pop(kind, None)
+            if timer:
+                timer.cancel()
+            started = self._burst_started.setdefault(kind, now)
+            debounce = self._handlers[kind][1]
+            delay = 0 if immediate else min(debounce, max(started + self.max_delay - now, 0))
+            if delay <= 0:
+                self._make_ready(kind)
+            else:
+                self._timers[kind] = self.loop.call_later(delay, self._make_ready, kind)
+
+    def _make_ready(self, kind):
+        self._timers.pop(kind, None)
+        self._burst_started.pop(kind, None)
+        if self._closed:
+            return
+        self._ready.add(kind)
+        if self._runner is None or self._runner.done():
+            self._runner = self.loop.create_task(self._run(), name=self.name)
+
+    def _absorb(self, covered):
+        """A covering run is about to start - drop covered work that is queued or debouncing"""
+        for kind in covered:
+            timer = self._timers.pop(kind, None)
+            if timer:
+                timer.cancel()
+                self._burst_started.pop(kind, None)
+            if kind in self._ready or timer:
+                self._ready.discard(kind)
+                self.stats[kind]["coalesced"] += 1
+
+    async def _run(self):
+        while self._ready and not self._closed:
+            kind = next(k for k in self._order if k in self._ready)
+            self._ready.discard(kind)
+            handler, _, covered = self._handlers[kind]
+            self._absorb(covered)
+            posted = [self._first_posted.pop(k) for k in (kind, *covered) if k in self._first_posted]
+            self.burst_posted_at = min(posted, default=None)
+            self.stats[kind]["executed"] += 1
+            try:
+                await handler()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"Event handler error ({kind}): {e}")
+            finally:
+                self.burst_posted_at = None
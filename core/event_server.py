@@ -0,0 +1,385 @@
+"""
+Local Server-Sent Events feed for overlays - now playing, artwork and progress
+"""
+import asyncio
+import json
+import threading
+import time
+from collections import OrderedDict
+from urllib.parse import parse_qs
+from config.settings import (EVENT_SERVER_HOST, EVENT_SERVER_PORT, EVENT_SERVER_CLIENT_BUFFER,
+                             EVENT_SERVER_KEEPALIVE)
+from core.artwork_cache import content_hash
+from core.runtime import get_runtime
+from utils.image_utils import (sniff_content_type, resizing_available, resize_image,
+                               MIN_RESIZE, MAX_RESIZE)
+
+EVENT_NOW_PLAYING = "nowplaying"
+EVENT_ARTWORK = "artwork"
+EVENT_PROGRESS = "progress"
+EVENT_CLEAR = "clear"
+
+REQUEST_TIMEOUT = 5.0  # seconds to receive the request headers
+MAX_REQUEST_BYTES = 8192
+WRITE_BUFFER_HIGH = 64 * 1024  # per-client transport buffer before drain() waits
+
+ARTWORK_PATH = "/artwork"
+ARTWORK_URL_HASH_CHARS = 16
+ARTWORK_VARIANT_CACHE = 8  # resized variants kept in memory
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+
+def artwork_url(digest):
+    """Cache-busting artwork path - changes whenever the image bytes change"""
+    return f"{ARTWORK_PATH}/{digest[:ARTWORK_URL_HASH_CHARS]}"
+
+
+def etag_matches(if_none_match, etag):
+    """If-None-Match check (weak comparison, as RFC 9110 asks for this header)"""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    for tag in if_none_match.split(","):
+        tag = tag.strip()
+        if tag.startswith("W/"):
+            tag = tag[2:]
+        if tag == etag:
+            return True
+    return False
+
+
+class EventHub:
+    """Latest player state plus fan-out to the event server - THREAD SAFE
+
+    Players publish here directly from their update paths. Without a running
+    server the hub only records the latest state, so publishing is cheap.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._state = {}  # event name -> data of the latest event
+        self._listeners = []
+        self._artwork = None  # (hash, bytes, content type) of the published artwork
+
+    def add_listener(self, listener):
+        with self._lock:
+            self._listeners.append(listener)
+
+    def remove_listener(self, listener):
+        with self._lock:
+            if listener in self._listeners:
+                self._listeners.remove(listener)
+
+    def snapshot(self):
+        """Latest event data per kind, in replay order"""
+        with self._lock:
+            return [(event, self._state[event])
+                    for event in (EVENT_NOW_PLAYING, EVENT_ARTWORK, EVENT_PROGRESS)
+                    if event in self._state]
+
+    def publish(self, event, data):
+        with self._lock:
+            if event == EVENT_CLEAR:
+                self._state.clear()
+            else:
+                self._state[event] = data
+            listeners = list(self._listeners)
+        for listener in listeners:
+            listener(event, data)
+
+    def publish_now_playing(self, title, artist, album, player):
+        self.publish(EVENT_NOW_PLAYING, {
+            "title": title, "artist": artist, "album": album, "player": player,
+            "timestamp_unix": time.time(),
+        })
+
+    def publish_artwork(self, data, source):
+        digest = content_hash(data)
+        with self._lock:
+            self._artwork = (digest, data, sniff_content_type(data))
+        self.publish(EVENT_ARTWORK, {
+            "hash": digest, "size": len(data), "source": source, "url": artwork_url(digest),
+            "timestamp_unix": time.time(),
+        })
+
+    def current_artwork(self):
+        """(hash, bytes, content type) of the published artwork, or None.
+
+        Kept across clears, like the artwork file on disk.
+        """
+        with self._lock:
+            return self._artwork
+
+    def publish_progress(self, title, artist, album, position_seconds, duration_seconds,
+                         is_playing, player):
+        self.publish(EVENT_PROGRESS, {
+            "title": title, "artist": artist, "album": album,
+            "position_seconds": position_seconds, "duration_seconds": duration_seconds,
+            "is_playing": is_playing, "player": player, "timestamp_unix": time.time(),
+        })
+
+    def publish_clear(self):
+        self.publish(EVENT_CLEAR, {"timestamp_unix": time.time()})
+
+
+def encode_event(event, data):
+    """Encode one SSE frame"""
+    return f"event: {event}\ndata: {json.dumps(data, separators=(',', ':'))}\n\n".encode("utf-8")
+
+
+class _Client:
+    __slots__ = ("queue", "writer", "dropped")
+
+    def __init__(self, writer, buffer_size):
+        self.queue = asyncio.Queue(maxsize=buffer_size)
+        self.writer = writer
+        self.dropped = False
+
+
+class EventServer:
+    """Embedded HTTP server streaming hub events as Server-Sent Events.
+
+    Routes: GET /events (SSE stream, snapshot first), GET /state (JSON snapshot),
+    GET /artwork and /artwork/<hash> (current artwork from memory, optional
+    ?size=N variant). Each SSE client has a bounded buffer; a client that falls
+    behind is dropped instead of slowing down everyone else.
+
+    Artwork responses carry a strong ETag from the content hash and answer
+    If-None-Match with 304, so polling an unchanged cover sends no image data.
+    /artwork is revalidated on every request; the hashed URL from the artwork
+    event never changes content and may be cached for good.
+    """
+
+    def __init__(self, hub, host=EVENT_SERVER_HOST, port=EVENT_SERVER_PORT,
+                 client_buffer=EVENT_SERVER_CLIENT_BUFFER, keepalive=EVENT_SERVER_KEEPALIVE):
+        self.hub = hub
+        self.host = host
+        self.port = port
+        self.client_buffer = client_buffer
+        self.keepalive = keepalive
+        self.loop = None
+        self._server = None
+        self._clients = set()
+        self._connections = set()  # handler tasks, loop thread only
+        self._variants = OrderedDict()  # (hash, size) -> resized PNG bytes, loop thread only
+        self.stats = {"connections": 0, "events_sent": 0, "clients_dropped": 0,
+                      "artwork_requests": 0, "artwork_not_modified": 0, "artwork_bytes_sent": 0,
+                      "artwork_resized": 0}
+
+    def start(self):
+        """Start serving on the shared runtime loop"""
+        if self._server is not None:
+            return True
+        runtime = get_runtime()
+        self.loop = runtime.loop
+        try:
+            runtime.spawn(self._start_server(), "event-server-start").result(timeout=5.0)
+        except Exception as e:
+            print(f"Event server error: {e}")
+            self._server = None
+        return self._server is not None
+
+    def stop(self):
+        """Disconnect clients and stop serving"""
+        self.hub.remove_listener(self._on_hub_event)
+        if self._server is not None and self.loop and self.loop.is_running():
+            try:
+                get_runtime().spawn(self._stop_server(), "event-server-stop").result(timeout=5.0)
+            except Exception as e:
+                print(f"Event server stop error: {e}")
+        self._server = None
+        print("Event server stopped")
+
+    def get_stats(self):
+        stats = dict(self.stats)
+        stats["clients"] = len(self._clients)
+        return stats
+
+    async def _start_server(self):
+        self._server = await asyncio.start_server(self._handle_connection, self.host, self.port,
+                                                  limit=MAX_REQUEST_BYTES, backlog=1024)
+        self.port = self._server.sockets[0].getsockname()[1]
+        self.hub.add_listener(self._on_hub_event)
+        print(f"Event server listening on http://{self.host}:{self.port}/events")
+
+    async def _stop_server(self):
+        self._server.close()
+        for client in list(self._clients):
+            client.writer.transport.abort()
+        connections = list(self._connections)
+        for task in connections:
+            task.cancel()
+        if connections:
+            await asyncio.gather(*connections, return_exceptions=True)
+        await self._server.wait_closed()
+
+    def _on_hub_event(self, event, data):
+        """Hub listener - runs on the publishing thread"""
+        if not self._clients or self.loop is None or self.loop.is_closed():
+            return
+        frame = encode_event(event, data)
+        try:
+            self.loop.call_soon_threadsafe(self._broadcast, frame)
+        except RuntimeError:
+            pass  # loop shutting down
+
+    def _broadcast(self, frame):
+        for client in list(self._clients):
+            try:
+                client.queue.put_nowait(frame)
+            except asyncio.QueueFull:
+                self._drop_client(client)
+
+    def _drop_client(self, client):
+        if client.dropped:
+            return
+        client.dropped = True
+        self._clients.discard(client)
+        self.stats["clients_dropped"] += 1
+        client.writer.transport.abort()
+
+    async def _handle_connection(self, reader, writer):
+        task = asyncio.current_task()
+        task.set_name("event-server-client")
+        self._connections.add(task)
+        try:
+            request = await asyncio.wait_for(reader.readuntil(b"\r\n\r\n"), REQUEST_TIMEOUT)
+            lines = request.decode("latin-1").split("\r\n")
+            parts = lines[0].split()
+            method, target = (parts[0], parts[1]) if len(parts) >= 2 else ("", "")
+            path, _, query = target.partition("?")
+            headers = {}
+            for line in lines[1:]:
+                name, sep, value = line.partition(":")
+                if sep:
+                    headers[name.strip().lower()] = value.strip()
+
+            if method != "GET":
+                await self._send_simple(writer, "405 Method Not Allowed", b"")
+            elif path == "/events":
+                await self._stream_events(writer)
+            elif path == "/state":
+                body = json.dumps(dict(self.hub.snapshot())).encode("utf-8")
+                await self._send_simple(writer, "200 OK", body, "application/json")
+            elif path == ARTWORK_PATH or path.startswith(ARTWORK_PATH + "/"):
+                await self._serve_artwork(writer, path, query, headers)
+            else:
+                await self._send_simple(writer, "404 Not Found", b"")
+        except (asyncio.TimeoutError, asyncio.IncompleteReadError, asyncio.LimitOverrunError,
+                ConnectionError):
+            pass
+        except Exception as e:
+            print(f"Event server connection error: {e}")
+        finally:
+            self._connections.discard(task)
+            writer.close()
+
+    async def _send_simple(self, writer, status, body, content_type="text/plain", extra_headers=None):
+        extra = "".join(f"{name}: {value}\r\n" for name, value in (extra_headers or {}).items())
+        writer.write((f"HTTP/1.1 {status}\r\nContent-Type: {content_type}\r\n"
+                      f"Content-Length: {len(body)}\r\nAccess-Control-Allow-Origin: *\r\n"
+                      f"{extra}Connection: close\r\n\r\n").encode("latin-1") + body)
+        await writer.drain()
+
+    async def _serve_artwork(self, writer, path, query, headers):
+        self.stats["artwork_requests"] += 1
+        artwork = self.hub.current_artwork()
+        if artwork is None:
+            await self._send_simple(writer, "404 Not Found", b"")
+            return
+        digest, data, content_type = artwork
+
+        # /artwork/<hash> only ever serves that exact image
+        pinned = path != ARTWORK_PATH
+        if pinned and path[len(ARTWORK_PATH) + 1:] != digest[:ARTWORK_URL_HASH_CHARS]:
+            await self._send_simple(writer, "404 Not Found", b"")
+            return
+
+        size = None
+        size_values = parse_qs(query).get("size")
+        if size_values and resizing_available():
+            try:
+                size = min(max(int(size_values[0]), MIN_RESIZE), MAX_RESIZE)
+            except ValueError:
+                await self._send_simple(writer, "400 Bad Request", b"size must be an integer")
+                return
+
+        etag = f'"{digest}-{size}"' if size else f'"{digest}"'
+        cache_headers = {
+            "ETag": etag,
+            "Cache-Control": IMMUTABLE_CACHE_CONTROL if pinned else "no-cache",
+        }
+        if etag_matches(headers.get("if-none-match"), etag):
+            self.stats["artwork_not_modified"] += 1
+            await self._send_simple(writer, "304 Not Modified", b"", content_type, cache_headers)
+            return
+
+        if size:
+            variant = await self._artwork_variant(digest, data, size)
+            if variant is not None:
+                data, content_type = variant, "image/png"
+            else:
+                cache_headers["ETag"] = f'"{digest}"'
+
+        self.stats["artwork_bytes_sent"] += len(data)
+        await self._send_simple(writer, "200 OK", data, content_type, cache_headers)
+
+    async def _artwork_variant(self, digest, data, size):
+        """Resized artwork, computed once per (image, size) off the loop thread"""
+        key = (digest, size)
+        variant = self._variants.get(key)
+        if variant is not None:
+            self._variants.move_to_end(key)
+            return variant
+
+        variant = await self.loop.run_in_executor(None, resize_image, data, size)
+        if variant is None:
+            return None
+        self.stats["artwork_resized"] += 1
+        self._variants[key] = variant
+        while len(self._variants) > ARTWORK_VARIANT_CACHE:
+            self._variants.popitem(last=False)
+        return variant
+
+    async def _stream_events(self, writer):
+        writer.transport.set_write_buffer_limits(high=WRITE_BUFFER_HIGH)
+        writer.write(b"HTTP/1.1 200 OK\r\nContent-Type: text/event-stream\r\n"
+                     b"Cache-Control: no-cache\r\nConnection: keep-alive\r\n"
+                     b"Access-Control-Allow-Origin: *\r\n\r\n")
+
+        client = _Client(writer, self.client_buffer)
+        self._clients.add(client)
+        self.stats["connections"] += 1
+
+        try:
+            # Snapshot first so a fresh overlay renders immediately
+            for event, data in self.hub.snapshot():
+                writer.write(encode_event(event, data))
+            await writer.drain()
+
+            while not client.dropped:
+                try:
+                    frame = await asyncio.wait_for(client.queue.get(), self.keepalive)
+                    self.stats["events_sent"] += 1
+                except asyncio.TimeoutError:
+                    frame = b": keepalive\n\n"
+                writer.write(frame)
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            self._clients.discard(client)
+
+
+_shared_hub = None
+_shared_hub_lock = threading.Lock()
+
+
+def get_event_hub():
+    """Get the process-wide event hub"""
+    global _shared_hub
+    with _shared_hub_lock:
+        if _shared_hub is None:
+            _shared_hub = EventHub()
+        return _shared_hub
@@ -5,15 +5,20 @@ import os
 import shutil
 import time
 import threading
-from config.settings import OUTPUT_FILE, ARTWORK_FILE, PROGRESS_FILE, DEFAULT_ARTWORK
+from core.io_writer import get_io_writer
+from core.tracing import annotate, span
+from utils.http_client import get_http_client
+from config.settings import OUTPUT_FILE, ARTWORK_FILE, PROGRESS_FILE, DEFAULT_ARTWORK, ARTWORK_READ_TIMEOUT, IO_WRITER_FLUSH_TIMEOUT
 
 class FileManager:
-    def __init__(self):
+    def __init__(self, writer=None):
         self.output_file = OUTPUT_FILE
         self.artwork_file = ARTWORK_FILE
         self.progress_file = PROGRESS_FILE
         self.default_artwork = DEFAULT_ARTWORK
         self._write_lock = threading.Lock()
+        self._default_artwork_data = None
+        self.writer = writer or get_io_writer()
         
         # Debug: Show resolved paths
         print(f"FileManager initialized:")
@@ -21,43 +26,22 @@ class FileManager:
         print(f"  Artwork file: {os.path.abspath(self.artwork_file)}")
         print(f"  Progress file: {os.path.abspath(self.progress_file)}")
     
-    def write_now_playing(self, title="", artist="", album=""):
-        """Write current track info to nowplaying.txt - THREAD SAFE"""
-        with self._write_lock:
-            try:
-                output_path = os.path.abspath(self.output_file)
-                
-                # Ensure directory exists
-                os.makedirs(os.path.dirname(output_path), exist_ok=True)
-                
-                # Write to temp file first, then rename for atomic operation
-                temp_path = output_path + ".tmp"
-                
-                with open(temp_path, "w", encoding="utf-8") as f:
-                    if title or artist or album:
-                        content = f"{artist}\n{title}\n{album}"
-                        f.write(content)
-                        print(f"Writing nowplaying: {artist} - {title}")
-                    else:
-                        f.write("")
-                        print("Clearing nowplaying.txt")
-                
-                # Atomic rename
-                if os.path.exists(output_path):
-                    os.remove(output_path)
-                os.rename(temp_path, output_path)
-                
-                return True
-            except Exception as e:
-                print(f"ERROR writing now playing file: {e}")
-                # Clean up temp file
-                temp_path = output_path + ".tmp"
-                try:
-                    if os.path.exists(temp_path):
-                        os.remove(temp_path)
-                except:
-                    pass
-                return False
+    def write_now_playing(self, title="", artist="", album="", artwork=None):
+        """Queue current track info for nowplaying.txt - NON BLOCKING
+        
+        Artwork bytes passed along are published in the same snapshot generation.
+        """
+        if title or artist or album:
+            content = f"{artist}\n{title}\n{album}"
+            print(f"Writing nowplaying: {artist} - {title}")
+        else:
+            content = ""
+            print("Clearing nowplaying.txt")
+        
+        files = {self.output_file: content.encode("utf-8")}
+        if artwork:
+            files[self.artwork_file] = artwork
+        return self.writer.submit_many(files)
     
     def clear_now_playing(self):
         """Clear the now playing file"""
@@ -65,7 +49,7 @@ class FileManager:
     
     def safe_move_file(self, src_path, dst_path):
         """Safely move a file across drives or within same drive - THREAD SAFE"""
-        with self._write_lock:
+        with span("file.move", "disk", src=src_path, dst=dst_path), self._write_lock:
             try:
                 print(f"Moving file: {src_path} -> {dst_path}")
                 
@@ -90,100 +74,98 @@ class FileManager:
                 print(f"ERROR moving file from {src_path} to {dst_path}: {e}")
                 return False
     
-    def save_artwork_from_url(self, url):
-        """Save artwork from URL - ENHANCED"""
-        try:
-            print(f"Downloading artwork from: {url}")
-            
-            import requests
-            
-            # Enhanced headers to avoid blocking
-            headers = {
-                'User-Agent': 'ANP-TrayApp/1.0 (Windows; Music Player Integration)',
-                'Accept': 'image/*,*/*;q=0.8',
-                'Accept-Language': 'en-US,en;q=0.5',
-                'Accept-Encoding': 'gzip, deflate',
-                'Connection': 'keep-alive',
-            }
-            
-            response = requests.get(url, headers=headers, timeout=15, stream=True)
-            
-            if response.status_code == 200:
-                artwork_path = os.path.abspath(self.artwork_file)
-                os.makedirs(os.path.dirname(artwork_path), exist_ok=True)
+    def download_artwork(self, url):
+        """Download artwork bytes from URL - ENHANCED"""
+        with span("artwork.download", "http", url=url):
+            try:
+                print(f"Downloading artwork from: {url}")
                 
-                # Write to temp file first
-                temp_path = artwork_path + ".tmp"
+                # Image-specific headers; the shared client adds UA and keep-alive
+                headers = {
+                    'Accept': 'image/*,*/*;q=0.8',
+                }
                 
-                with open(temp_path, 'wb') as f:
-                    for chunk in response.iter_content(chunk_size=8192):
-                        if chunk:
-                            f.write(chunk)
+                response = get_http_client().get(url, read_timeout=ARTWORK_READ_TIMEOUT,
+                                                 headers=headers, stream=True)
                 
-                # Verify file size
-                file_size = os.path.getsize(temp_path)
-                if file_size > 0:
-                    # Atomic move
-                    success = self.safe_move_file(temp_path, artwork_path)
-                    if success:
-                        print(f"URL artwork saved: {artwork_path} ({file_size} bytes)")
-                        return True
+                with response:
+                    annotate(status=response.status_code)
+                    if response.status_code == 200:
+                        data = bytearray()
+                        for chunk in response.iter_content(chunk_size=8192):
+                            if chunk:
+                                data.extend(chunk)
+                        
+                        if data:
+                            annotate(bytes=len(data))
+                            return bytes(data)
+                        print("Downloaded file is empty")
+                        return None
                     else:
-                        print("Failed to move downloaded artwork")
-                        return False
-                else:
-                    print("Downloaded file is empty")
-                    try:
-                        os.remove(temp_path)
-                    except:
-                        pass
-                    return False
-            else:
-                print(f"HTTP error {response.status_code} downloading artwork")
-                return False
-                
-        except Exception as e:
-            print(f"ERROR saving artwork from URL: {e}")
+                        print(f"HTTP error {response.status_code} downloading artwork")
+                        return None
+                    
+            except Exception as e:
+                print(f"ERROR downloading artwork from URL: {e}")
+                return None
+    
+    def save_artwork_bytes(self, data):
+        """Queue artwork bytes for the artwork file - NON BLOCKING"""
+        if not data:
             return False
+        
+        print(f"Saving artwork: {os.path.abspath(self.artwork_file)} ({len(data)} bytes)")
+        return self.writer.submit(self.artwork_file, data)
     
-    def save_default_artwork(self):
-        """Copy default artwork as fallback"""
+    def save_artwork_from_url(self, url):
+        """Save artwork from URL - ENHANCED"""
+        with span("artwork.save_from_url", "artwork", url=url):
+            data = self.download_artwork(url)
+            if not data:
+                return False
+            return self.save_artwork_bytes(data)
+    
+    def load_default_artwork(self):
+        """Read default artwork bytes (kept in memory after the first read)"""
+        if self._default_artwork_data:
+            return self._default_artwork_data
+        
         try:
-            print("Applying default artwork...")
-            artwork_path = os.path.abspath(self.artwork_file)
             default_path = os.path.abspath(self.default_artwork)
             
             if not os.path.exists(default_path):
                 print(f"Default artwork not found: {default_path}")
-                return False
-            
-            os.makedirs(os.path.dirname(artwork_path), exist_ok=True)
+                return None
             
-            # Read default artwork
             with open(default_path, 'rb') as src:
                 data = src.read()
             
             if not data:
                 print("Default artwork file is empty")
-                return False
+                return None
             
-            # Write to temp file first
-            temp_path = artwork_path + ".tmp"
-            with open(temp_path, 'wb') as dst:
-                dst.write(data)
+            self._default_artwork_data = data
+            return data
             
-            # Atomic move
-            success = self.safe_move_file(temp_path, artwork_path)
-            if success:
-                print(f"Default artwork saved: {artwork_path} ({len(data)} bytes)")
-                return True
-            else:
-                print("Failed to save default artwork")
-                return False
-                
         except Exception as e:
-            print(f"ERROR copying default artwork: {e}")
+            print(f"ERROR reading default artwork: {e}")
+            return None
+    
+    def save_default_artwork(self):
+        """Copy default artwork as fallback"""
+        print("Applying default artwork...")
+        data = self.load_default_artwork()
+        if not data:
             return False
+        return self.save_artwork_bytes(data)
+    
+    def flush(self, timeout=IO_WRITER_FLUSH_TIMEOUT):
+        """Wait for queued writes to reach the disk"""
+        return self.writer.flush(timeout)
+    
+    def get_io_stats(self):
+        """Get write-behind queue depth and latency counters"""
+        return self.writer.get_stats()
     
     def ensure_directories_exist(self):
         """Ensure all required directories exist"""
@@ -0,0 +1,212 @@
+"""
+Write-behind I/O service - all output files are written by one drain job at a time
+"""
+import hashlib
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from core.snapshot_publisher import SnapshotPublisher
+from core.runtime import get_runtime
+from core.track_latency import get_track_latency
+from core.tracing import annotate
+from config.settings import IO_WRITER_FLUSH_TIMEOUT, CALL_DEADLINE_DISK
+
+
+class _TargetStats:
+    __slots__ = ("queued", "superseded", "written", "elided", "failed",
+                 "last_latency_ms", "max_latency_ms", "total_latency_ms")
+
+    def __init__(self):
+        self.queued = 0
+        self.superseded = 0
+        self.written = 0
+        self.elided = 0
+        self.failed = 0
+        self.last_latency_ms = 0.0
+        self.max_latency_ms = 0.0
+        self.total_latency_ms = 0.0
+
+    def as_dict(self):
+        stats = {name: getattr(self, name) for name in self.__slots__}
+        stats["avg_latency_ms"] = (self.total_latency_ms / self.written) if self.written else 0.0
+        return stats
+
+
+class WriteBehindWriter:
+    """Queues whole-file replacements per output target and writes them in the background.
+
+    Every write replaces the full file, so each target's queue is bounded to a
+    single pending write: a newer write for the same target supersedes the
+    queued one and only the latest snapshot ever reaches the disk. Writes whose
+    bytes match what was last written to a target are elided, so watchers that
+    reload on mtime only see real changes. Each drained batch is handed to the
+    SnapshotPublisher as one generation, so files submitted together with
+    submit_many() are replaced back to back in reader-safe order (text last) -
+    see SnapshotPublisher for the window in between.
+
+    A submit schedules a drain job on the writer's own single-thread
+    executor unless one is already running, and the job exits once the
+    queue is empty. The runtime's shared executor is left to network and
+    CPU work, so a stalled lookup never holds up nowplaying.txt.
+    """
+
+    def __init__(self, publisher=None, executor=None, budget=None, latency=None):
+        self.publisher = publisher or SnapshotPublisher()
+        self.executor = executor
+        self._owns_executor = False
+        self.budget = budget
+        self.latency = latency or get_track_latency()
+        self._cond = threading.Condition()
+        self._pending = {}  # path -> (data, enqueued_at)
+        self._stats = {}  # path -> _TargetStats
+        self._digests = {}  # path -> digest of the bytes last written
+        self._busy = False  # a drain job is scheduled or running
+        self._running = False
+
+    def start(self):
+        """Start accepting writes"""
+        with self._cond:
+            if self._running:
+                return
+            self._running = True
+            if self.executor is None:
+                self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="io-writer")
+                self._owns_executor = True
+            if self.budget is None:
+                self.budget = get_runtime().budget
+        print("Write-behind I/O service started")
+
+    def submit(self, path, data):
+        """Queue a full replacement of path with data - never blocks on disk - THREAD SAFE"""
+        return self.submit_many({path: data})
+
+    def submit_many(self, files):
+        """Queue {path: bytes} so all of them land in the same generation - THREAD SAFE"""
+        if not self._running:
+            self.start()
+
+        now = time.perf_counter()
+        with self._cond:
+            for path, data in files.items():
+                path = os.path.abspath(path)
+                stats = self._stats.setdefault(path, _TargetStats())
+                stats.queued += 1
+                if path in self._pending:
+                    stats.superseded += 1
+                self._pending[path] = (data, now)
+            schedule = not self._busy
+            self._busy = True
+            executor = self.executor
+
+        if schedule:
+            try:
+                executor.submit(self._drain)
+            except (AttributeError, RuntimeError):
+                self._drain()  # executor already shut down - write inline
+        return True
+
+    def flush(self, timeout=IO_WRITER_FLUSH_TIMEOUT):
+        """Wait until every queued write has reached the disk"""
+        deadline = time.monotonic() + timeout
+        with self._cond:
+            while self._pending or self._busy:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0 or not self._running:
+                    return False
+                self._cond.wait(remaining)
+        return True
+
+    def stop(self, timeout=IO_WRITER_FLUSH_TIMEOUT):
+        """Drain pending writes and stop accepting new ones"""
+        self.flush(timeout)
+        with self._cond:
+            self._running = False
+            self._cond.notify_all()
+            executor = self.executor if self._owns_executor else None
+            if executor is not None:
+                self.executor = None
+                self._owns_executor = False
+        if executor is not None:
+            executor.shutdown(wait=False)
+        print("Write-behind I/O service stopped")
+
+    def get_queue_depth(self):
+        """Number of targets with a write waiting"""
+        with self._cond:
+            return len(self._pending)
+
+    def get_stats(self):
+        """Get queue depth and per-file write counters"""
+        with self._cond:
+            return {
+                "queue_depth": len(self._pending),
+                "targets": {os.path.basename(path): stats.as_dict()
+                            for path, stats in self._stats.items()},
+            }
+
+    def _drain(self):
+        """Executor job: write batches until the queue is empty"""
+        try:
+            self._drain_batches()
+        except Exception as e:
+            print(f"Write-behind drain error: {e}")
+            with self._cond:
+                self._busy = False
+                self._cond.notify_all()
+
+    def _drain_batches(self):
+        while True:
+            with self._cond:
+                if not self._pending:
+                    self._busy = False
+                    self._cond.notify_all()
+                    return
+
+                batch = list(self._pending.items())
+                self._pending.clear()
+
+            changed = {}
+            landed = {}  # path -> enqueued_at of what is on disk now, for the latency tracker
+            for path, (data, enqueued_at) in batch:
+                digest = hashlib.blake2b(data, digest_size=16).digest()
+                if self._digests.get(path) == digest and os.path.exists(path):
+                    with self._cond:
+                        self._stats[path].elided += 1
+                    landed[path] = enqueued_at
+                    continue
+                changed[path] = (data, enqueued_at, digest)
+
+            with self.budget.call("disk", "disk.publish", CALL_DEADLINE_DISK):
+                annotate(files=len(changed), bytes=sum(len(item[0]) for item in changed.values()))
+                results = self.publisher.publish({path: item[0] for path, item in changed.items()})
+
+            for path, (data, enqueued_at, digest) in changed.items():
+                latency_ms = (time.perf_counter() - enqueued_at) * 1000
+                with self._cond:
+                    stats = self._stats[path]
+                    if results.get(path):
+                        landed[path] = enqueued_at
+                        self._digests[path] = digest
+                        stats.written += 1
+                        stats.last_latency_ms = latency_ms
+                        stats.total_latency_ms += latency_ms
+                        stats.max_latency_ms = max(stats.max_latency_ms, latency_ms)
+                    else:
+                        self._digests.pop(path, None)
+                        stats.failed += 1
+
+            self.latency.files_published(landed)
+
+
+_shared_writer = None
+_shared_writer_lock = threading.Lock()
+
+
+def get_io_writer():
+    """Get the process-wide write-behind writer"""
+    global _shared_writer
+    with _shared_writer_lock:
+        if _shared_writer is None:
+            _shared_writer = WriteBehindWriter()
+        return _shared_writer
@@ -0,0 +1,103 @@
+"""
+Output arbitration between concurrently monitored players
+"""
+import threading
+import time
+
+ARBITRATION_RECENT = "recent"
+ARBITRATION_PRIORITY = "priority"
+
+
+class PlayerArbiter:
+    """Decides which of several monitored players owns the outputs.
+
+    Players report whether they are active (a track is shown) or idle
+    (cleared). Among active players the owner is the one that most recently
+    started playing (ARBITRATION_RECENT) or the one listed first in the
+    priority list (ARBITRATION_PRIORITY); priority also breaks ties. When
+    nothing is active the last owner keeps the outputs, so its clear goes
+    through and ownership never moves to an idle player.
+
+    on_handover(previous, owner, reporter) is called with the arbiter's lock
+    held whenever the owner changes. reporter is the player whose
+    report caused it - when that is not the new owner, the new owner has to
+    re-publish its state because it has nothing new to say by itself.
+
+    Players hold `lock` while checking ownership and writing, so a handover
+    can never interleave with a write from the previous owner.
+    """
+
+    def __init__(self, priority, rule=ARBITRATION_RECENT, on_handover=None, clock=time.monotonic):
+        self.priority = list(priority)
+        self.rule = rule
+        self.on_handover = on_handover
+        self.clock = clock
+        self.lock = threading.RLock()
+        self.owner = None
+        self._active_since = {}  # name -> clock time the player became active
+        self.stats = {"reports": 0, "handovers": 0}
+
+    def report(self, name, active):
+        """Record a player's state and re-evaluate ownership - returns the owner"""
+        with self.lock:
+            self.stats["reports"] += 1
+            if active:
+                self._active_since.setdefault(name, self.clock())
+            else:
+                self._active_since.pop(name, None)
+            self._evaluate(name)
+            return self.owner
+
+    def prefer(self, name):
+        """Move a player to the front of the priority list and hand over to it if active"""
+        with self.lock:
+            if name in self.priority:
+                self.priority.remove(name)
+            self.priority.insert(0, name)
+            if name in self._active_since:
+                # An explicit choice counts as the most recent start
+                self._active_since[name] = self.clock()
+            self._evaluate(None)
+            return self.owner
+
+    def forget(self, name):
+        """A player stopped being monitored"""
+        return self.report(name, False)
+
+    def is_owner(self, name):
+        return self.owner == name
+
+    def is_active(self, name):
+        return name in self._active_since
+
+    def _rank(self, name):
+        try:
+            return self.priority.index(name)
+        except ValueError:
+            return len(self.priority)
+
+    def _choose(self):
+        if not self._active_since:
+            return self.owner
+        if self.rule == ARBITRATION_PRIORITY:
+            return min(self._active_since, key=self._rank)
+        return min(self._active_since, key=lambda name: (-self._active_since[name], self._rank(name)))
+
+    def _evaluate(self, reporter):
+        owner = self._choose()
+        if owner == self.owner:
+            return
+        previous, self.owner = self.owner, owner
+        self.stats["handovers"] += 1
+        if self.on_handover:
+            try:
+                self.on_handover(previous, owner, reporter)
+            except Exception as e:
+                print(f"Player handover error: {e}")
+
+    def get_stats(self):
+        with self.lock:
+            stats = dict(self.stats)
+            stats["owner"] = self.owner
+            stats["active"] = sorted(self._active_since, key=self._rank)
+            return stats
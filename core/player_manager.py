@@ -1,8 +1,12 @@
 """
 Player management and orchestration
 """
+import threading
 from players.apple_music import AppleMusicPlayer
-from config.settings import PLAYER_APPLE_MUSIC, PLAYER_ITUNES
+from core.player_arbiter import PlayerArbiter
+from core.runtime import get_runtime
+from config.settings import (PLAYER_APPLE_MUSIC, PLAYER_ITUNES, PLAYER_MONITOR_MODE, PLAYER_PRIORITY,
+                             PLAYER_ARBITRATION, PLAYER_ISOLATION, PLAYER_REPROBE_INTERVAL)
 
 # Try to import iTunes player, but handle COM conflicts gracefully
 try:
@@ -15,26 +19,70 @@ except (ImportError, OSError) as e:
     iTunesPlayer = None
 
 class PlayerManager:
-    def __init__(self, file_manager, progress_tracker, artwork_manager):
+    def __init__(self, file_manager, progress_tracker, artwork_manager, monitor_mode=PLAYER_MONITOR_MODE,
+                 players=None, isolation=PLAYER_ISOLATION):
         self.file_manager = file_manager
         self.progress_tracker = progress_tracker
         self.artwork_manager = artwork_manager
+        self.monitor_mode = monitor_mode
+        self.supervisor = None
         
-        # Initialize players
-        print("Initializing Apple Music player...")
-        self.players = {
-            PLAYER_APPLE_MUSIC: AppleMusicPlayer(file_manager, progress_tracker, artwork_manager)
-        }
-        
-        # Only add iTunes if available
-        if ITUNES_AVAILABLE and iTunesPlayer:
-            print("Initializing iTunes player...")
-            self.players[PLAYER_ITUNES] = iTunesPlayer(file_manager, progress_tracker, artwork_manager)
+        if players is not None:
+            self.players = dict(players)
+        elif isolation == "process":
+            self.players = self._create_remote_players()
+        else:
+            # Initialize players
+            print("Initializing Apple Music player...")
+            self.players = {
+                PLAYER_APPLE_MUSIC: AppleMusicPlayer(file_manager, progress_tracker, artwork_manager)
+            }
+            
+            # Only add iTunes if available
+            if ITUNES_AVAILABLE and iTunesPlayer:
+                print("Initializing iTunes player...")
+                self.players[PLAYER_ITUNES] = iTunesPlayer(file_manager, progress_tracker, artwork_manager)
         
         self.current_player = None
         self.current_player_name = PLAYER_APPLE_MUSIC  # Default
         
-        print(f"Player manager initialized with players: {list(self.players.keys())}")
+        # Concurrent mode: every player runs, the arbiter picks whose updates reach the outputs
+        self.arbiter = None
+        self.monitored = []
+        self._monitor_lock = threading.Lock()
+        self._reprobe_timer = None  # re-checks players that were not available yet
+        self._reprobe_deferrable = None
+        self._shut_down = False
+        if self.is_concurrent():
+            priority = [name for name in PLAYER_PRIORITY if name in self.players]
+            priority += [name for name in self.players if name not in priority]
+            self.arbiter = PlayerArbiter(priority, PLAYER_ARBITRATION, on_handover=self._on_handover)
+            for player in self.players.values():
+                player.arbiter = self.arbiter
+            self.current_player_name = priority[0]
+        
+        print(f"Player manager initialized with players: {list(self.players.keys())} ({monitor_mode} mode)")
+    
+    def _create_remote_players(self):
+        """Process isolation: each backend runs in a worker process the supervisor restarts"""
+        from core.backend_supervisor import BackendSupervisor
+        from core.backend_worker import BACKEND_APPLE_MUSIC, BACKEND_ITUNES
+        from players.remote_player import RemotePlayer
+        
+        self.supervisor = BackendSupervisor()
+        backends = [(PLAYER_APPLE_MUSIC, BACKEND_APPLE_MUSIC)]
+        if ITUNES_AVAILABLE:
+            backends.append((PLAYER_ITUNES, BACKEND_ITUNES))
+        players = {}
+        for name, kind in backends:
+            print(f"Initializing {name} player in a worker process...")
+            players[name] = RemotePlayer(name, kind, self.file_manager, self.progress_tracker,
+                                         self.artwork_manager, self.supervisor)
+        return players
+    
+    def is_concurrent(self):
+        """Check whether all players are monitored at once"""
+        return self.monitor_mode == "concurrent"
     
     def get_available_players(self):
         """Get list of available players"""
@@ -46,10 +94,14 @@ class PlayerManager:
     
     def get_current_player_name(self):
         """Get the name of the current player"""
+        if self.arbiter and self.arbiter.owner:
+            return self.arbiter.owner
         return self.current_player_name
     
     def get_current_player(self):
         """Get the current player instance"""
+        if self.arbiter:
+            return self.players.get(self.get_current_player_name())
         return self.current_player
     
     def switch_to_player(self, player_name):
@@ -60,10 +112,17 @@ class PlayerManager:
             print(f"Player not available: {player_name}")
             return False
         
-        # Stop current player if running
+        if self.arbiter:
+            # Everything keeps running - only the preference changes
+            self.current_player_name = player_name
+            self.arbiter.prefer(player_name)
+            print(f"Preferring {player_name} (owner: {self.arbiter.owner or 'none'})")
+            return player_name in self.monitored
+        
+        # Current player stays warm in standby so switching back is quick
         if self.current_player:
-            print(f"Stopping current player: {self.current_player_name}")
-            self.current_player.stop_monitoring()
+            print(f"Putting current player in standby: {self.current_player_name}")
+            self.current_player.standby()
         
         # Switch to new player
         self.current_player_name = player_name
@@ -84,17 +143,112 @@ class PlayerManager:
     
     def start_default_player(self):
         """Start the default player"""
+        if self.arbiter:
+            return self.start_all_players()
         return self.switch_to_player(self.current_player_name)
     
+    def start_all_players(self, quiet=False):
+        """Concurrent mode: start monitoring every available player.
+        
+        Players that are not available yet (e.g. iTunes not launched) are
+        checked again every PLAYER_REPROBE_INTERVAL until they are.
+        """
+        with self._monitor_lock:
+            if self._shut_down:
+                return False
+            started = False
+            skipped = []
+            for player_name in self.arbiter.priority:
+                player = self.players[player_name]
+                if player_name in self.monitored:
+                    continue
+                if not quiet:
+                    print(f"Checking if {player_name} is available...")
+                if not player.is_available():
+                    if not quiet:
+                        print(f"Player {player_name} is not available on this system")
+                    skipped.append(player_name)
+                    continue
+                print(f"Starting monitoring for {player_name}")
+                player.start_monitoring()
+                self.monitored.append(player_name)
+                started = True
+            if started or not quiet:
+                print(f"Monitoring concurrently: {self.monitored}")
+            self._schedule_reprobe(bool(skipped))
+            return bool(self.monitored)
+    
+    def _schedule_reprobe(self, needed):
+        """Keep the re-probe timer running while some player is missing - _monitor_lock held.
+        
+        The timer is deferrable while another player is monitored, riding on
+        the wakeups that player causes anyway; with nothing monitored nothing
+        else would wake the process, so it has to wake it by itself.
+        """
+        deferrable = bool(self.monitored)
+        if self._reprobe_timer and (not needed or deferrable != self._reprobe_deferrable):
+            self._reprobe_timer.cancel()
+            self._reprobe_timer = None
+        if needed and not self._reprobe_timer:
+            self._reprobe_deferrable = deferrable
+            self._reprobe_timer = get_runtime().call_every(PLAYER_REPROBE_INTERVAL, self._reprobe,
+                                                           name="player-reprobe", deferrable=deferrable)
+    
+    def _reprobe(self):
+        """Timer callback - availability checks can block, so they run on the executor"""
+        get_runtime().run_blocking(self.start_all_players, True)
+    
+    def _on_handover(self, previous, owner, reporter):
+        """Arbiter callback (lock held) - the new owner shows its state without clearing first"""
+        print(f"Output handover: {previous or 'none'} -> {owner}")
+        if owner != reporter:
+            self.players[owner].republish()
+    
+    def get_arbiter_stats(self):
+        """Arbitration counters, or None in single-player mode"""
+        if not self.arbiter:
+            return None
+        stats = self.arbiter.get_stats()
+        stats["monitored"] = list(self.monitored)
+        return stats
+    
+    def get_worker_stats(self):
+        """Backend process state per player, or None when backends run in-process"""
+        if not self.supervisor:
+            return None
+        return self.supervisor.get_stats()
+    
     def shutdown(self):
         """Shutdown all players"""
         print("Shutting down player manager...")
+        with self._monitor_lock:
+            self._shut_down = True
+            if self._reprobe_timer:
+                self._reprobe_timer.cancel()
+                self._reprobe_timer = None
+        for player_name in self.monitored:
+            print(f"Stopping player: {player_name}")
+            self.players[player_name].stop_monitoring()
+        self.monitored = []
         if self.current_player:
             print(f"Stopping current player: {self.current_player_name}")
             self.current_player.stop_monitoring()
         
+        # Release players kept warm in standby
+        for player in self.players.values():
+            if player is not self.current_player:
+                player.stop_monitoring()
+        
+        # Backend processes go before the final clear so none of them publishes after it
+        if self.supervisor:
+            self.supervisor.shutdown()
+        
+        # Stop artwork workers before the final clear
+        self.artwork_manager.shutdown()
+        
         # Clear all data
         self.file_manager.clear_now_playing()
         self.progress_tracker.clear_progress()
+        self.progress_tracker.close()
         
         print("All players shut down")
\ No newline at end of file
@@ -0,0 +1,101 @@
+"""
+Incremental progress JSON encoder - static track fields are encoded once
+"""
+import json
+import math
+import time
+from utils.time_utils import format_time
+
+
+class ProgressSnapshot:
+    """Compact progress record reused for every tick"""
+    __slots__ = ("title", "artist", "album", "position_seconds", "duration_seconds",
+                 "is_playing", "player")
+
+    def __init__(self):
+        self.title = ""
+        self.artist = ""
+        self.album = ""
+        self.position_seconds = 0
+        self.duration_seconds = 0
+        self.is_playing = False
+        self.player = "Unknown"
+
+
+def _encode_number(value):
+    """Encode a number exactly like json.dumps does"""
+    if type(value) is int:
+        return int.__repr__(value)
+    if math.isfinite(value):
+        return float.__repr__(float(value))
+    return json.dumps(value)
+
+
+class ProgressEncoder:
+    """Produces the same bytes as json.dumps(create_progress_data(...), indent=2).
+
+    Title, artist, album, player and the duration fields only change once per
+    track, so they are encoded when the track changes and kept as string
+    fragments. Each tick only formats the position, percentage, play state and
+    timestamps and joins the fragments.
+    """
+
+    def __init__(self):
+        self._track_key = None
+        self._head = ""
+        self._duration_part = ""
+        self._duration_formatted = ""
+        self._player_part = ""
+        self._timestamp_second = None
+        self._timestamp_text = ""
+        self.tracks_encoded = 0
+
+    def _prepare_track(self, snapshot):
+        key = (snapshot.title, snapshot.artist, snapshot.album, snapshot.player,
+               snapshot.duration_seconds)
+        if key == self._track_key:
+            return
+
+        self._track_key = key
+        self._head = (
+            '{\n  "title": ' + json.dumps(snapshot.title) +
+            ',\n  "artist": ' + json.dumps(snapshot.artist) +
+            ',\n  "album": ' + json.dumps(snapshot.album) +
+            ',\n  "position_seconds": '
+        )
+        self._duration_part = (
+            ',\n  "duration_seconds": ' + _encode_number(snapshot.duration_seconds) +
+            ',\n  "position_formatted": '
+        )
+        self._duration_formatted = (
+            ',\n  "duration_formatted": ' + json.dumps(format_time(snapshot.duration_seconds)) +
+            ',\n  "progress_percentage": '
+        )
+        self._player_part = ',\n  "player": ' + json.dumps(snapshot.player) + ',\n  "timestamp": '
+        self.tracks_encoded += 1
+
+    def _timestamp(self, now):
+        second = int(now)
+        if second != self._timestamp_second:
+            self._timestamp_second = second
+            self._timestamp_text = time.strftime('"%Y-%m-%d %H:%M:%S"', time.gmtime(second))
+        return self._timestamp_text
+
+    def encode(self, snapshot, now=None):
+        """Encode a snapshot to UTF-8 JSON bytes"""
+        if now is None:
+            now = time.time()
+        self._prepare_track(snapshot)
+
+        position = snapshot.position_seconds
+        duration = snapshot.duration_seconds
+        percentage = (position / duration * 100) if duration > 0 else 0
+
+        return "".join((
+            self._head, _encode_number(position),
+            self._duration_part, '"', format_time(position), '"',
+            self._duration_formatted, _encode_number(percentage),
+            ',\n  "is_playing": ', "true" if snapshot.is_playing else "false",
+            self._player_part, self._timestamp(now),
+            ',\n  "timestamp_unix": ', _encode_number(now), "\n}",
+        )).encode("utf-8")
@@ -1,57 +1,86 @@
 """
-Progress tracking functionality for music players - THREAD SAFE VERSION
+Progress tracking functionality for music players - WRITE-BEHIND VERSION
 """
 import json
 import os
 import time
-import threading
 from datetime import datetime
+from core.io_writer import get_io_writer
+from core.progress_encoder import ProgressEncoder, ProgressSnapshot
+from utils.live_state import LiveStateWriter
 from utils.time_utils import format_time
-from config.settings import PROGRESS_FILE
+from config.settings import (PROGRESS_FILE, PROGRESS_MODE, PROGRESS_DRIFT_THRESHOLD,
+                             LIVE_STATE_ENABLED, LIVE_STATE_FILE, LIVE_STATE_CAPACITY)
+
+PROGRESS_MODE_INTERVAL = "interval"
+PROGRESS_MODE_ANCHOR = "anchor"
+
+class ProgressAnchor:
+    """Last published playback anchor - readers extrapolate position from it"""
+    __slots__ = ("track", "position", "duration", "is_playing", "rate", "monotonic", "wall", "sequence")
+    
+    def __init__(self, track, position, duration, is_playing, rate, sequence):
+        self.track = track
+        self.position = position
+        self.duration = duration
+        self.is_playing = is_playing
+        self.rate = rate
+        self.monotonic = time.monotonic()
+        self.wall = time.time()
+        self.sequence = sequence
+    
+    def predict(self, now_monotonic):
+        """Position the anchor predicts at a monotonic time"""
+        if not self.is_playing:
+            return self.position
+        return self.position + (now_monotonic - self.monotonic) * self.rate
 
 class ProgressTracker:
-    def __init__(self):
+    def __init__(self, writer=None, mode=PROGRESS_MODE, drift_threshold=PROGRESS_DRIFT_THRESHOLD,
+                 live_state=LIVE_STATE_ENABLED):
         self.progress_file = PROGRESS_FILE
-        self._write_lock = threading.Lock()
-        print(f"ProgressTracker initialized: {os.path.abspath(self.progress_file)}")
-    
-    def save_progress_info(self, progress_data):
-        """Save progress information to JSON file for web consumption - THREAD SAFE"""
-        with self._write_lock:
+        self.writer = writer or get_io_writer()
+        self.mode = mode
+        self.drift_threshold = drift_threshold
+        self._anchor = None
+        self._sequence = 0
+        self._encoder = ProgressEncoder()
+        self._snapshot = ProgressSnapshot()
+        self.anchors_published = 0
+        self.ticks_skipped = 0
+        
+        # Optional fixed-layout state file updated in place every tick
+        self.live_state = None
+        if live_state:
             try:
-                progress_path = os.path.abspath(self.progress_file)
-                
-                if progress_data:
-                    # Add timestamp
-                    progress_data["timestamp"] = datetime.utcnow().strftime("%Y-%m-%d %H:%M:%S")
-                    progress_data["timestamp_unix"] = time.time()
-                
-                # Ensure directory exists
-                os.makedirs(os.path.dirname(progress_path), exist_ok=True)
-                
-                # Write to temp file first, then rename for atomic operation
-                temp_path = progress_path + ".tmp"
-                
-                with open(temp_path, 'w', encoding='utf-8') as f:
-                    json.dump(progress_data or {}, f, indent=2)
-                
-                # Atomic rename (Windows compatible)
-                if os.path.exists(progress_path):
-                    os.remove(progress_path)
-                os.rename(temp_path, progress_path)
-                
+                self.live_state = LiveStateWriter(LIVE_STATE_FILE, LIVE_STATE_CAPACITY)
+                print(f"Live state file enabled: {self.live_state.path}")
             except Exception as e:
-                print(f"ERROR saving progress info: {e}")
-                # Clean up temp file if it exists
-                temp_path = progress_path + ".tmp"
-                try:
-                    if os.path.exists(temp_path):
-                        os.remove(temp_path)
-                except:
-                    pass
+                print(f"Live state file unavailable: {e}")
+        
+        print(f"ProgressTracker initialized: {os.path.abspath(self.progress_file)} ({self.mode} mode)")
+    
+    def save_progress_info(self, progress_data):
+        """Queue progress information for the JSON file for web consumption - NON BLOCKING"""
+        try:
+            if progress_data:
+                # Add timestamp
+                progress_data["timestamp"] = datetime.utcnow().strftime("%Y-%m-%d %H:%M:%S")
+                progress_data["timestamp_unix"] = time.time()
+            
+            content = json.dumps(progress_data or {}, indent=2)
+            
+            # Superseded snapshots are coalesced by the writer - only the latest lands
+            self.writer.submit(self.progress_file, content.encode("utf-8"))
+            
+        except Exception as e:
+            print(f"ERROR saving progress info: {e}")
     
     def clear_progress(self):
         """Clear progress information"""
+        self._anchor = None
+        if self.live_state:
+            self.live_state.write(b"{}")
         self.save_progress_info(None)
     
     def create_progress_data(self, title, artist, album, position_seconds=0, 
@@ -73,9 +102,75 @@ class ProgressTracker:
     def update_progress(self, title, artist, album, position_seconds, 
                        duration_seconds, is_playing=True, player="Unknown"):
         """Update progress with new timing information"""
+        snapshot = self._snapshot
+        snapshot.title = title
+        snapshot.artist = artist
+        snapshot.album = album
+        snapshot.position_seconds = position_seconds
+        snapshot.duration_seconds = duration_seconds
+        snapshot.is_playing = is_playing
+        snapshot.player = player
+        
+        if self.mode == PROGRESS_MODE_ANCHOR:
+            if self.live_state:
+                self.live_state.write(self._encoder.encode(snapshot))
+            return self._update_anchor(title, artist, album, position_seconds,
+                                       duration_seconds, is_playing, player)
+        
+        # Per-tick path: only the numeric fields are encoded, track fields are reused
+        try:
+            payload = self._encoder.encode(snapshot)
+            self.writer.submit(self.progress_file, payload)
+            if self.live_state:
+                self.live_state.write(payload)
+        except Exception as e:
+            print(f"ERROR saving progress info: {e}")
+        return snapshot
+    
+    def _update_anchor(self, title, artist, album, position_seconds,
+                       duration_seconds, is_playing, player, playback_rate=1.0):
+        """Publish a new anchor only when playback stops following the current one"""
+        track = (title, artist, album, player)
+        anchor = self._anchor
+        
+        if (anchor is not None and anchor.track == track and anchor.is_playing == is_playing
+                and anchor.duration == duration_seconds and anchor.rate == playback_rate
+                and abs(anchor.predict(time.monotonic()) - position_seconds) <= self.drift_threshold):
+            self.ticks_skipped += 1
+            return None
+        
+        self._sequence += 1
+        anchor = ProgressAnchor(track, position_seconds, duration_seconds, is_playing,
+                                playback_rate, self._sequence)
+        self._anchor = anchor
+        self.anchors_published += 1
+        
         progress_data = self.create_progress_data(
-            title, artist, album, position_seconds, 
+            title, artist, album, position_seconds,
             duration_seconds, is_playing, player
         )
+        progress_data.update({
+            "mode": PROGRESS_MODE_ANCHOR,
+            "anchor_position_seconds": anchor.position,
+            "anchor_monotonic": anchor.monotonic,
+            "anchor_timestamp_unix": anchor.wall,
+            "playback_rate": anchor.rate,
+            "sequence": anchor.sequence,
+        })
         self.save_progress_info(progress_data)
-        return progress_data
\ No newline at end of file
+        return progress_data
+    
+    def get_stats(self):
+        """Get progress publishing counters"""
+        return {
+            "mode": self.mode,
+            "anchors_published": self.anchors_published,
+            "ticks_skipped": self.ticks_skipped,
+            "live_state_writes": self.live_state.writes if self.live_state else 0,
+        }
+    
+    def close(self):
+        """Release the live state mapping"""
+        if self.live_state:
+            self.live_state.close()
+            self.live_state = None
@@ -0,0 +1,300 @@
+"""
+Shared runtime - one event loop, one COM apartment thread and one bounded executor
+"""
+import asyncio
+import sys
+import threading
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from core.timer_service import TimerService
+from core.call_budget import CallBudget
+from config.settings import RUNTIME_EXECUTOR_WORKERS
+
+
+class ComApartment:
+    """The one thread that creates and calls COM objects.
+
+    COM objects belong to the single-threaded apartment that created them,
+    so every COM call is submitted here. Jobs run one at a time; a player's
+    monitor is a long-running job that owns the apartment until it returns.
+    While idle the thread sleeps in a message-pumping wait (on Windows), so
+    it never wakes up unless a job arrives.
+    """
+
+    def __init__(self, name="com-apartment"):
+        self.name = name
+        self.current_job = None
+        self.stats = {"jobs": 0, "wakeups": 0}
+        self._jobs = deque()
+        self._wake = threading.Event()
+        self._win_event = None
+        self._thread = None
+        self._running = False
+        self._lock = threading.Lock()
+
+    def start(self):
+        with self._lock:
+            if self._running:
+                return
+            self._running = True
+            self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+            self._thread.start()
+
+    def submit(self, fn, *args, name=None):
+        """Run fn(*args) on the apartment thread - returns a concurrent.futures.Future"""
+        future = Future()
+        self._jobs.append((future, fn, args, name or getattr(fn, "__name__", "job")))
+        self._signal()
+        return future
+
+    async def run(self, fn, *args, name=None):
+        """Await fn(*args) run on the apartment thread"""
+        return await asyncio.wrap_future(self.submit(fn, *args, name=name))
+
+    def is_apartment_thread(self):
+        return threading.current_thread() is self._thread
+
+    def queued(self):
+        return len(self._jobs)
+
+    def stop(self, timeout=5.0):
+        """Finish queued jobs and end the thread"""
+        with self._lock:
+            self._running = False
+        self._signal()
+        if self._thread and self._thread.is_alive() and not self.is_apartment_thread():
+            self._thread.join(timeout=timeout)
+
+    def abandon(self):
+        """Give up on this apartment: cancel queued jobs and end the thread once
+        the running job returns, if it ever does"""
+        with self._lock:
+            self._running = False
+        while self._jobs:
+            future, _, _, _ = self._jobs.popleft()
+            future.cancel()
+        self._signal()
+
+    def _signal(self):
+        self._wake.set()
+        if self._win_event:
+            import ctypes
+            ctypes.windll.kernel32.SetEvent(self._win_event)
+
+    def _run(self):
+        self._initialize_com()
+        try:
+            while True:
+                self._wake.clear()
+                if self._win_event:
+                    import ctypes
+                    ctypes.windll.kernel32.ResetEvent(self._win_event)
+                while self._jobs:
+                    self._run_job(*self._jobs.popleft())
+                if not self._running:
+                    return
+                if not self._jobs:
+                    self._wait()
+                    self.stats["wakeups"] += 1
+        finally:
+            for future, _, _, _ in self._jobs:
+                future.cancel()
+            self._uninitialize_com()
+
+    def _run_job(self, future, fn, args, name):
+        if not future.set_running_or_notify_cancel():
+            return
+        self.stats["jobs"] += 1
+        self.current_job = name
+        try:
+            future.set_result(fn(*args))
+        except BaseException as e:
+            future.set_exception(e)
+        finally:
+            self.current_job = None
+
+    def _initialize_com(self):
+        if sys.platform != "win32":
+            return
+        try:
+            import ctypes
+            import pythoncom
+            pythoncom.CoInitializeEx(pythoncom.COINIT_APARTMENTTHREADED)
+            self._win_event = ctypes.windll.kernel32.CreateEventW(None, True, False, None)
+        except Exception as e:
+            print(f"COM apartment initialization failed: {e}")
+            self._win_event = None
+
+    def _uninitialize_com(self):
+        if sys.platform != "win32":
+            return
+        try:
+            import ctypes
+            import pythoncom
+            if self._win_event:
+                ctypes.windll.kernel32.CloseHandle(self._win_event)
+                self._win_event = None
+            pythoncom.CoUninitialize()
+        except Exception as e:
+            print(f"COM apartment cleanup error: {e}")
+
+    def _wait(self):
+        """Sleep until a job arrives - on Windows while dispatching COM messages"""
+        if not self._win_event:
+            self._wake.wait()
+            return
+        import ctypes
+        handles = (ctypes.c_void_p * 1)(self._win_event)
+        index = ctypes.c_ulong()
+        try:
+            ctypes.oledll.ole32.CoWaitForMultipleHandles(0, 0xFFFFFFFF, 1, handles, ctypes.byref(index))
+        except OSError:
+            pass  # RPC_S_CALLPENDING - woken without the event being set
+
+
+class Runtime:
+    """One event loop thread for every backend and service, plus the COM
+    apartment and a bounded executor for blocking network and CPU work
+    (HTTP, image resizing). Timed work goes through self.timers, so the
+    process only wakes up when some timer is actually due. External calls
+    run on self.budget, whose watchdog thread restarts a backend stuck in
+    a hung call.
+
+    The other threads of the process, each kept off this executor on purpose:
+        runtime-watchdog    CallBudget - must keep running while the loop or executor is stuck
+        io-writer           WriteBehindWriter - output files never wait behind a stalled lookup
+        backend-supervisor  BackendSupervisor (process isolation) - blocks in wait() on worker pipes
+        systray             the tray icon's message loop
+    """
+
+    def __init__(self, executor_workers=RUNTIME_EXECUTOR_WORKERS):
+        self.loop = None
+        self.executor = ThreadPoolExecutor(max_workers=executor_workers, thread_name_prefix="runtime-worker")
+        self.executor_workers = executor_workers
+        self.apartment = ComApartment()
+        self.budget = CallBudget(self.executor)
+        self.timers = None
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def start(self):
+        """Start the loop and apartment threads (idempotent)"""
+        with self._lock:
+            if self._thread and self._thread.is_alive():
+                return
+            started = threading.Event()
+            self.loop = asyncio.new_event_loop()
+            self.loop.set_default_executor(self.executor)
+            self.timers = TimerService(self.loop)
+            self._thread = threading.Thread(target=self._run, args=(started,), name="runtime-loop", daemon=True)
+            self._thread.start()
+            started.wait(timeout=5.0)
+        self.apartment.start()
+        self.budget.start()
+
+    def _run(self, started):
+        asyncio.set_event_loop(self.loop)
+        self.loop.call_soon(started.set)
+        try:
+            self.loop.run_forever()
+        finally:
+            pending = asyncio.all_tasks(self.loop)
+            for task in pending:
+                task.cancel()
+            if pending:
+                self.loop.run_until_complete(asyncio.gather(*pending, return_exceptions=True))
+            self.loop.close()
+
+    def replace_apartment(self, stuck):
+        """Abandon an apartment stuck in a hung COM call and start a fresh one - returns the current one"""
+        with self._lock:
+            if self.apartment is stuck:
+                print(f"Abandoning COM apartment stuck in {stuck.current_job}")
+                stuck.abandon()
+                self.apartment = ComApartment()
+                self.apartment.start()
+            return self.apartment
+
+    def is_loop_thread(self):
+        return threading.current_thread() is self._thread
+
+    def spawn(self, coro, name):
+        """Run a coroutine as a named task on the loop - THREAD SAFE, returns a concurrent future"""
+        async def named():
+            asyncio.current_task().set_name(name)
+            return await coro
+        return asyncio.run_coroutine_threadsafe(named(), self.loop)
+
+    def call_soon(self, fn, *args):
+        """Run fn(*args) on the loop thread - THREAD SAFE"""
+        try:
+            self.loop.call_soon_threadsafe(fn, *args)
+        except RuntimeError:
+            pass  # loop closed during shutdown
+
+    def call_every(self, interval, fn, *args, name="periodic", deferrable=False):
+        """Run fn(*args) on the loop every interval seconds - returns a handle with cancel()
+
+        A deferrable call never wakes the process by itself; it runs on the
+        next timer wakeup after it is due.
+        """
+        return self.timers.call_every(interval, fn, *args, name=name, deferrable=deferrable)
+
+    def run_blocking(self, fn, *args):
+        """Run fn(*args) on the bounded executor - returns a concurrent future"""
+        return self.executor.submit(fn, *args)
+
+    def get_inventory(self):
+        """Threads, loop tasks, the apartment's job and executor usage"""
+        inventory = {
+            "threads": sorted(thread.name for thread in threading.enumerate()),
+            "apartment_job": self.apartment.current_job,
+            "apartment_queued": self.apartment.queued(),
+            "apartment_wakeups": self.apartment.stats["wakeups"],
+            "timer_wakeups": self.timers.stats["wakeups"] if self.timers else 0,
+            "timer_wakeups_per_minute": self.timers.wakeups_per_minute() if self.timers else 0,
+            "executor_threads": len(self.executor._threads),
+            "executor_workers": self.executor_workers,
+            "executor_queued": self.executor._work_queue.qsize(),
+            "tasks": [],
+        }
+        if self.loop and self.loop.is_running():
+            if self.is_loop_thread():
+                inventory["tasks"] = self._task_names()
+            else:
+                future = Future()
+                self.call_soon(lambda: future.set_result(self._task_names()))
+                try:
+                    inventory["tasks"] = future.result(timeout=1.0)
+                except Exception:
+                    pass
+        return inventory
+
+    def _task_names(self):
+        return sorted(task.get_name() for task in asyncio.all_tasks(self.loop))
+
+    def stop(self, timeout=5.0):
+        """Cancel loop tasks and stop all runtime threads"""
+        if self.loop and self.loop.is_running():
+            self.call_soon(self.loop.stop)
+        if self._thread and not self.is_loop_thread():
+            self._thread.join(timeout=timeout)
+        self.apartment.stop(timeout)
+        self.budget.stop()
+        self.executor.shutdown(wait=False, cancel_futures=True)
+        print("Runtime stopped")
+
+
+_shared_runtime = None
+_shared_runtime_lock = threading.Lock()
+
+
+def get_runtime():
+    """Get the process-wide runtime, started on first use"""
+    global _shared_runtime
+    with _shared_runtime_lock:
+        if _shared_runtime is None:
+            _shared_runtime = Runtime()
+        runtime = _shared_runtime
+    runtime.start()
+    return runtime
@@ -0,0 +1,140 @@
+"""
+Ordered snapshot publishing for the output files
+"""
+import hashlib
+import json
+import os
+import shutil
+import time
+from config.settings import (OUTPUT_FILE, ARTWORK_FILE, PROGRESS_FILE, SNAPSHOT_DURABILITY,
+                             SNAPSHOT_MANIFEST_FILE)
+
+DURABILITY_NONE = "none"  # rely on the OS page cache
+DURABILITY_FILE = "file"  # fsync every file before it is flipped into place
+DURABILITY_DIRECTORY = "directory"  # also fsync the directory after the flip (POSIX only)
+DURABILITY_MODES = (DURABILITY_NONE, DURABILITY_FILE, DURABILITY_DIRECTORY)
+
+STAGING_DIRNAME = ".anp_staging"
+REPLACE_RETRIES = 3  # Windows refuses to replace a file a reader holds open
+REPLACE_RETRY_DELAY = 0.05  # seconds
+
+
+class SnapshotPublisher:
+    """Publishes a generation of output files with ordered, gap-free replaces.
+
+    Each generation is written completely into a staging directory next to its
+    targets, then flipped into place with os.replace in a fixed order: artwork,
+    then progress, then nowplaying.txt last, because overlays treat a text
+    change as "new track". Each os.replace is atomic, so a reader never sees a
+    missing or half-written file.
+
+    A generation as a whole is not atomic: between two flips a reader can see
+    the new cover next to the previous track's nowplaying.txt. The ordering
+    keeps that window to the time between two renames, and puts the text last
+    so a reader reacting to it finds the cover already in place. Finally a
+    small manifest naming the generation and the content hash of each track
+    file is swapped in; a reader that must have a consistent set can compare
+    the hashes of what it read against it and read again on a mismatch.
+    """
+
+    def __init__(self, durability=SNAPSHOT_DURABILITY, manifest_file=SNAPSHOT_MANIFEST_FILE,
+                 publish_order=(ARTWORK_FILE, PROGRESS_FILE, OUTPUT_FILE),
+                 manifest_targets=(OUTPUT_FILE, ARTWORK_FILE)):
+        if durability not in DURABILITY_MODES:
+            print(f"Unknown snapshot durability '{durability}' - using '{DURABILITY_NONE}'")
+            durability = DURABILITY_NONE
+        self.durability = durability
+        self.manifest_file = os.path.abspath(manifest_file) if manifest_file else None
+        self._order = {os.path.abspath(path): rank for rank, path in enumerate(publish_order)}
+        self._manifest_targets = {os.path.abspath(path) for path in manifest_targets}
+        self._manifest_entries = {}
+        self.generation = 0
+
+    def publish(self, files):
+        """Publish {path: bytes} as one generation, one ordered replace per file - returns {path: success}"""
+        if not files:
+            return {}
+
+        generation = self.generation + 1
+        results = {path: False for path in files}
+        staging_dirs = set()
+
+        try:
+            # Stage the complete generation first - nothing is visible yet
+            staged = []
+            for path, data in files.items():
+                staging_dir = os.path.join(os.path.dirname(path), STAGING_DIRNAME, f"gen-{generation}")
+                os.makedirs(staging_dir, exist_ok=True)
+                staging_dirs.add(staging_dir)
+                staged_path = os.path.join(staging_dir, os.path.basename(path))
+                self._write_staged(staged_path, data)
+                staged.append((self._order.get(path, -1), path, staged_path))
+
+            # Flip into place in reader-safe order
+            staged.sort(key=lambda item: item[0])
+            for _, path, staged_path in staged:
+                self._replace(staged_path, path)
+                results[path] = True
+
+            if self.durability == DURABILITY_DIRECTORY:
+                for directory in {os.path.dirname(path) for path in files}:
+                    self._fsync_directory(directory)
+
+            self.generation = generation
+            if self.manifest_file and self._manifest_targets.intersection(files):
+                self._write_manifest(files)
+
+        except Exception as e:
+            print(f"ERROR publishing snapshot generation {generation}: {e}")
+
+        finally:
+            for staging_dir in staging_dirs:
+                shutil.rmtree(staging_dir, ignore_errors=True)
+
+        return results
+
+    def _write_staged(self, staged_path, data):
+        with open(staged_path, "wb") as f:
+            f.write(data)
+            if self.durability != DURABILITY_NONE:
+                f.flush()
+                os.fsync(f.fileno())
+
+    def _replace(self, src_path, dst_path):
+        for attempt in range(REPLACE_RETRIES):
+            try:
+                os.replace(src_path, dst_path)
+                return
+            except PermissionError:
+                if attempt == REPLACE_RETRIES - 1:
+                    raise
+                time.sleep(REPLACE_RETRY_DELAY)
+
+    def _fsync_directory(self, directory):
+        """Persist the directory entry changes - not supported on Windows"""
+        if os.name == "nt":
+            return
+        fd = os.open(directory, os.O_RDONLY)
+        try:
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+
+    def _write_manifest(self, files):
+        """Swap in the pointer describing the current generation"""
+        for path, data in files.items():
+            if path in self._manifest_targets:
+                self._manifest_entries[os.path.basename(path)] = {
+                    "sha256": hashlib.sha256(data).hexdigest(),
+                    "size": len(data),
+                }
+
+        manifest = {
+            "generation": self.generation,
+            "timestamp_unix": time.time(),
+            "files": self._manifest_entries,
+        }
+        os.makedirs(os.path.dirname(self.manifest_file), exist_ok=True)
+        temp_path = self.manifest_file + ".tmp"
+        self._write_staged(temp_path, json.dumps(manifest, indent=2).encode("utf-8"))
+        self._replace(temp_path, self.manifest_file)
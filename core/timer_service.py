@@ -0,0 +1,208 @@
+"""
+Central timer service - every periodic wakeup in the app goes through one heap
+"""
+import asyncio
+import heapq
+import itertools
+import time
+from collections import deque
+from config.settings import TIMER_SLACK_RATIO, TIMER_SLACK_MAX
+
+WAKEUP_WINDOW = 60.0  # seconds covered by wakeups_per_minute()
+EARLY_TOLERANCE = 0.005  # the loop may run a callback up to its clock resolution early
+
+
+class TimerHandle:
+    """A scheduled callback - cancel() is safe from any thread"""
+    __slots__ = ("service", "deadline", "latest", "callback", "args", "name", "deferrable", "interval",
+                 "cancelled")
+
+    def __init__(self, service, deadline, slack, callback, args, name, deferrable, interval):
+        self.service = service
+        self.deadline = deadline
+        self.latest = deadline + slack
+        self.callback = callback
+        self.args = args
+        self.name = name
+        self.deferrable = deferrable
+        self.interval = interval
+        self.cancelled = False
+
+    def cancel(self):
+        if self.cancelled:
+            return
+        self.cancelled = True
+        # Disarm right away so a cancelled timer never causes a wakeup
+        if not self.deferrable:
+            self.service._rearm_soon()
+
+
+class TimerService:
+    """Runs timers on the runtime loop with a single armed loop callback.
+
+    Each timer may fire anywhere between its deadline and deadline + slack
+    (TIMER_SLACK_RATIO of the delay, at most TIMER_SLACK_MAX). The service
+    wakes at the last deadline that still lies within the earliest timer's
+    slack and fires every timer due by then, so deadlines that fall close
+    together share one wakeup and a lone timer fires right on time.
+
+    Deferrable timers (status heartbeats, safety-net resyncs) never cause a
+    wakeup themselves; they fire on the next wakeup after their deadline.
+    With only deferrable timers left, nothing is armed and the process does
+    not wake up at all.
+    """
+
+    def __init__(self, loop, clock=time.monotonic):
+        self.loop = loop
+        self.clock = clock
+        self._heap = []  # (latest, seq, handle) - non-deferrable timers
+        self._deferred = []  # (deadline, seq, handle) - deferrable timers
+        self._seq = itertools.count()
+        self._armed = None  # loop TimerHandle
+        self._armed_at = None
+        self._wakeup_times = deque()
+        self.stats = {"wakeups": 0, "fired": 0, "merged": 0, "by_name": {}}
+
+    def call_later(self, delay, callback, *args, name="timer", slack=None, deferrable=False):
+        """Run callback(*args) on the loop after delay seconds - THREAD SAFE"""
+        return self._add(delay, callback, args, name, slack, deferrable, None)
+
+    def call_every(self, interval, callback, *args, name="timer", slack=None, deferrable=False):
+        """Run callback(*args) every interval seconds until cancelled - THREAD SAFE"""
+        return self._add(interval, callback, args, name, slack, deferrable, interval)
+
+    async def sleep(self, delay, name="sleep"):
+        """asyncio.sleep() through the timer service - call on the loop"""
+        future = self.loop.create_future()
+        handle = self.call_later(delay, _resolve, future, name=name)
+        try:
+            await future
+        finally:
+            handle.cancel()
+
+    def wakeups_per_minute(self):
+        """Timer wakeups in the last minute - THREAD SAFE (reads a copy)"""
+        now = self.clock()
+        return sum(1 for at in list(self._wakeup_times) if now - at <= WAKEUP_WINDOW)
+
+    def get_stats(self):
+        stats = {
+            "wakeups": self.stats["wakeups"],
+            "wakeups_per_minute": self.wakeups_per_minute(),
+            "fired": self.stats["fired"],
+            "merged": self.stats["merged"],
+            "active": sorted(handle.name for _, _, handle in list(self._heap) + list(self._deferred)
+                             if not handle.cancelled),
+            "by_name": dict(self.stats["by_name"]),
+        }
+        return stats
+
+    def _add(self, delay, callback, args, name, slack, deferrable, interval):
+        if slack is None:
+            slack = min(delay * TIMER_SLACK_RATIO, TIMER_SLACK_MAX)
+        handle = TimerHandle(self, self.clock() + delay, slack, callback, args, name, deferrable, interval)
+        if self._on_loop_thread():
+            self._push(handle)
+        else:
+            try:
+                self.loop.call_soon_threadsafe(self._push, handle)
+            except RuntimeError:
+                handle.cancel()  # loop closed during shutdown
+        return handle
+
+    def _on_loop_thread(self):
+        try:
+            return asyncio.get_running_loop() is self.loop
+        except RuntimeError:
+            return False
+
+    def _push(self, handle):
+        if handle.cancelled:
+            return
+        if handle.deferrable:
+            heapq.heappush(self._deferred, (handle.deadline, next(self._seq), handle))
+        else:
+            heapq.heappush(self._heap, (handle.latest, next(self._seq), handle))
+            self._arm()
+
+    def _rearm_soon(self):
+        if self._on_loop_thread():
+            self._arm()
+        else:
+            try:
+                self.loop.call_soon_threadsafe(self._arm)
+            except RuntimeError:
+                pass
+
+    def _arm(self):
+        """Keep exactly one loop callback, at the next merged wakeup time"""
+        while self._heap and self._heap[0][2].cancelled:
+            heapq.heappop(self._heap)
+        if not self._heap:
+            if self._armed:
+                self._armed.cancel()
+                self._armed = self._armed_at = None
+            return
+        latest = self._heap[0][0]
+        wake_at = max(handle.deadline for _, _, handle in self._heap
+                      if handle.deadline <= latest and not handle.cancelled)
+        if self._armed and self._armed_at == wake_at:
+            return
+        if self._armed:
+            self._armed.cancel()
+        self._armed_at = wake_at
+        self._armed = self.loop.call_at(self._loop_time(wake_at), self._wake)
+
+    def _loop_time(self, at):
+        return self.loop.time() + (at - self.clock())
+
+    def _wake(self):
+        self._armed = self._armed_at = None
+        now = self.clock()
+        self.stats["wakeups"] += 1
+        self._wakeup_times.append(now)
+        self._prune_wakeups(now)
+
+        due = []
+        # Everything whose deadline has passed rides on this wakeup
+        for heap in (self._heap, self._deferred):
+            remaining = []
+            for entry in heap:
+                handle = entry[2]
+                if handle.cancelled:
+                    continue
+                if handle.deadline <= now + EARLY_TOLERANCE:
+                    due.append(handle)
+                else:
+                    remaining.append(entry)
+            heapq.heapify(remaining)
+            heap[:] = remaining
+
+        if len(due) > 1:
+            self.stats["merged"] += len(due) - 1
+        for handle in due:
+            self._fire(handle, now)
+        self._arm()
+
+    def _fire(self, handle, now):
+        self.stats["fired"] += 1
+        self.stats["by_name"][handle.name] = self.stats["by_name"].get(handle.name, 0) + 1
+        try:
+            handle.callback(*handle.args)
+        except Exception as e:
+            print(f"Timer {handle.name} error: {e}")
+        if handle.interval is not None and not handle.cancelled:
+            slack = handle.latest - handle.deadline
+            # Re-arm from the planned deadline, not from now, so a late wakeup does not drift
+            handle.deadline = max(handle.deadline + handle.interval, now)
+            handle.latest = handle.deadline + slack
+            self._push(handle)
+
+    def _prune_wakeups(self, now):
+        while self._wakeup_times and now - self._wakeup_times[0] > WAKEUP_WINDOW:
+            self._wakeup_times.popleft()
+
+
+def _resolve(future):
+    if not future.done():
+        future.set_result(None)
@@ -0,0 +1,196 @@
+"""
+Tracing spans - a ring buffer of timed, nested spans exported as Chrome trace-event JSON
+
+    with span("artwork.download", "http", url=url) as s:
+        ...
+        s.set(status=response.status_code, bytes=len(data))
+
+annotate() attaches attributes to the innermost open span from code that does
+not hold it, e.g. deep inside a traced handler.
+
+While tracing is off, span() hands out one shared no-op span, so an
+instrumented call costs a function call and an attribute check. While it is
+on, every finished span is appended to a bounded ring buffer; flush() writes
+the buffer in the trace-event format that chrome://tracing and
+ui.perfetto.dev open. Spans made inside an asyncio task get a track of their
+own, so tasks interleaving on the loop thread still nest correctly.
+"""
+import asyncio
+import contextvars
+import json
+import os
+import threading
+import time
+from collections import deque
+from config.settings import TRACING_ENABLED, TRACE_BUFFER_SIZE, TRACE_FILE
+
+_parent = contextvars.ContextVar("trace_parent", default=None)
+
+
+class _NullSpan:
+    """What span() returns while tracing is off"""
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+    def set(self, **attrs):
+        pass
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class _Span:
+    __slots__ = ("tracer", "name", "cat", "args", "start", "token")
+
+    def __init__(self, tracer, name, cat, args):
+        self.tracer = tracer
+        self.name = name
+        self.cat = cat
+        self.args = args
+        self.start = 0
+        self.token = None
+
+    def __enter__(self):
+        parent = _parent.get()
+        if parent is not None:
+            self.args["parent"] = parent.name
+        self.token = _parent.set(self)
+        self.start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        end = time.perf_counter_ns()
+        _parent.reset(self.token)
+        if exc_type is not None:
+            self.args["error"] = exc_type.__name__
+        self.tracer._record(self, end)
+        return False
+
+    def set(self, **attrs):
+        """Attach attributes (bytes, cache hit, HTTP status...) to the span"""
+        self.args.update(attrs)
+
+
+class Tracer:
+    """Collects finished spans in a ring buffer while enabled"""
+
+    def __init__(self, enabled=TRACING_ENABLED, capacity=TRACE_BUFFER_SIZE):
+        self.enabled = enabled
+        self.capacity = capacity
+        self._events = deque(maxlen=capacity)  # (name, cat, start_ns, dur_ns, track, args)
+        self._tracks = {}  # (thread ident, task name) -> (track id, label)
+        self._lock = threading.Lock()
+        self._epoch = time.perf_counter_ns()
+        self.stats = {"spans": 0, "flushes": 0}
+
+    def span(self, name, cat="app", **attrs):
+        """A context manager timing one piece of work - a shared no-op while disabled"""
+        if not self.enabled:
+            return _NULL_SPAN
+        return _Span(self, name, cat, attrs)
+
+    def enable(self):
+        """Start recording - the buffer starts empty"""
+        with self._lock:
+            self._events.clear()
+            self._epoch = time.perf_counter_ns()
+            self.enabled = True
+        print(f"Tracing enabled ({self.capacity} spans buffered)")
+
+    def disable(self):
+        self.enabled = False
+        print("Tracing disabled")
+
+    def flush(self, path=TRACE_FILE):
+        """Write the buffered spans as Chrome trace-event JSON and empty the buffer - returns the path"""
+        with self._lock:
+            events = list(self._events)
+            self._events.clear()
+            tracks = list(self._tracks.values())
+            epoch = self._epoch
+            self.stats["flushes"] += 1
+
+        pid = os.getpid()
+        trace_events = [{"name": "process_name", "ph": "M", "pid": pid, "tid": 0,
+                         "args": {"name": "ANP Tray App"}}]
+        for track, label in tracks:
+            trace_events.append({"name": "thread_name", "ph": "M", "pid": pid, "tid": track,
+                                 "args": {"name": label}})
+        for name, cat, start, duration, track, args in events:
+            trace_events.append({"name": name, "cat": cat, "ph": "X", "pid": pid, "tid": track,
+                                 "ts": (start - epoch) / 1000, "dur": duration / 1000,
+                                 "args": {key: _jsonable(value) for key, value in args.items()}})
+
+        path = os.path.abspath(path)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        temp_path = path + ".tmp"
+        with open(temp_path, "w", encoding="utf-8") as f:
+            json.dump({"traceEvents": trace_events, "displayTimeUnit": "ms"}, f)
+        os.replace(temp_path, path)
+        print(f"Trace written: {path} ({len(events)} spans)")
+        return path
+
+    def get_stats(self):
+        return dict(self.stats, enabled=self.enabled, buffered=len(self._events), capacity=self.capacity)
+
+    def _record(self, span, end):
+        self._events.append((span.name, span.cat, span.start, end - span.start, self._track(), span.args))
+        self.stats["spans"] += 1
+
+    def _track(self):
+        """Trace track of the caller: its thread, or its asyncio task on that thread"""
+        thread = threading.current_thread()
+        try:
+            task = asyncio.current_task()
+        except RuntimeError:
+            task = None  # no loop running in this thread
+        # Task names repeat (every coalescer run is named after the coalescer), so a
+        # task is told apart by identity; its name is only the label
+        key = (thread.ident, id(task) if task else None)
+        entry = self._tracks.get(key)
+        if entry is None:
+            with self._lock:
+                entry = self._tracks.get(key)
+                if entry is None:
+                    label = f"{thread.name} / {task.get_name()}" if task else thread.name
+                    entry = self._tracks[key] = (len(self._tracks) + 1, label)
+        return entry[0]
+
+
+def _jsonable(value):
+    if value is None or isinstance(value, (bool, int, float, str)):
+        return value
+    return str(value)
+
+
+_shared_tracer = None
+_shared_tracer_lock = threading.Lock()
+
+
+def get_tracer():
+    """Get the process-wide tracer"""
+    global _shared_tracer
+    with _shared_tracer_lock:
+        if _shared_tracer is None:
+            _shared_tracer = Tracer()
+        return _shared_tracer
+
+
+def annotate(**attrs):
+    """Attach attributes to the caller's innermost open span - a no-op while tracing is off"""
+    current = _parent.get()
+    if current is not None:
+        current.set(**attrs)
+
+
+def span(name, cat="app", **attrs):
+    """Time a block with the process-wide tracer - see Tracer.span"""
+    tracer = _shared_tracer or get_tracer()
+    if not tracer.enabled:
+        return _NULL_SPAN
+    return _Span(tracer, name, cat, attrs)
@@ -0,0 +1,224 @@
+"""
+Track-change latency - stage timestamps from a detected track change to its files on disk
+"""
+import json
+import os
+import threading
+import time
+from collections import deque
+from core.call_budget import percentile
+from config.settings import (OUTPUT_FILE, ARTWORK_FILE, PROGRESS_FILE, TRACK_LATENCY_SAMPLES,
+                             TRACK_LATENCY_RECENT, TRACK_LATENCY_FILE)
+
+# Stages, each measured from the moment the backend saw the change (event received or poll tick)
+STAGE_METADATA = "metadata"  # track metadata read, text about to be queued
+STAGE_TEXT = "text"  # nowplaying.txt on disk
+STAGE_PROGRESS = "progress"  # first progress JSON of the track on disk
+STAGE_ARTWORK_RESOLVED = "artwork_resolved"  # artwork bytes in hand (player, cache, Last.fm or default)
+STAGE_ARTWORK = "artwork"  # the resolved artwork on disk
+STAGE_COMPLETE = "complete"  # text, progress and artwork all on disk
+STAGES = (STAGE_METADATA, STAGE_TEXT, STAGE_PROGRESS, STAGE_ARTWORK_RESOLVED, STAGE_ARTWORK, STAGE_COMPLETE)
+ARTWORK_STAGES = (STAGE_ARTWORK_RESOLVED, STAGE_ARTWORK)
+
+
+class _Trace:
+    __slots__ = ("sequence", "backend", "track", "detected", "started", "wall", "stages", "artwork_source")
+
+    def __init__(self, sequence, backend, track, detected, started):
+        self.sequence = sequence
+        self.backend = backend
+        self.track = track
+        self.detected = detected
+        self.started = started
+        self.wall = time.time()
+        self.stages = {}  # stage -> clock time
+        self.artwork_source = None
+
+    def as_dict(self, outcome):
+        return {
+            "sequence": self.sequence,
+            "backend": self.backend,
+            "track": " - ".join(self.track),
+            "detected_unix": self.wall - (self.started - self.detected),
+            "artwork_source": self.artwork_source,
+            "outcome": outcome,
+            "stages_ms": {stage: (at - self.detected) * 1000 for stage, at in self.stages.items()},
+        }
+
+
+class _Histogram:
+    """Rolling window of stage latencies"""
+    __slots__ = ("count", "max_ms", "samples")
+
+    def __init__(self, samples):
+        self.count = 0
+        self.max_ms = 0.0
+        self.samples = deque(maxlen=samples)
+
+    def add(self, latency_ms):
+        self.count += 1
+        self.max_ms = max(self.max_ms, latency_ms)
+        self.samples.append(latency_ms)
+
+    def as_dict(self):
+        ordered = sorted(self.samples)
+        return {
+            "count": self.count,
+            "p50_ms": percentile(ordered, 0.50),
+            "p95_ms": percentile(ordered, 0.95),
+            "p99_ms": percentile(ordered, 0.99),
+            "max_ms": self.max_ms,
+        }
+
+
+class TrackLatencyTracker:
+    """Follows each shown track change until its files are on disk.
+
+    Only the change that owns the outputs is traced, one at a time: a newer
+    change or a clear ends the open trace. Every stage is added to a rolling
+    histogram per backend (and per artwork source for the artwork stages)
+    when it happens, so changes that never complete still count for the
+    stages they reached. The write-behind writer reports which files landed
+    and when they were queued; a file counts for the trace only if it was
+    queued after the stage that produced it.
+    """
+
+    def __init__(self, text_file=OUTPUT_FILE, artwork_file=ARTWORK_FILE, progress_file=PROGRESS_FILE,
+                 samples=TRACK_LATENCY_SAMPLES, recent=TRACK_LATENCY_RECENT, clock=time.perf_counter):
+        self.clock = clock
+        self.samples = samples
+        self._files = {
+            os.path.abspath(text_file): STAGE_TEXT,
+            os.path.abspath(progress_file): STAGE_PROGRESS,
+            os.path.abspath(artwork_file): STAGE_ARTWORK,
+        }
+        self._lock = threading.Lock()
+        self._current = None
+        self._sequence = 0
+        self._backends = {}  # backend -> {stage: _Histogram}
+        self._sources = {}  # artwork source -> {stage: _Histogram}
+        self.recent = deque(maxlen=recent)
+        self.stats = {"changes": 0, "completed": 0, "superseded": 0, "cleared": 0}
+
+    def begin(self, backend, title, artist, album, detected_at=None):
+        """A new track is about to be shown - detected_at is the clock time the backend saw it - THREAD SAFE"""
+        now = self.clock()
+        with self._lock:
+            self._end_locked("superseded")
+            self._sequence += 1
+            self.stats["changes"] += 1
+            trace = _Trace(self._sequence, backend, (artist, title, album),
+                           detected_at if detected_at is not None else now, now)
+            self._current = trace
+            self._mark_locked(trace, STAGE_METADATA, now)
+
+    def cancel(self):
+        """The outputs were cleared - the open trace cannot complete - THREAD SAFE"""
+        if self._current is None:
+            return
+        with self._lock:
+            self._end_locked("cleared")
+
+    def artwork_resolved(self, source):
+        """Artwork bytes for the shown track are about to be queued - THREAD SAFE"""
+        if self._current is None:
+            return
+        now = self.clock()
+        with self._lock:
+            trace = self._current
+            if trace is not None and STAGE_ARTWORK_RESOLVED not in trace.stages:
+                trace.artwork_source = source
+                self._mark_locked(trace, STAGE_ARTWORK_RESOLVED, now)
+
+    def files_published(self, landed):
+        """Writer callback: {abspath: enqueue clock time} of files now on disk - THREAD SAFE"""
+        if self._current is None:
+            return
+        now = self.clock()
+        with self._lock:
+            trace = self._current
+            if trace is None:
+                return
+            for path, enqueued_at in landed.items():
+                stage = self._files.get(path)
+                if stage is None or stage in trace.stages:
+                    continue
+                # Placeholder covers and earlier tracks' writes were queued before these
+                produced_by = STAGE_ARTWORK_RESOLVED if stage == STAGE_ARTWORK else STAGE_METADATA
+                produced_at = trace.stages.get(produced_by)
+                if produced_at is None or enqueued_at < produced_at:
+                    continue
+                self._mark_locked(trace, stage, now)
+            if all(stage in trace.stages for stage in (STAGE_TEXT, STAGE_PROGRESS, STAGE_ARTWORK)):
+                self._mark_locked(trace, STAGE_COMPLETE, now)
+                self._end_locked("completed")
+
+    def current_age(self):
+        """Seconds since the open trace's change was detected (0.0 when none is open)"""
+        trace = self._current
+        return self.clock() - trace.detected if trace else 0.0
+
+    def get_stats(self):
+        """Percentiles per backend and artwork source, counters and the open trace - THREAD SAFE"""
+        with self._lock:
+            current = self._current
+            return {
+                "backends": {backend: {stage: hist.as_dict() for stage, hist in stages.items()}
+                             for backend, stages in self._backends.items()},
+                "artwork_sources": {source: {stage: hist.as_dict() for stage, hist in stages.items()}
+                                    for source, stages in self._sources.items()},
+                "open": current.as_dict("open") if current else None,
+                **self.stats,
+            }
+
+    def dump(self, path=TRACK_LATENCY_FILE):
+        """Write the histograms and the recent traces to a JSON file - returns the path"""
+        stats = self.get_stats()
+        with self._lock:
+            stats["recent"] = list(self.recent)
+        stats["stages"] = list(STAGES)
+        stats["generated_unix"] = time.time()
+        path = os.path.abspath(path)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        temp_path = path + ".tmp"
+        with open(temp_path, "w", encoding="utf-8") as f:
+            json.dump(stats, f, indent=2)
+        os.replace(temp_path, path)
+        return path
+
+    # Callers hold _lock
+
+    def _mark_locked(self, trace, stage, at):
+        trace.stages[stage] = at
+        latency_ms = (at - trace.detected) * 1000
+        self._histogram(self._backends, trace.backend, stage).add(latency_ms)
+        if stage in ARTWORK_STAGES and trace.artwork_source:
+            self._histogram(self._sources, trace.artwork_source, stage).add(latency_ms)
+
+    def _histogram(self, groups, group, stage):
+        stages = groups.setdefault(group, {})
+        hist = stages.get(stage)
+        if hist is None:
+            hist = stages[stage] = _Histogram(self.samples)
+        return hist
+
+    def _end_locked(self, outcome):
+        trace = self._current
+        if trace is None:
+            return
+        self._current = None
+        self.stats[outcome] += 1
+        self.recent.append(trace.as_dict(outcome))
+
+
+_shared_tracker = None
+_shared_tracker_lock = threading.Lock()
+
+
+def get_track_latency():
+    """Get the process-wide track-change latency tracker"""
+    global _shared_tracker
+    with _shared_tracker_lock:
+        if _shared_tracker is None:
+            _shared_tracker = TrackLatencyTracker()
+        return _shared_tracker
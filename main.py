@@ -12,15 +12,21 @@ from core.file_manager import FileManager
 from core.progress_tracker import ProgressTracker
 from core.artwork_manager import ArtworkManager
 from core.player_manager import PlayerManager
+from core.event_server import EventServer, get_event_hub
+from core.runtime import get_runtime
 from ui.systray import SystemTrayManager
 from ui.about_dialog import AboutDialog
+from config.settings import EVENT_SERVER_ENABLED
 
 class ANPTrayApp:
     def __init__(self):
+        # Shared event loop, COM apartment and executor - every component schedules on it
+        self.runtime = get_runtime()
+        
         # Initialize core components
         self.file_manager = FileManager()
         self.progress_tracker = ProgressTracker()
-        self.artwork_manager = ArtworkManager()
+        self.artwork_manager = ArtworkManager(self.file_manager)
         
         # Initialize player manager
         self.player_manager = PlayerManager(
@@ -29,6 +35,9 @@ class ANPTrayApp:
             self.artwork_manager
         )
         
+        # Optional local event feed for browser overlays
+        self.event_server = EventServer(get_event_hub()) if EVENT_SERVER_ENABLED else None
+        
         # Initialize UI components
         self.about_dialog = AboutDialog()
         self.systray_manager = SystemTrayManager(self.player_manager, self.about_dialog)
@@ -46,6 +55,9 @@ class ANPTrayApp:
         self.file_manager.clear_now_playing()
         self.progress_tracker.clear_progress()
         
+        if self.event_server and not self.event_server.start():
+            print("Warning: Event server failed to start")
+        
         # Show available players
         available_players = self.player_manager.get_available_players()
         print(f"Available players: {available_players}")
@@ -96,6 +108,14 @@ class ANPTrayApp:
         # Shutdown player manager
         self.player_manager.shutdown()
         
+        # Let the final clears reach the disk
+        self.file_manager.writer.stop()
+        
+        if self.event_server:
+            self.event_server.stop()
+        
+        self.runtime.stop()
+        
         print("ANP Tray App shutdown complete")
 
 def main():
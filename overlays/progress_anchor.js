@@ -0,0 +1,74 @@
+/*
+ * ANP progress helper for browser overlays (OBS browser source etc.)
+ *
+ * Reads track_progress.json and extrapolates the playback position locally,
+ * so the overlay animates smoothly while the app only rewrites the file on
+ * track change, pause or seek (PROGRESS_MODE = "anchor"). Also works with
+ * the 1 Hz "interval" mode.
+ *
+ * Usage:
+ *   <script src="progress_anchor.js"></script>
+ *   <script>
+ *     anpProgress.watch("track_progress.json", function (state) {
+ *       bar.style.width = state.percentage + "%";
+ *       label.textContent = state.positionFormatted + " / " + state.data.duration_formatted;
+ *     });
+ *   </script>
+ */
+(function (global) {
+  "use strict";
+
+  function formatTime(seconds) {
+    seconds = Math.max(0, Math.floor(seconds));
+    var h = Math.floor(seconds / 3600);
+    var m = Math.floor((seconds % 3600) / 60);
+    var s = seconds % 60;
+    var pad = function (n) { return (n < 10 ? "0" : "") + n; };
+    return h > 0 ? h + ":" + pad(m) + ":" + pad(s) : m + ":" + pad(s);
+  }
+
+  function extrapolate(data, nowUnix) {
+    if (!data || !data.title) {
+      return 0;
+    }
+    var anchored = data.anchor_position_seconds !== undefined;
+    var position = anchored ? data.anchor_position_seconds : (data.position_seconds || 0);
+    var since = anchored ? data.anchor_timestamp_unix : data.timestamp_unix;
+    if (data.is_playing && since) {
+      position += Math.max(0, nowUnix - since) * (data.playback_rate || 1);
+    }
+    if (data.duration_seconds > 0) {
+      position = Math.min(position, data.duration_seconds);
+    }
+    return Math.max(0, position);
+  }
+
+  function watch(url, onFrame, pollMs) {
+    var data = null;
+
+    function poll() {
+      fetch(url + "?t=" + Date.now(), { cache: "no-store" })
+        .then(function (response) { return response.ok ? response.json() : null; })
+        .then(function (next) { data = next; })
+        .catch(function () { /* file mid-update - keep the last anchor */ });
+    }
+
+    function frame() {
+      var position = extrapolate(data, Date.now() / 1000);
+      var duration = data ? data.duration_seconds : 0;
+      onFrame({
+        data: data,
+        position: position,
+        positionFormatted: formatTime(position),
+        percentage: duration > 0 ? (position / duration) * 100 : 0
+      });
+      global.requestAnimationFrame(frame);
+    }
+
+    poll();
+    global.setInterval(poll, pollMs || 2000);
+    global.requestAnimationFrame(frame);
+  }
+
+  global.anpProgress = { extrapolate: extrapolate, formatTime: formatTime, watch: watch };
+})(window);
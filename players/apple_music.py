@@ -4,19 +4,45 @@ Apple Music player implementation - FIXED STATUS HANDLING
 import asyncio
 import threading
 import time
-import winrt.windows.media.control as wmc
+from datetime import datetime, timezone
 from players.base_player import BasePlayer
+from players.gsmtc import PlaybackStatus, WinRTSessionManager, is_apple_music_session
+from core.event_coalescer import EventCoalescer
+from core.runtime import get_runtime
+from core.tracing import annotate, span
+from core.adaptive_scheduler import (AdaptiveScheduler, SCHEDULE_PLAYING, SCHEDULE_PAUSED,
+                                     SCHEDULE_STOPPED, SCHEDULE_ABSENT)
 from utils.time_utils import timespan_to_seconds
-from config.settings import PROGRESS_UPDATE_INTERVAL, APPLE_MUSIC_POLLING_INTERVAL
+from config.settings import (PROGRESS_UPDATE_INTERVAL, GSMTC_DEBOUNCE_SESSIONS, GSMTC_DEBOUNCE_MEDIA,
+                             GSMTC_DEBOUNCE_PLAYBACK, GSMTC_DEBOUNCE_MAX_DELAY, CALL_DEADLINE_WINRT)
+
+# Coalesced GSMTC event kinds, in run priority order
+EVENT_SESSIONS = "sessions"
+EVENT_MEDIA = "media"
+EVENT_PLAYBACK = "playback"
 
 class AppleMusicPlayer(BasePlayer):
-    def __init__(self, file_manager, progress_tracker, artwork_manager):
+    def __init__(self, file_manager, progress_tracker, artwork_manager, session_manager=None):
         super().__init__("Apple Music", file_manager, progress_tracker, artwork_manager)
+        self.runtime = get_runtime()
         self.loop = None
+        self.monitor_future = None
         self.session = None
+        
+        # Long-lived session manager; the Apple Music session is attached as it comes and goes
+        self.session_manager = session_manager or WinRTSessionManager()
+        self._session_tokens = None
+        self._manager_tokens = None
+        self._monitor_stopped = None
+        self.events = None  # EventCoalescer, lives on the monitoring loop
         self.progress_task = None
+        self.artwork_task = None
         self._shutdown_lock = threading.Lock()
         self.current_track_id = None  # Track unique identifier
+        
+        # Progress cadence; media events wake the progress loop early
+        self.scheduler = AdaptiveScheduler()
+        self._schedule_wakeup = None
     
     def is_available(self):
         """Check if Apple Music is available"""
@@ -34,9 +60,9 @@ class AppleMusicPlayer(BasePlayer):
         self.is_running = True
         self.stop_event.clear()
         
-        # Start monitoring in separate thread
-        monitoring_thread = threading.Thread(target=self._run_monitoring_loop, daemon=True)
-        monitoring_thread.start()
+        # Monitor as a task on the shared runtime loop
+        self.loop = self.runtime.loop
+        self.monitor_future = self.runtime.spawn(self._monitor_apple_music(), "apple-music")
         print("Started Apple Music monitoring")
     
     def stop_monitoring(self):
@@ -57,18 +83,13 @@ class AppleMusicPlayer(BasePlayer):
                     pass
             
             # Remove event handlers BEFORE stopping loop
-            if self.session:
-                try:
-                    self.session.remove_media_properties_changed(self._on_media_changed)
-                    self.session.remove_playback_info_changed(self._on_playback_changed)
-                    self.session = None
-                except:
-                    pass
+            self._detach_session_locked()
+            self._unsubscribe_manager_locked()
             
-            # Stop event loop
-            if self.loop and self.loop.is_running():
+            # Let the monitor coroutine finish
+            if self.loop and not self.loop.is_closed() and self._monitor_stopped:
                 try:
-                    self.loop.call_soon_threadsafe(self.loop.stop)
+                    self.loop.call_soon_threadsafe(self._monitor_stopped.set)
                 except:
                     pass
             
@@ -78,87 +99,165 @@ class AppleMusicPlayer(BasePlayer):
             self.current_track_id = None
             print("Apple Music monitoring stopped")
     
-    def _run_monitoring_loop(self):
-        """Run the asyncio monitoring loop"""
-        self.loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(self.loop)
-        
-        try:
-            self.loop.run_until_complete(self._monitor_apple_music())
-        except Exception as e:
-            print(f"Apple Music monitoring error: {e}")
-        finally:
-            try:
-                if not self.loop.is_closed():
-                    self.loop.close()
-            except:
-                pass
-    
-    async def _get_apple_music_session(self):
-        """Get the Apple Music session"""
-        try:
-            manager = await wmc.GlobalSystemMediaTransportControlsSessionManager.request_async()
-            sessions = manager.get_sessions()
-            for session in sessions:
-                if "applemusic" in session.source_app_user_model_id.lower():
-                    return session
-            return None
-        except Exception as e:
-            print(f"Error getting Apple Music session: {e}")
-            return None
-    
     async def _monitor_apple_music(self):
-        """Main Apple Music monitoring loop"""
+        """Main Apple Music monitoring - event driven, no polling while Apple Music is absent"""
+        self._monitor_stopped = asyncio.Event()
+        self._schedule_wakeup = asyncio.Event()
+        
+        # Event storms collapse into one run per kind; a session refresh covers
+        # a track check, which covers a progress refresh
+        events = EventCoalescer(asyncio.get_running_loop(), GSMTC_DEBOUNCE_MAX_DELAY, "apple-music-events")
+        events.register(EVENT_SESSIONS, self._refresh_session, GSMTC_DEBOUNCE_SESSIONS,
+                        covers=(EVENT_MEDIA, EVENT_PLAYBACK))
+        events.register(EVENT_MEDIA, self._handle_track_change, GSMTC_DEBOUNCE_MEDIA,
+                        covers=(EVENT_PLAYBACK,))
+        events.register(EVENT_PLAYBACK, self._handle_playback_change, GSMTC_DEBOUNCE_PLAYBACK)
+        self.events = events
+        progress_task = None
         try:
-            self.session = await self._get_apple_music_session()
-            if not self.session:
-                print("Apple Music session not found")
+            if not await self.budget.wait_for(self.name, "winrt.RequestAsync", self.session_manager.open(),
+                                              CALL_DEADLINE_WINRT):
+                print("Media session manager unavailable")
                 self.clear_all_data()
                 return
             
-            # Set up event handlers
-            self.session.add_media_properties_changed(self._on_media_changed)
-            self.session.add_playback_info_changed(self._on_playback_changed)
-            
-            # Initial update
-            await self._handle_track_change()
+            # Session add/remove events attach and detach the Apple Music session
+            if not self._subscribe_manager():
+                return
             
             # Start continuous progress updates
-            self.progress_task = asyncio.create_task(self._continuous_progress_update())
+            progress_task = asyncio.create_task(self._continuous_progress_update(), name="apple-music-progress")
+            self.progress_task = progress_task
+            
+            # Attach if Apple Music is already running
+            events.post(EVENT_SESSIONS, immediate=True)
             
-            # Keep monitoring until stopped
-            while not self.stop_event.is_set() and self.is_running:
-                await asyncio.sleep(APPLE_MUSIC_POLLING_INTERVAL)
+            # Everything else happens in event handlers until stopped
+            if not self.stop_event.is_set():
+                await self._monitor_stopped.wait()
         
         except Exception as e:
             print(f"Apple Music monitoring loop error: {e}")
         
         finally:
             # Cleanup
-            if self.progress_task:
-                self.progress_task.cancel()
+            # Locals - a restart may already have replaced the attributes
+            events.close()
+            if progress_task:
+                progress_task.cancel()
                 try:
-                    await self.progress_task
+                    await progress_task
                 except asyncio.CancelledError:
                     pass
     
-    def _on_media_changed(self, session, args):
-        """Handle media property changes - FIXED RACE CONDITION"""
+    def _subscribe_manager(self):
+        """Subscribe to session list changes"""
         with self._shutdown_lock:
-            if self.loop and not self.loop.is_closed() and self.is_running:
-                try:
-                    asyncio.run_coroutine_threadsafe(self._handle_track_change(), self.loop)
-                except Exception:
-                    pass  # Silently ignore if loop is shutting down
+            if not self.is_running:
+                return False
+            self._manager_tokens = (
+                self.session_manager.add_sessions_changed(self._on_sessions_changed),
+                self.session_manager.add_current_session_changed(self._on_sessions_changed),
+            )
+            return True
     
-    def _on_playback_changed(self, session, args):
-        """Handle playback state changes - FIXED RACE CONDITION"""
+    def _unsubscribe_manager_locked(self):
+        """Remove session list handlers - caller holds _shutdown_lock"""
+        tokens, self._manager_tokens = self._manager_tokens, None
+        if tokens:
+            try:
+                self.session_manager.remove_sessions_changed(tokens[0])
+                self.session_manager.remove_current_session_changed(tokens[1])
+            except Exception:
+                pass
+    
+    def _attach_session(self, session):
+        """Attach media handlers to a session, replacing any previous one"""
         with self._shutdown_lock:
-            if self.loop and not self.loop.is_closed() and self.is_running:
-                try:
-                    asyncio.run_coroutine_threadsafe(self._update_progress_only(), self.loop)
-                except Exception:
-                    pass  # Silently ignore if loop is shutting down
+            if not self.is_running:
+                return False
+            self._detach_session_locked()
+            self.session = session
+            self._session_tokens = (
+                session.add_media_properties_changed(self._on_media_changed),
+                session.add_playback_info_changed(self._on_playback_changed),
+            )
+            return True
+    
+    def _detach_session_locked(self):
+        """Remove media handlers - caller holds _shutdown_lock"""
+        session, tokens = self.session, self._session_tokens
+        self.session = None
+        self._session_tokens = None
+        if session is not None and tokens:
+            try:
+                session.remove_media_properties_changed(tokens[0])
+                session.remove_playback_info_changed(tokens[1])
+            except Exception:
+                pass
+    
+    async def _refresh_session(self):
+        """Attach to the Apple Music session if it is running, detach if it is gone.
+        
+        A new session object is attached even when one is already attached:
+        after a quick restart of Apple Music the old one is dead, and the
+        track check below skips re-publishing an unchanged track.
+        """
+        if not self.is_running:
+            return
+        try:
+            sessions = await self._winrt_call("winrt.GetSessions", self.session_manager.get_sessions)
+            session = next((s for s in sessions if is_apple_music_session(s)), None)
+        except Exception as e:
+            print(f"Error listing media sessions: {e}")
+            return
+        
+        if session is None:
+            if self.session is not None:
+                print("Apple Music session closed - detaching")
+                with self._shutdown_lock:
+                    self._detach_session_locked()
+                self.clear_all_data()
+                self.current_track_id = None
+            else:
+                print("Apple Music not running - waiting for its session")
+            self._observe_schedule(SCHEDULE_ABSENT)
+            return
+        
+        was_attached = self.session is not None
+        if not self._attach_session(session):
+            return
+        if not was_attached:
+            print("Apple Music session found - attached")
+        await self._handle_track_change()
+    
+    async def _winrt_call(self, site, fn):
+        """Run a blocking WinRT call on the executor with a deadline, so a hang never stalls the loop"""
+        call = asyncio.get_running_loop().run_in_executor(None, fn)
+        return await self.budget.wait_for(self.name, site, call, CALL_DEADLINE_WINRT)
+    
+    def _post_event(self, kind):
+        """Hand a WinRT callback to the coalescer - no locks, any thread"""
+        events = self.events
+        if events is not None and self.is_running:
+            events.post(kind)
+    
+    def _on_sessions_changed(self, manager, args):
+        """Handle media sessions appearing or going away"""
+        self._post_event(EVENT_SESSIONS)
+    
+    def _on_media_changed(self, session, args):
+        """Handle media property changes"""
+        self._post_event(EVENT_MEDIA)
+    
+    def _on_playback_changed(self, session, args):
+        """Handle playback state changes"""
+        self._post_event(EVENT_PLAYBACK)
+    
+    def get_event_stats(self):
+        """GSMTC events received, coalesced and executed"""
+        events = self.events
+        return events.get_stats() if events else None
     
     def _create_track_id(self, title, artist, album, duration=0):
         """Create a unique track identifier"""
@@ -184,37 +283,50 @@ class AppleMusicPlayer(BasePlayer):
             return f"unknown({status})"
     
     async def _handle_track_change(self):
+        """Traced track check - media events, session attach and resume all land here"""
+        with span("apple_music.track_change", self.name):
+            await self._check_track_change()
+    
+    async def _check_track_change(self):
         """Handle track changes and artwork updates - FIXED STATUS HANDLING"""
         try:
             if not self.session or not self.is_running:
                 return
             
-            status = self.session.get_playback_info()
+            # When the GSMTC event behind this check arrived (None: not event driven)
+            detected_at = self.events.burst_posted_at if self.events else None
+            
+            status = await self._winrt_call("winrt.GetPlaybackInfo", self.session.get_playback_info)
             current_status = status.playback_status
             
             # Get status name safely
             status_name = self._get_status_name(current_status)
+            annotate(status=status_name)
             
             # Check for stopped/paused states
             if current_status in (
-                wmc.GlobalSystemMediaTransportControlsSessionPlaybackStatus.STOPPED,
-                wmc.GlobalSystemMediaTransportControlsSessionPlaybackStatus.PAUSED,
+                PlaybackStatus.STOPPED,
+                PlaybackStatus.PAUSED,
             ):
+                self._observe_schedule(self._schedule_state(current_status))
                 print(f"Apple Music {status_name} - clearing files")
                 self.clear_all_data()
                 self.current_track_id = None
                 return
             
             # Must be playing
-            if current_status != wmc.GlobalSystemMediaTransportControlsSessionPlaybackStatus.PLAYING:
+            if current_status != PlaybackStatus.PLAYING:
+                self._observe_schedule(self._schedule_state(current_status))
                 print(f"Apple Music not playing (status: {status_name}) - clearing files")
                 self.clear_all_data()
                 self.current_track_id = None
                 return
             
             # Get media info
-            info = await self.session.try_get_media_properties_async()
+            info = await self.budget.wait_for(self.name, "winrt.TryGetMediaPropertiesAsync",
+                                              self.session.try_get_media_properties_async(), CALL_DEADLINE_WINRT)
             if not info or (not info.title and not info.artist and not info.album_title):
+                self._observe_schedule(SCHEDULE_STOPPED)
                 print("No valid Apple Music media info - clearing files")
                 self.clear_all_data()
                 self.current_track_id = None
@@ -234,7 +346,7 @@ class AppleMusicPlayer(BasePlayer):
                 artist = full_artist or "Unknown Artist"
             
             # Get duration for unique track ID
-            timeline = self.session.get_timeline_properties()
+            timeline = await self._winrt_call("winrt.GetTimelineProperties", self.session.get_timeline_properties)
             duration = 0
             if timeline:
                 duration = timespan_to_seconds(timeline.end_time)
@@ -245,32 +357,17 @@ class AppleMusicPlayer(BasePlayer):
             # Check if this is truly a new track
             if track_id != self.current_track_id:
                 print(f"New Apple Music track detected: {artist} - {title}")
+                annotate(new_track=True, track=f"{artist} - {title}")
                 self.current_track_id = track_id
                 
-                # Clear old track data first
-                self.clear_all_data()
-                
-                # Wait a moment for any pending operations
-                await asyncio.sleep(0.2)
-                
-                # Handle artwork BEFORE writing track info
-                print("Processing artwork...")
-                artwork_success = await self.artwork_manager.handle_apple_music_artwork(self.session, artist, album, title)
-                
-                if artwork_success:
-                    print("Artwork processed successfully")
-                else:
-                    print("Artwork processing failed")
+                # Invalidate artwork jobs of the previous track before new text lands
+                generation = self.begin_artwork()
                 
-                # Wait for artwork processing to complete
-                await asyncio.sleep(0.5)
-                
-                # Now write track info
+                # Publish track info immediately - artwork follows when resolved
                 print("Writing track info...")
-                self.update_track_info(title, artist, album)
+                self.update_track_info(title, artist, album, detected_at)
                 
-                # Reset artwork flag
-                self.artwork_updated = True
+                self._start_artwork_resolution(generation, artist, album, title)
             
             # Update progress regardless of track change
             await self._update_progress_data(title, artist, album)
@@ -283,6 +380,38 @@ class AppleMusicPlayer(BasePlayer):
                 self.clear_all_data()
                 self.current_track_id = None
     
+    def _start_artwork_resolution(self, generation, artist, album, title):
+        """Resolve artwork in the background, replacing any previous track's job"""
+        if self.artwork_task and not self.artwork_task.done():
+            self.artwork_task.cancel()
+        self.artwork_task = asyncio.create_task(self._resolve_artwork(generation, artist, album, title),
+                                                name="apple-music-artwork")
+    
+    async def _resolve_artwork(self, generation, artist, album, title):
+        """Read the session thumbnail and hand it to the artwork pipeline"""
+        try:
+            direct_artwork = await self.budget.wait_for(self.name, "winrt.Thumbnail",
+                                                        self.artwork_manager.read_apple_music_artwork(self.session),
+                                                        CALL_DEADLINE_WINRT)
+            if not direct_artwork:
+                print("Apple Music artwork failed, trying fallback...")
+            
+            # Fallback lookups run on the pipeline workers, not on this loop
+            self.submit_artwork(generation, artist, album, title, direct_artwork)
+            self.artwork_updated = True
+        except asyncio.CancelledError:
+            pass
+        except Exception as e:
+            if self.is_running:
+                print(f"Apple Music artwork resolution error: {e}")
+    
+    async def _handle_playback_change(self):
+        """Playback state changed - a full track check when nothing is shown yet (resume)"""
+        if self.current_track_id:
+            await self._update_progress_only()
+        else:
+            await self._handle_track_change()
+    
     async def _update_progress_only(self):
         """Handle playback state changes (just progress updates)"""
         if self.current_track_id and self.last_track_info and self.is_running:
@@ -292,14 +421,17 @@ class AppleMusicPlayer(BasePlayer):
     async def _update_progress_data(self, title, artist, album):
         """Update progress data - THREAD SAFE"""
         try:
-            if not self.session or not self.is_running:
+            # A session refresh may detach self.session while this awaits
+            session = self.session
+            if not session or not self.is_running:
                 return
             
-            status = self.session.get_playback_info()
-            if status.playback_status != wmc.GlobalSystemMediaTransportControlsSessionPlaybackStatus.PLAYING:
+            status = await self._winrt_call("winrt.GetPlaybackInfo", session.get_playback_info)
+            if status.playback_status != PlaybackStatus.PLAYING:
+                self._observe_schedule(self._schedule_state(status.playback_status))
                 return
             
-            timeline = self.session.get_timeline_properties()
+            timeline = await self._winrt_call("winrt.GetTimelineProperties", session.get_timeline_properties)
             if timeline:
                 position_seconds = timespan_to_seconds(timeline.position)
                 duration_seconds = timespan_to_seconds(timeline.end_time)
@@ -307,6 +439,14 @@ class AppleMusicPlayer(BasePlayer):
                 position_seconds = 0
                 duration_seconds = 0
             
+            # The timeline position is only as fresh as its last update
+            self._observe_schedule(SCHEDULE_PLAYING,
+                                   position_seconds + self._timeline_age(timeline), duration_seconds)
+            
+            # The track may have changed or been cleared meanwhile - never publish stale progress
+            if self.last_track_info != (title, artist, album) or session is not self.session:
+                return
+            
             # Update progress in a thread-safe way
             try:
                 self.update_progress(title, artist, album, position_seconds, duration_seconds, True)
@@ -318,18 +458,70 @@ class AppleMusicPlayer(BasePlayer):
             if self.is_running:  # Only log if we're still supposed to be running
                 print(f"Error updating Apple Music progress: {e}")
     
+    def _schedule_state(self, status):
+        """Map a GSMTC playback status to an adaptive scheduler state"""
+        if status == PlaybackStatus.PLAYING:
+            return SCHEDULE_PLAYING
+        if status == PlaybackStatus.PAUSED:
+            return SCHEDULE_PAUSED
+        if status == PlaybackStatus.CLOSED:
+            return SCHEDULE_ABSENT
+        return SCHEDULE_STOPPED
+    
+    def _timeline_age(self, timeline):
+        """Seconds since GSMTC last updated the timeline position"""
+        try:
+            age = (datetime.now(timezone.utc) - timeline.last_updated_time).total_seconds()
+            return age if 0 < age < 3600 else 0
+        except Exception:
+            return 0
+    
+    def _observe_schedule(self, state, position_seconds=None, duration_seconds=None):
+        """Feed the scheduler and wake the progress loop when the state changes"""
+        if self.scheduler.observe(state, position_seconds, duration_seconds) and self._schedule_wakeup:
+            self._schedule_wakeup.set()
+    
+    async def _wait_for_schedule(self, delay, deferrable=False):
+        """Sleep until the next scheduled poll or an earlier state change.
+        
+        The poll is a timer on the shared timer service; a deferrable one
+        only runs when something else wakes the app.
+        """
+        handle = None
+        if delay is not None:
+            handle = self.runtime.timers.call_later(delay, self._schedule_wakeup.set,
+                                                    name="apple-music-progress", deferrable=deferrable)
+        try:
+            await self._schedule_wakeup.wait()
+        finally:
+            if handle:
+                handle.cancel()
+        self._schedule_wakeup.clear()
+    
     async def _continuous_progress_update(self):
-        """Continuously update progress every second"""
+        """Update progress on the adaptive schedule.
+        
+        Around the predicted end of a track the full track check runs at the
+        fast interval, so a transition is picked up even when the media
+        properties event is late. While nothing plays, GSMTC events report any
+        change, so the backed-off poll is deferrable and never wakes the app;
+        while Apple Music is not running there is no poll at all.
+        """
         while not self.stop_event.is_set() and self.is_running:
             try:
                 if self.session and self.current_track_id and self.last_track_info and self.is_running:
-                    title, artist, album = self.last_track_info
-                    await self._update_progress_data(title, artist, album)
+                    # Through the coalescer so a poll never overlaps an event-driven check
+                    if self.scheduler.near_track_end():
+                        self.events.post(EVENT_MEDIA, immediate=True)
+                    else:
+                        self.events.post(EVENT_PLAYBACK, immediate=True)
                 
-                await asyncio.sleep(PROGRESS_UPDATE_INTERVAL)
+                # No session means nothing to poll - sleep until one is attached
+                delay = self.scheduler.next_delay() if self.session is not None else None
+                await self._wait_for_schedule(delay, deferrable=self.scheduler.state != SCHEDULE_PLAYING)
             except asyncio.CancelledError:
                 break
             except Exception as e:
                 if self.is_running:  # Only log if we're still supposed to be running
                     print(f"Continuous progress update error: {e}")
-                await asyncio.sleep(PROGRESS_UPDATE_INTERVAL)
\ No newline at end of file
+                await self.runtime.timers.sleep(PROGRESS_UPDATE_INTERVAL, name="apple-music-retry")
\ No newline at end of file
@@ -2,7 +2,12 @@
 Base player class for music player implementations - OPTIMIZED CLEARING
 """
 import threading
+from contextlib import nullcontext
 from abc import ABC, abstractmethod
+from core.event_server import get_event_hub
+from core.runtime import get_runtime
+from core.track_latency import get_track_latency
+from config.settings import SNAPSHOT_PLACEHOLDER_ARTWORK
 
 # Player state constants
 class PlayerState:
@@ -16,6 +21,7 @@ class BasePlayer(ABC):
         self.file_manager = file_manager
         self.progress_tracker = progress_tracker
         self.artwork_manager = artwork_manager
+        self.event_hub = get_event_hub()
         
         # State tracking
         self.is_running = False
@@ -23,6 +29,27 @@ class BasePlayer(ABC):
         self.last_track_info = None
         self.artwork_updated = False
         self.last_clear_time = 0
+        
+        # Set by the player manager when several players are monitored at once
+        self.arbiter = None
+        self.last_progress = None
+        self.last_artwork_request = None
+        
+        # External calls run on a deadline; the watchdog restarts this player when one hangs.
+        # Taken on first use, so constructing a player does not start the runtime threads.
+        self._budget = None
+        
+        # Stage timestamps of each shown track change
+        self.latency = get_track_latency()
+    
+    @property
+    def budget(self):
+        """The shared call budget - registers this player with the watchdog on first use"""
+        if self._budget is None:
+            budget = get_runtime().budget
+            budget.register(self.name, self._on_hung_call)
+            self._budget = budget
+        return self._budget
     
     @abstractmethod
     def is_available(self):
@@ -39,42 +66,171 @@ class BasePlayer(ABC):
         """Stop monitoring this player"""
         pass
     
+    def standby(self):
+        """Stop publishing but keep connections warm for a quick restart - a full stop by default"""
+        self.stop_monitoring()
+    
+    def restart(self):
+        """Stop and start monitoring again - returns False if it was not running"""
+        if not self.is_running:
+            return False
+        self.stop_monitoring()
+        self.start_monitoring()
+        return True
+    
+    def _on_hung_call(self, record):
+        """Watchdog callback (executor thread) - a call of this player hung"""
+        if not self.restart():
+            print(f"{self.name} is not running - not restarted")
+    
     def track_changed(self, current_track_info):
         """Check if the track has changed"""
         if self.last_track_info != current_track_info:
             return True
         return False
     
-    def update_track_info(self, title, artist, album):
-        """Update track information and write to files"""
-        self.last_track_info = (title, artist, album)
+    def owns_outputs(self):
+        """Check whether this player's updates reach the outputs"""
+        return self.arbiter is None or self.arbiter.is_owner(self.name)
+    
+    def _output_lock(self):
+        """Held while checking ownership and writing, so a handover cannot interleave"""
+        return self.arbiter.lock if self.arbiter else nullcontext()
+    
+    def _report_state(self, active):
+        """Tell the arbiter whether a track is shown - returns True if this player just took over"""
+        if self.arbiter is None:
+            return False
+        previous_owner = self.arbiter.owner
+        owner = self.arbiter.report(self.name, active)
+        return owner == self.name and previous_owner != self.name
+    
+    def update_track_info(self, title, artist, album, detected_at=None):
+        """Update track information and write to files
         
-        # Write to nowplaying.txt
-        self.file_manager.write_now_playing(title, artist, album)
+        detected_at is the time.perf_counter() at which the backend saw the
+        change (event received or poll tick) - the start of its latency trace.
+        """
+        previous_track_info = self.last_track_info
+        self.last_track_info = (title, artist, album)
+        self.last_progress = None
+        self.last_artwork_request = None
         
         # Reset artwork flag
         self.artwork_updated = False
+        
+        with self._output_lock():
+            took_over = self._report_state(True)
+            if not self.owns_outputs():
+                return
+            
+            # The outputs show another player's cover after a takeover
+            if took_over:
+                previous_track_info = None
+            self.latency.begin(self.name, title, artist, album, detected_at)
+            self._publish_track_info(title, artist, album, previous_track_info)
+    
+    def _publish_track_info(self, title, artist, album, previous_track_info, allow_placeholder=True):
+        # A new album must not be shown with the previous album's cover, so the
+        # text goes out together with the default cover until the real one resolves
+        placeholder = None
+        if SNAPSHOT_PLACEHOLDER_ARTWORK and allow_placeholder and (
+                not previous_track_info or previous_track_info[1:] != (artist, album)):
+            placeholder = self.file_manager.load_default_artwork()
+        
+        # Write to nowplaying.txt
+        self.file_manager.write_now_playing(title, artist, album, artwork=placeholder)
+        self.event_hub.publish_now_playing(title, artist, album, self.name)
+        if placeholder:
+            # Hub clients must not keep showing the previous album's cover either
+            self.event_hub.publish_artwork(placeholder, "default")
     
     def update_progress(self, title, artist, album, position_seconds, duration_seconds, is_playing=True):
         """Update progress information"""
+        self.last_progress = (title, artist, album, position_seconds, duration_seconds, is_playing)
+        with self._output_lock():
+            if self._report_state(True):
+                # Took over without a new track - publish the one this player shows
+                self._republish_locked()
+                return
+            if not self.owns_outputs():
+                return
+            self._publish_progress(*self.last_progress)
+    
+    def _publish_progress(self, title, artist, album, position_seconds, duration_seconds, is_playing):
         self.progress_tracker.update_progress(
             title, artist, album, position_seconds, 
             duration_seconds, is_playing, self.name
         )
+        self.event_hub.publish_progress(title, artist, album, position_seconds,
+                                        duration_seconds, is_playing, self.name)
+    
+    def begin_artwork(self):
+        """Start artwork for a new track - returns the pipeline generation, or None when not owning the outputs"""
+        self.last_artwork_request = None
+        with self._output_lock():
+            if not self.owns_outputs():
+                return None
+            return self.artwork_manager.begin_track()
+    
+    def submit_artwork(self, generation, artist, album, title=None, direct_artwork=None):
+        """Hand artwork to the pipeline; kept for re-publishing after a handover"""
+        self.last_artwork_request = (artist, album, title, direct_artwork)
+        with self._output_lock():
+            if not self.owns_outputs():
+                return None
+            # Became the owner between begin_artwork() and now
+            if generation is None:
+                generation = self.artwork_manager.begin_track()
+            return self.artwork_manager.submit_artwork(generation, artist, album, title, direct_artwork)
+    
+    def republish(self):
+        """Publish this player's current state again - called when it takes over the outputs"""
+        with self._output_lock():
+            self._republish_locked()
+    
+    def _republish_locked(self):
+        if not self.last_track_info or not self.owns_outputs():
+            return
+        title, artist, album = self.last_track_info
+        # The known artwork is resubmitted right below - no default cover flash in between
+        self._publish_track_info(title, artist, album, None, allow_placeholder=not self.last_artwork_request)
+        if self.last_progress:
+            self._publish_progress(*self.last_progress)
+        generation = self.artwork_manager.begin_track()
+        if self.last_artwork_request:
+            self.artwork_manager.submit_artwork(generation, *self.last_artwork_request)
     
     def clear_all_data(self):
         """Clear all player data - RATE LIMITED"""
         import time
-        current_time = time.time()
-        
-        # Rate limit clearing to once per 2 seconds
-        if current_time - self.last_clear_time < 2.0:
-            return
-        
-        self.last_clear_time = current_time
-        self.last_track_info = None
-        self.artwork_updated = False
         
-        # Clear files
-        self.file_manager.clear_now_playing()
-        self.progress_tracker.clear_progress()
\ No newline at end of file
+        with self._output_lock():
+            # Another active player takes over instead of the outputs being cleared
+            self._report_state(False)
+            owner = self.owns_outputs()
+            
+            # Never let a pending artwork job land after clearing
+            if owner:
+                self.artwork_manager.cancel_pending()
+            
+            current_time = time.time()
+            
+            # Rate limit clearing to once per 2 seconds
+            if current_time - self.last_clear_time < 2.0:
+                return
+            
+            self.last_clear_time = current_time
+            self.last_track_info = None
+            self.last_progress = None
+            self.last_artwork_request = None
+            self.artwork_updated = False
+            
+            if not owner:
+                return
+            
+            # Clear files
+            self.latency.cancel()
+            self.file_manager.clear_now_playing()
+            self.progress_tracker.clear_progress()
+            self.event_hub.publish_clear()
\ No newline at end of file
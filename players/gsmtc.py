@@ -0,0 +1,89 @@
+"""
+GSMTC session manager access - WinRT on Windows (fakes for running without it are in testing.fakes)
+
+The Apple Music backend only talks to the media session manager through
+this interface. The WinRT implementation requests the manager once and
+keeps it for the life of the process; the fake lets the attach/detach logic
+run anywhere.
+
+Event handlers are called as handler(sender, args) from whatever thread the
+event fires on, like WinRT does. add_* returns a token for remove_*.
+"""
+from abc import ABC, abstractmethod
+from enum import IntEnum
+
+
+class PlaybackStatus(IntEnum):
+    """Same values as GlobalSystemMediaTransportControlsSessionPlaybackStatus"""
+    CLOSED = 0
+    OPENED = 1
+    CHANGING = 2
+    STOPPED = 3
+    PLAYING = 4
+    PAUSED = 5
+
+
+def is_apple_music_session(session):
+    return "applemusic" in (session.source_app_user_model_id or "").lower()
+
+
+class SessionManager(ABC):
+    """Interface for the GSMTC session manager"""
+
+    @abstractmethod
+    async def open(self):
+        """Acquire the manager (once) - returns False if unavailable"""
+        pass
+
+    @abstractmethod
+    def get_sessions(self):
+        pass
+
+    @abstractmethod
+    def add_sessions_changed(self, handler):
+        pass
+
+    @abstractmethod
+    def remove_sessions_changed(self, token):
+        pass
+
+    @abstractmethod
+    def add_current_session_changed(self, handler):
+        pass
+
+    @abstractmethod
+    def remove_current_session_changed(self, token):
+        pass
+
+
+class WinRTSessionManager(SessionManager):
+    """GlobalSystemMediaTransportControlsSessionManager, requested once and kept"""
+
+    def __init__(self):
+        self._manager = None
+
+    async def open(self):
+        if self._manager is not None:
+            return True
+        try:
+            import winrt.windows.media.control as wmc
+            self._manager = await wmc.GlobalSystemMediaTransportControlsSessionManager.request_async()
+            return self._manager is not None
+        except Exception as e:
+            print(f"GSMTC session manager unavailable: {e}")
+            return False
+
+    def get_sessions(self):
+        return list(self._manager.get_sessions())
+
+    def add_sessions_changed(self, handler):
+        return self._manager.add_sessions_changed(handler)
+
+    def remove_sessions_changed(self, token):
+        self._manager.remove_sessions_changed(token)
+
+    def add_current_session_changed(self, handler):
+        return self._manager.add_current_session_changed(handler)
+
+    def remove_current_session_changed(self, token):
+        self._manager.remove_current_session_changed(token)
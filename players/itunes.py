@@ -4,121 +4,275 @@ iTunes player implementation - FIXED COM THREADING ISSUES
 import threading
 import time
 from players.base_player import BasePlayer, PlayerState
-from config.settings import PROGRESS_UPDATE_INTERVAL, ITUNES_POLLING_INTERVAL
+from players.itunes_events import ComEventSource
+from core.runtime import get_runtime
+from core.tracing import span
+from utils.process_utils import AvailabilityProbe, is_process_running
+from core.adaptive_scheduler import (AdaptiveScheduler, SCHEDULE_PLAYING, SCHEDULE_PAUSED,
+                                     SCHEDULE_STOPPED, SCHEDULE_ABSENT)
+from config.settings import (PROGRESS_UPDATE_INTERVAL, ITUNES_MONITOR_MODE,
+                             ITUNES_EVENT_RESYNC_INTERVAL, ITUNES_STOP_GRACE,
+                             ITUNES_TRACK_CACHE_TTL, ITUNES_PROCESS_NAME, PLAYER_AVAILABILITY_TTL,
+                             PLAYER_STANDBY_TIMEOUT, CALL_DEADLINE_COM)
+
+# last_known_state -> adaptive scheduler state
+_SCHEDULE_STATES = {
+    "playing": SCHEDULE_PLAYING,
+    "paused": SCHEDULE_PAUSED,
+    "stopped": SCHEDULE_STOPPED,
+    "empty": SCHEDULE_STOPPED,
+    "unknown": SCHEDULE_STOPPED,
+    "unreachable": SCHEDULE_ABSENT,
+}
+
+class _TrackMetadata:
+    """Per-track values read once through COM"""
+    __slots__ = ("database_id", "title", "artist", "album", "duration", "read_at")
+
+    def __init__(self, database_id, title, artist, album, duration, read_at):
+        self.database_id = database_id
+        self.title = title
+        self.artist = artist
+        self.album = album
+        self.duration = duration
+        self.read_at = read_at
+
+class _AbandonedRun(BaseException):
+    """Raised in a monitoring run whose COM apartment the watchdog gave up on.
+    
+    A BaseException so it passes every error handler of the stale run
+    instead of clearing the outputs the restarted run now owns.
+    """
 
 class iTunesPlayer(BasePlayer):
-    def __init__(self, file_manager, progress_tracker, artwork_manager):
+    def __init__(self, file_manager, progress_tracker, artwork_manager,
+                 event_source=None, itunes_factory=None, process_check=None):
         super().__init__("iTunes", file_manager, progress_tracker, artwork_manager)
         self.itunes = None
         self.last_progress_update = 0
-        self._com_initialized = False
         self.last_known_state = None
         self.consecutive_empty_checks = 0
-        self._monitoring_thread = None
+        self._monitor_future = None  # long-running job on the shared COM apartment
+        self.runtime = get_runtime()
+        self.apartment = self.runtime.apartment
+        self.timers = self.runtime.timers
+        
+        # Event-driven monitoring (falls back to polling when events are unavailable)
+        if event_source is None and ITUNES_MONITOR_MODE == "events":
+            event_source = ComEventSource()
+        self.event_source = event_source
+        self.itunes_factory = itunes_factory or self._create_itunes
+        # True/False for a running iTunes process, None when the process list cannot be read
+        self.process_check = process_check or (lambda: is_process_running(ITUNES_PROCESS_NAME))
+        self.monitor_mode = None
+        self._current_track = None
+        self._pending_stop_at = None
+        self._itunes_quitting = False
+        
+        # Track metadata cache and COM call accounting
+        self._track_cache = None
+        self._tick_calls = 0
+        self.com_stats = {"ticks": 0, "com_calls": 0, "last_tick_calls": 0,
+                          "track_cache_hits": 0, "track_cache_misses": 0}
+        
+        # Polling cadence in polling mode
+        self.scheduler = AdaptiveScheduler()
+        self._last_position = None
+        self._last_duration = None
+        self._poll_wakeup = threading.Event()
+        
+        # Availability is checked against the process list, cached for a few seconds
+        self.availability = AvailabilityProbe(self._probe_availability, PLAYER_AVAILABILITY_TTL)
+        self._probe_future = None
+        
+        # Warm standby: the monitoring job keeps its COM object while switched away
+        self._standby_lock = threading.Lock()
+        self._standby_requested = False
+        self._resume_event = threading.Event()
+        self.in_standby = False
     
     def is_available(self):
         """Check if iTunes is available"""
+        if self.in_standby:
+            return True
+        return self.availability.is_available()
+    
+    def _probe_availability(self):
+        """Process list first - creating the COM object would launch iTunes"""
+        running = self.process_check()
+        if running is not None:
+            return running
         return self._test_itunes_availability()
     
     def _test_itunes_availability(self):
-        """Test iTunes availability in a separate thread (COM-safe)"""
-        result = [False]  # Use list to store result from thread
+        """Test iTunes availability on the COM apartment"""
+        # The monitor holds a live object - nothing to test
+        if self.itunes is not None:
+            return True
         
-        def test_thread():
+        # A probe that timed out earlier may still hang in CreateObject - don't queue another
+        if self._probe_future and not self._probe_future.done():
+            print("Previous iTunes availability test still running")
+            return False
+        
+        def test_itunes():
+            import comtypes.client
             try:
-                import pythoncom
-                import comtypes.client
-                
-                # Initialize COM properly for this thread
-                pythoncom.CoInitializeEx(pythoncom.COINIT_APARTMENTTHREADED)
-                
-                try:
+                with self.budget.call(self.name, "itunes.probe", CALL_DEADLINE_COM):
                     itunes = comtypes.client.CreateObject("iTunes.Application")
                     if itunes:
                         # Quick test - try to access a simple property
                         _ = itunes.Version
-                        result[0] = True
-                except Exception as e:
-                    print(f"iTunes availability test failed: {e}")
-                    result[0] = False
-                finally:
-                    pythoncom.CoUninitialize()
-                    
+                        return True
             except Exception as e:
-                print(f"COM initialization failed in test: {e}")
-                result[0] = False
+                print(f"iTunes availability test failed: {e}")
+            return False
         
-        # Run test in separate thread
-        test_thread_obj = threading.Thread(target=test_thread, daemon=True)
-        test_thread_obj.start()
-        test_thread_obj.join(timeout=5.0)  # 5 second timeout
-        
-        return result[0]
+        self._probe_future = self.apartment.submit(test_itunes, name="itunes-probe")
+        try:
+            return self._probe_future.result(timeout=5.0)  # 5 second timeout
+        except Exception as e:
+            # Still queued behind another job - drop it; a hung one is left to finish
+            self._probe_future.cancel()
+            print(f"iTunes availability test did not finish: {e or 'timeout'}")
+            return False
+    
+    def _monitor_active(self):
+        return self._monitor_future is not None and not self._monitor_future.done()
     
     def start_monitoring(self):
         """Start monitoring iTunes"""
-        if self.is_running:
-            print("iTunes monitoring already running")
-            return
+        with self._standby_lock:
+            if self.is_running and self._monitor_active():
+                print("iTunes monitoring already running")
+                return
+            
+            self.is_running = True
+            self.stop_event.clear()
+            self._reset_monitoring_state()
+            
+            # Resume the warm monitoring job - same COM object, no CreateObject
+            if self._standby_requested and self._monitor_active():
+                self._standby_requested = False
+                self._resume_event.set()
+                self._wake_monitor()
+                print("Resumed iTunes monitoring from standby")
+                return
+            
+            self._standby_requested = False
+            self._resume_event.clear()
+            self._itunes_quitting = False
         
-        self.is_running = True
-        self.stop_event.clear()
+        # Monitoring runs as a job on the COM apartment, which owns every COM object
+        self._monitor_future = self.apartment.submit(self._safe_monitoring_wrapper, name="itunes-monitor")
+        print("Started iTunes monitoring")
+    
+    def _reset_monitoring_state(self):
+        """Forget what was shown so the first check publishes everything again"""
         self.consecutive_empty_checks = 0
         self.last_known_state = None
+        self.last_track_info = None
+        self.last_progress_update = 0
+        self._current_track = None
+        self._pending_stop_at = None
+    
+    def standby(self):
+        """Stop publishing but keep the monitoring job and COM object for a quick restart"""
+        with self._standby_lock:
+            if not self.is_running:
+                return
+            print("iTunes monitoring going to standby...")
+            self._standby_requested = True
+            self._resume_event.clear()
+            self.is_running = False
+            self.stop_event.set()
+        self._wake_monitor()
         
-        # Start monitoring in separate thread with proper COM handling
-        self._monitoring_thread = threading.Thread(target=self._safe_monitoring_wrapper, daemon=True)
-        self._monitoring_thread.start()
-        print("Started iTunes monitoring")
+        self.clear_all_data()
     
     def stop_monitoring(self):
         """Stop monitoring iTunes"""
-        if not self.is_running:
+        with self._standby_lock:
+            was_running = self.is_running
+            self._standby_requested = False
+            self.is_running = False
+            self.stop_event.set()
+            self._resume_event.set()
+        self._wake_monitor()
+        
+        monitor_active = self._monitor_active()
+        if not was_running and not monitor_active:
             return
         
         print("Stopping iTunes monitoring...")
-        self.stop_event.set()
-        self.is_running = False
         
-        # Wait for monitoring thread to finish (with timeout)
-        if self._monitoring_thread and self._monitoring_thread.is_alive():
-            self._monitoring_thread.join(timeout=3.0)
+        # Wait for the monitoring job to finish (with timeout)
+        if monitor_active and not self.apartment.is_apartment_thread():
+            try:
+                self._monitor_future.result(timeout=3.0)
+            except Exception:
+                pass
         
         # Clear data ONCE on stop
-        self.clear_all_data()
+        if was_running:
+            self.clear_all_data()
         print("iTunes monitoring stopped")
     
+    def restart(self):
+        """Watchdog restart: abandon an apartment stuck in a hung COM call, then start over.
+        
+        The hung run keeps its thread until the call returns, if ever; it
+        then notices the apartment is no longer current and exits quietly.
+        """
+        if self.apartment.current_job is not None:
+            self.apartment = self.runtime.replace_apartment(self.apartment)
+            self._monitor_future = None
+            self._probe_future = None
+        return super().restart()
+    
+    def _is_current_run(self):
+        """True on the thread of the apartment this player currently uses"""
+        return self.apartment.is_apartment_thread()
+    
+    def _check_current_run(self):
+        if not self._is_current_run():
+            raise _AbandonedRun()
+    
+    def _wake_monitor(self):
+        """Interrupt whatever wait the monitoring job is in - THREAD SAFE"""
+        self._poll_wakeup.set()
+        if self.event_source:
+            self.event_source.wake()
+    
     def _safe_monitoring_wrapper(self):
-        """Safe wrapper for monitoring with proper COM handling"""
+        """Safe wrapper for monitoring - runs on the COM apartment"""
         try:
             self._run_monitoring_loop()
         except Exception as e:
             print(f"iTunes monitoring wrapper error: {e}")
             import traceback
             traceback.print_exc()
-        finally:
-            # Ensure COM is cleaned up
-            try:
-                if self._com_initialized:
-                    import pythoncom
-                    pythoncom.CoUninitialize()
-                    self._com_initialized = False
-            except:
-                pass
+    
+    def _create_itunes(self):
+        """Create the iTunes object - COM is already initialized on the apartment thread"""
+        import comtypes.client
+        
+        return comtypes.client.CreateObject("iTunes.Application")
     
     def _run_monitoring_loop(self):
-        """Run the iTunes monitoring loop with proper COM initialization"""
-        # Initialize COM in THIS thread
+        """Run the iTunes monitoring loop on the COM apartment"""
+        self._run_itunes_session()
+        while self._wait_for_relaunch():
+            self._run_itunes_session()
+    
+    def _run_itunes_session(self):
+        """Monitor one iTunes process: create the COM object, monitor, release it"""
         try:
-            import pythoncom
-            import comtypes.client
-            
-            print("Initializing COM for iTunes monitoring...")
-            pythoncom.CoInitializeEx(pythoncom.COINIT_APARTMENTTHREADED)
-            self._com_initialized = True
-            
-            # Create iTunes COM object in this thread
-            self.itunes = comtypes.client.CreateObject("iTunes.Application")
+            # Create iTunes COM object on the apartment thread
+            with self.budget.call(self.name, "itunes.CreateObject", CALL_DEADLINE_COM):
+                itunes = self.itunes_factory()
+            self._check_current_run()
+            self.itunes = itunes
             if not self.itunes:
                 print("Failed to create iTunes COM object")
                 return
@@ -130,20 +284,10 @@ class iTunesPlayer(BasePlayer):
             self.clear_all_data()
             return
         
-        # Main monitoring loop
         try:
-            while not self.stop_event.is_set() and self.is_running:
-                try:
-                    self._check_itunes_status()
-                    time.sleep(ITUNES_POLLING_INTERVAL)
-                except Exception as e:
-                    print(f"iTunes polling error: {e}")
-                    self.consecutive_empty_checks += 1
-                    if self.consecutive_empty_checks >= 3:
-                        print("Multiple iTunes errors - clearing data")
-                        self.clear_all_data()
-                        self.consecutive_empty_checks = 0
-                    time.sleep(ITUNES_POLLING_INTERVAL)
+            self._monitor_itunes()
+            while self._wait_in_standby():
+                self._monitor_itunes()
         
         except Exception as e:
             print(f"iTunes monitoring loop error: {e}")
@@ -152,16 +296,321 @@ class iTunesPlayer(BasePlayer):
             self.clear_all_data()
         
         finally:
-            # Cleanup COM - CRITICAL for preventing GIL issues
-            self.itunes = None
-            if self._com_initialized:
+            # Release the object; the apartment itself stays initialized for the next start.
+            # An abandoned run leaves everything to the run that replaced it.
+            if self._is_current_run():
+                self.itunes = None
+                self._current_track = None
+                print("iTunes COM object released")
+    
+    def _wait_for_relaunch(self):
+        """After iTunes quit, wait for its process to exit and start again - returns True to reconnect.
+        
+        Only the process list is checked - creating the COM object would
+        launch iTunes. When the list cannot be read, monitoring ends and
+        is_running is cleared, so the next start_monitoring() starts over.
+        """
+        with self._standby_lock:
+            if not self._itunes_quitting or not self.is_running or not self._is_current_run():
+                return False
+        
+        print("iTunes quit - waiting for it to start again")
+        exited = False
+        while not self.stop_event.is_set() and self.is_running:
+            running = self.process_check()
+            if running is None:
+                break
+            if not running:
+                exited = True
+            elif exited:
+                with self._standby_lock:
+                    if not self.is_running:
+                        return False
+                    self._itunes_quitting = False
+                    self._reset_monitoring_state()
+                self.availability.invalidate()
+                print("iTunes started again - reconnecting")
+                return True
+            self.scheduler.observe(SCHEDULE_ABSENT)
+            self._wait_for_poll(self.scheduler.next_delay())
+        
+        with self._standby_lock:
+            if self.is_running:
+                print("iTunes quit - monitoring stopped")
+                self.is_running = False
+        return False
+    
+    def _monitor_itunes(self):
+        """Monitor until stopped, put in standby, or iTunes quits"""
+        # Event-driven when possible, polling otherwise
+        if self.event_source and self._run_event_loop():
+            return
+        
+        self.monitor_mode = "polling"
+        print("iTunes polling mode active")
+        while not self.stop_event.is_set() and self.is_running:
+            try:
+                self._check_itunes_status()
+                self._end_tick()
+                self._observe_schedule()
+            except Exception as e:
+                print(f"iTunes polling error: {e}")
+                self.consecutive_empty_checks += 1
+                if self.consecutive_empty_checks >= 3:
+                    print("Multiple iTunes errors - clearing data")
+                    self.clear_all_data()
+                    self.consecutive_empty_checks = 0
+                self.scheduler.observe(SCHEDULE_ABSENT)
+            self._wait_for_poll(self.scheduler.next_delay())
+    
+    def _wait_for_poll(self, delay):
+        """Sleep until the next poll on a shared timer, or until stopped"""
+        self._poll_wakeup.clear()
+        if self.stop_event.is_set():
+            return
+        handle = self.timers.call_later(delay, self._poll_wakeup.set, name="itunes-poll")
+        try:
+            self._poll_wakeup.wait()
+        finally:
+            handle.cancel()
+    
+    def _wait_in_standby(self):
+        """Hold the COM object until resumed - returns True to monitor again.
+        
+        Events stay connected so a quitting iTunes still gets its COM object
+        released; everything else is ignored. After PLAYER_STANDBY_TIMEOUT
+        the object is released and the next start is a cold one.
+        """
+        with self._standby_lock:
+            if self._itunes_quitting or not self.itunes:
+                return False
+            if not self._standby_requested:
+                # Resumed before standby began, or stopped for good
+                return self.is_running
+            self.in_standby = True
+        
+        print("iTunes monitoring in standby")
+        deadline = time.time() + PLAYER_STANDBY_TIMEOUT
+        connected = self.event_source is not None and self.event_source.connect(self.itunes, self)
+        try:
+            while not self._resume_event.is_set() and not self._itunes_quitting:
+                remaining = deadline - time.time()
+                if remaining <= 0:
+                    break
+                if connected:
+                    # start_monitoring() and stop_monitoring() wake the pump
+                    self.event_source.pump(remaining)
+                else:
+                    self._resume_event.wait(remaining)
+        finally:
+            if connected:
+                self.event_source.disconnect()
+        
+        with self._standby_lock:
+            self.in_standby = False
+            self._resume_event.clear()
+            if self.is_running and not self._itunes_quitting:
+                return True
+            if self._standby_requested:
+                print("iTunes standby ended - releasing COM object")
+            self._standby_requested = False
+            return False
+    
+    def _run_event_loop(self):
+        """Event-driven monitoring - returns False to fall back to polling.
+        
+        Waits in the event pump instead of polling. While playing, a shared
+        timer wakes the pump once per PROGRESS_UPDATE_INTERVAL to read the
+        position; while idle the pump waits with no timeout at all. The full
+        resync (at most every ITUNES_EVENT_RESYNC_INTERVAL) only rides on
+        wakeups that happen anyway.
+        """
+        with self.budget.call(self.name, "itunes.GetEvents", CALL_DEADLINE_COM):
+            connected = self.event_source.connect(self.itunes, self)
+        self._check_current_run()
+        if not connected:
+            print("iTunes events unavailable - falling back to polling")
+            return False
+        
+        self.monitor_mode = "events"
+        print("iTunes event mode active")
+        try:
+            # Pick up whatever is already playing
+            self._sync_player_state()
+            last_resync = time.time()
+            
+            while not self.stop_event.is_set() and self.is_running and not self._itunes_quitting:
+                now = time.time()
+                if self._pending_stop_at is not None:
+                    timeout, timer_name = self._pending_stop_at + ITUNES_STOP_GRACE - now, "itunes-stop-grace"
+                elif self.last_known_state == "playing":
+                    timeout, timer_name = self.last_progress_update + PROGRESS_UPDATE_INTERVAL - now, "itunes-progress"
+                else:
+                    timeout = None
+                
+                handle = None
+                if timeout is not None:
+                    handle = self.timers.call_later(max(timeout, 0.0), self.event_source.wake, name=timer_name)
                 try:
-                    print("Cleaning up iTunes COM...")
-                    pythoncom.CoUninitialize()
-                    self._com_initialized = False
-                    print("iTunes COM cleanup complete")
-                except Exception as cleanup_error:
-                    print(f"COM cleanup error: {cleanup_error}")
+                    self.event_source.pump(None)
+                finally:
+                    if handle:
+                        handle.cancel()
+                if self._itunes_quitting or self.stop_event.is_set():
+                    break
+                
+                now = time.time()
+                if self._pending_stop_at is not None and now - self._pending_stop_at >= ITUNES_STOP_GRACE:
+                    self._sync_player_state()
+                if self.last_known_state == "playing" and \
+                        now - self.last_progress_update >= PROGRESS_UPDATE_INTERVAL:
+                    self._update_event_progress()
+                if now - last_resync >= ITUNES_EVENT_RESYNC_INTERVAL:
+                    self._sync_player_state()
+                    last_resync = now
+                self._end_tick()
+            return True
+        
+        except Exception as e:
+            print(f"iTunes event loop error: {e} - falling back to polling")
+            return self._itunes_quitting
+        
+        finally:
+            # An abandoned run must not disconnect the events of the run that replaced it
+            if self._is_current_run():
+                self.event_source.disconnect()
+                if self._itunes_quitting:
+                    print("iTunes is quitting - released COM object")
+                    self.clear_all_data()
+    
+    def on_player_play(self, track):
+        """Playback started - COM event, runs on the COM apartment"""
+        if self.in_standby:
+            return
+        self._pending_stop_at = None
+        self._sync_current_track(time.perf_counter())
+    
+    def on_player_stop(self, track):
+        """Playback stopped or paused - clear after a short grace period
+        
+        iTunes sends stop followed by play when it moves to the next track,
+        so the clear is deferred to avoid blanking the overlay in between.
+        """
+        if self.last_known_state == "playing" and not self.in_standby:
+            self._pending_stop_at = time.time()
+    
+    def on_track_info_changed(self, track):
+        """Info of the playing track changed (e.g. stream titles)"""
+        self._track_cache = None
+        if self.last_known_state == "playing" and not self.in_standby:
+            self._sync_current_track(time.perf_counter())
+    
+    def on_quitting(self):
+        """iTunes is quitting - the COM object has to be released right away"""
+        self._itunes_quitting = True
+        self._current_track = None
+        self.itunes = None
+        self.availability.invalidate()
+    
+    def _sync_current_track(self, detected_at=None):
+        """Read the current track once and publish it - detected_at: when the event behind it arrived"""
+        track = self._com_get(self.itunes, "CurrentTrack")
+        if not track:
+            return
+        metadata = self._track_metadata(track)
+        self._current_track = track
+        self.consecutive_empty_checks = 0
+        self.last_known_state = "playing"
+        self._handle_playing_track(track, metadata.title, metadata.artist, metadata.album,
+                                   metadata.duration, detected_at)
+    
+    def _sync_player_state(self):
+        """Full state check in event mode - at startup, after a stop event and as a periodic safety net"""
+        self._pending_stop_at = None
+        player_state = self._com_get(self.itunes, "PlayerState")
+        if player_state == PlayerState.PLAYING:
+            self._sync_current_track()
+            return
+        
+        state = "paused" if player_state == PlayerState.PAUSED else "stopped"
+        if self.last_known_state != state:
+            print(f"iTunes {state} - clearing files")
+            self.clear_all_data()
+            self.last_known_state = state
+        self._current_track = None
+    
+    def _update_event_progress(self):
+        """Position is the only value polled while playing in event mode"""
+        if not self._current_track or not self._track_cache or not self.last_track_info:
+            return
+        try:
+            position_seconds = self._com_get(self.itunes, "PlayerPosition")
+            title, artist, album = self.last_track_info
+            self.update_progress(title, artist, album, position_seconds, self._track_cache.duration, True)
+        except Exception as progress_e:
+            print(f"Error getting iTunes progress: {progress_e}")
+        self.last_progress_update = time.time()
+    
+    def _com_get(self, com_object, name):
+        """Read one COM property - every read is a cross-process round trip, so count and time it"""
+        self._tick_calls += 1
+        self.com_stats["com_calls"] += 1
+        with self.budget.call(self.name, f"itunes.{name}", CALL_DEADLINE_COM):
+            value = getattr(com_object, name)
+        self._check_current_run()
+        return value
+    
+    def _end_tick(self):
+        self.com_stats["ticks"] += 1
+        self.com_stats["last_tick_calls"] = self._tick_calls
+        self._tick_calls = 0
+    
+    def _track_metadata(self, track):
+        """Title, artist, album and duration, read once per track.
+        
+        Identity is TrackDatabaseID, a single cheap read. Entries are re-read
+        after ITUNES_TRACK_CACHE_TTL so tag edits and stream titles show up
+        even without a track-changed event.
+        """
+        try:
+            database_id = self._com_get(track, "TrackDatabaseID")
+        except Exception:
+            database_id = None
+        
+        cached = self._track_cache
+        now = time.time()
+        if (cached is not None and database_id is not None and cached.database_id == database_id
+                and now - cached.read_at < ITUNES_TRACK_CACHE_TTL):
+            self.com_stats["track_cache_hits"] += 1
+            return cached
+        
+        self.com_stats["track_cache_misses"] += 1
+        metadata = _TrackMetadata(
+            database_id,
+            self._com_get(track, "Name") or "Unknown Title",
+            self._com_get(track, "Artist") or "Unknown Artist",
+            self._com_get(track, "Album") or "Unknown Album",
+            self._com_get(track, "Duration"),
+            now,
+        )
+        self._track_cache = metadata
+        return metadata
+    
+    def _observe_schedule(self):
+        """Feed what this tick saw to the adaptive scheduler"""
+        state = _SCHEDULE_STATES.get(self.last_known_state, SCHEDULE_STOPPED)
+        self.scheduler.observe(state, self._last_position, self._last_duration)
+        self._last_position = None
+    
+    def get_com_stats(self):
+        """COM property reads per monitoring tick and track cache counters"""
+        stats = dict(self.com_stats)
+        stats["calls_per_tick"] = stats["com_calls"] / stats["ticks"] if stats["ticks"] else 0
+        stats["monitor_mode"] = self.monitor_mode
+        stats["in_standby"] = self.in_standby
+        stats["availability"] = dict(self.availability.stats)
+        stats["schedule"] = self.scheduler.get_stats()
+        return stats
     
     def _check_itunes_status(self):
         """Check iTunes status and update accordingly - COM THREAD SAFE"""
@@ -169,9 +618,12 @@ class iTunesPlayer(BasePlayer):
             return
         
         try:
+            # A change found by this tick counts from the tick itself
+            detected_at = time.perf_counter()
+            
             # Access iTunes properties in the same thread where COM was initialized
-            track = self.itunes.CurrentTrack
-            player_state = self.itunes.PlayerState
+            track = self._com_get(self.itunes, "CurrentTrack")
+            player_state = self._com_get(self.itunes, "PlayerState")
             
             # Handle no track case
             if not track:
@@ -187,11 +639,6 @@ class iTunesPlayer(BasePlayer):
             # Reset consecutive empty checks
             self.consecutive_empty_checks = 0
             
-            # Get track info (all in same COM thread)
-            title = track.Name or "Unknown Title"
-            artist = track.Artist or "Unknown Artist"
-            album = track.Album or "Unknown Album"
-            
             # Handle different player states
             if player_state == PlayerState.STOPPED:
                 if self.last_known_state != "stopped":
@@ -206,7 +653,10 @@ class iTunesPlayer(BasePlayer):
                     self.last_known_state = "paused"
                 return
             elif player_state == PlayerState.PLAYING:
-                self._handle_playing_track(track, title, artist, album)
+                # Cached per track - only the identity is read on repeat ticks
+                metadata = self._track_metadata(track)
+                self._handle_playing_track(track, metadata.title, metadata.artist, metadata.album,
+                                           metadata.duration, detected_at)
                 self.last_known_state = "playing"
             else:
                 if self.last_known_state == "playing":
@@ -216,42 +666,59 @@ class iTunesPlayer(BasePlayer):
         
         except Exception as e:
             print(f"iTunes status check error: {e}")
+            self.last_known_state = "unreachable"
             self.consecutive_empty_checks += 1
             if self.consecutive_empty_checks >= 3:
                 self.clear_all_data()
                 self.consecutive_empty_checks = 0
     
-    def _handle_playing_track(self, track, title, artist, album):
+    def _handle_playing_track(self, track, title, artist, album, duration_seconds=None, detected_at=None):
         """Handle a playing track - COM THREAD SAFE"""
         current_time = time.time()
         current_track_info = (title, artist, album)
         
         # Check if this is a new track
         if self.track_changed(current_track_info):
-            print(f"New iTunes track detected: {artist} - {title}")
-            
-            # Handle artwork for new track (pass the COM track object)
-            try:
-                self.artwork_manager.handle_itunes_artwork(track, artist, album, title)
-                self.artwork_updated = True
-            except Exception as artwork_error:
-                print(f"iTunes artwork error: {artwork_error}")
-            
-            # Small delay for artwork processing
-            time.sleep(0.4)
-            
-            # Update track info
-            self.update_track_info(title, artist, album)
+            self._publish_new_track(track, title, artist, album, detected_at)
         
         # Update progress every second
         if current_time - self.last_progress_update >= PROGRESS_UPDATE_INTERVAL:
             try:
                 # Access COM properties in same thread
-                position_seconds = self.itunes.PlayerPosition
-                duration_seconds = track.Duration
+                position_seconds = self._com_get(self.itunes, "PlayerPosition")
+                if duration_seconds is None:
+                    duration_seconds = self._com_get(track, "Duration")
                 
                 self.update_progress(title, artist, album, position_seconds, duration_seconds, True)
                 self.last_progress_update = current_time
+                self._last_position = position_seconds
+                self._last_duration = duration_seconds
             
             except Exception as progress_e:
-                print(f"Error getting iTunes progress: {progress_e}")
\ No newline at end of file
+                print(f"Error getting iTunes progress: {progress_e}")
+    
+    def _publish_new_track(self, track, title, artist, album, detected_at):
+        """Show a new track: text first, then its artwork - COM THREAD SAFE"""
+        with span("itunes.track_change", self.name, track=f"{artist} - {title}"):
+            print(f"New iTunes track detected: {artist} - {title}")
+            
+            # Invalidate artwork jobs of the previous track before new text lands
+            generation = self.begin_artwork()
+            
+            # Publish track info immediately
+            self.update_track_info(title, artist, album, detected_at)
+            
+            # Read the new position right away (progress and the next predicted track end)
+            self.last_progress_update = 0
+            
+            # Read embedded artwork here (COM thread); fallbacks resolve on the pipeline workers
+            try:
+                with self.budget.call(self.name, "itunes.Artwork", CALL_DEADLINE_COM):
+                    direct_artwork = self.artwork_manager.read_itunes_artwork(track)
+                self._check_current_run()
+                if not direct_artwork:
+                    print("iTunes artwork failed, trying fallback...")
+                self.submit_artwork(generation, artist, album, title, direct_artwork)
+                self.artwork_updated = True
+            except Exception as artwork_error:
+                print(f"iTunes artwork error: {artwork_error}")
@@ -0,0 +1,115 @@
+"""
+iTunes event sources - COM events from iTunes (fakes for running without it are in testing.fakes)
+
+An event source connects to the iTunes application object and delivers its
+player events to a handler. Events are only dispatched inside pump(), so the
+handler always runs on the monitoring thread that owns the COM object.
+pump(None) waits without a timeout; wake() ends a pump from any thread, so
+timers and stop requests can interrupt an idle wait.
+
+Handler methods (implemented by iTunesPlayer):
+    on_player_play(track)           playback started (new track or resume)
+    on_player_stop(track)           playback stopped or paused
+    on_track_info_changed(track)    info of the playing track changed
+    on_quitting()                   iTunes is about to quit; release COM now
+"""
+from abc import ABC, abstractmethod
+
+
+class iTunesEventSource(ABC):
+    """Interface for iTunes event delivery"""
+
+    @abstractmethod
+    def connect(self, itunes, handler):
+        """Subscribe to events - returns False if events are unavailable"""
+        pass
+
+    @abstractmethod
+    def pump(self, timeout):
+        """Dispatch pending events, waiting at most timeout seconds (None = no limit) for one"""
+        pass
+
+    @abstractmethod
+    def wake(self):
+        """Make a running or the next pump() return - THREAD SAFE"""
+        pass
+
+    @abstractmethod
+    def disconnect(self):
+        """Unsubscribe (safe to call more than once)"""
+        pass
+
+
+class _ComEventSink:
+    """Receives _IiTunesEvents calls; the track is always the last argument"""
+
+    def __init__(self, handler, dispatched):
+        self._handler = handler
+        self._dispatched = dispatched  # ends the pump so the monitor sees the new state
+
+    def OnPlayerPlayEvent(self, *args):
+        self._handler.on_player_play(args[-1] if args else None)
+        self._dispatched()
+
+    def OnPlayerStopEvent(self, *args):
+        self._handler.on_player_stop(args[-1] if args else None)
+        self._dispatched()
+
+    def OnPlayerPlayingTrackChangedEvent(self, *args):
+        self._handler.on_track_info_changed(args[-1] if args else None)
+        self._dispatched()
+
+    def OnAboutToPromptUserToQuitEvent(self, *args):
+        self._handler.on_quitting()
+        self._dispatched()
+
+    def OnQuittingEvent(self, *args):
+        self._handler.on_quitting()
+        self._dispatched()
+
+
+class ComEventSource(iTunesEventSource):
+    """iTunes COM connection point events via comtypes (Windows only).
+
+    pump() is a message-dispatching wait on an auto-reset Win32 event, like
+    comtypes.client.PumpEvents() but without a forced timeout: the sink sets
+    the event after each dispatched call and wake() sets it from any thread.
+    """
+
+    INFINITE = 0xFFFFFFFF
+
+    def __init__(self):
+        self._connection = None
+        self._event = None
+
+    def connect(self, itunes, handler):
+        try:
+            import ctypes
+            import comtypes.client
+            if self._event is None:
+                self._event = ctypes.windll.kernel32.CreateEventW(None, False, False, None)
+            self._connection = comtypes.client.GetEvents(itunes, _ComEventSink(handler, self.wake))
+            return True
+        except Exception as e:
+            print(f"iTunes COM events unavailable: {e}")
+            self._connection = None
+            return False
+
+    def pump(self, timeout):
+        import ctypes
+        milliseconds = self.INFINITE if timeout is None else int(max(timeout, 0) * 1000)
+        handles = (ctypes.c_void_p * 1)(self._event)
+        index = ctypes.c_ulong()
+        try:
+            ctypes.oledll.ole32.CoWaitForMultipleHandles(0, milliseconds, 1, handles, ctypes.byref(index))
+        except OSError:
+            pass  # RPC_S_CALLPENDING - timed out
+
+    def wake(self):
+        if self._event:
+            import ctypes
+            ctypes.windll.kernel32.SetEvent(self._event)
+
+    def disconnect(self):
+        # Dropping the connection object unadvises the sink
+        self._connection = None
@@ -0,0 +1,86 @@
+"""
+Remote player - stands in for a backend that runs in a supervised worker process
+"""
+import time
+from players.base_player import BasePlayer
+
+
+class RemotePlayer(BasePlayer):
+    """Parent-side proxy for a backend running in a worker process.
+
+    The worker streams what its player publishes; apply_delta() replays it
+    through the normal BasePlayer publishing path, so arbitration, the
+    write-behind writer, artwork fallbacks and the event feed all run here
+    exactly as for an in-process player.
+    """
+
+    def __init__(self, name, kind, file_manager, progress_tracker, artwork_manager, supervisor, options=None):
+        super().__init__(name, file_manager, progress_tracker, artwork_manager)
+        self.kind = kind  # BACKEND_* or a backend factory - see backend_worker.create_backend
+        self.options = options or {}
+        self.supervisor = supervisor
+        self._artwork_generation = None
+        supervisor.add(self)
+
+    def is_available(self):
+        """Asks the backend process (started on demand)"""
+        return bool(self.supervisor.request(self.name, "is_available"))
+
+    def start_monitoring(self):
+        if self.is_running:
+            print(f"{self.name} monitoring already running")
+            return
+        self.is_running = True
+        self.stop_event.clear()
+        self.supervisor.command(self.name, "start")
+        print(f"Started {self.name} monitoring in a worker process")
+
+    def stop_monitoring(self):
+        was_running = self.is_running
+        self.is_running = False
+        self.stop_event.set()
+        self.supervisor.command(self.name, "stop")
+        if was_running:
+            self.clear_all_data()
+
+    def standby(self):
+        """The worker keeps its backend warm; nothing from it is published meanwhile"""
+        if not self.is_running:
+            return
+        self.is_running = False
+        self.stop_event.set()
+        self.supervisor.command(self.name, "standby")
+        self.clear_all_data()
+
+    def restart(self):
+        """Replace the worker process"""
+        if not self.is_running:
+            return False
+        self.supervisor.restart(self.name)
+        return True
+
+    def apply_delta(self, delta):
+        """Publish one state delta from the worker - supervisor thread"""
+        if not self.is_running:
+            return  # in flight when monitoring stopped
+        kind = delta[0]
+        if kind == "track":
+            _, title, artist, album, age = delta
+            self._artwork_generation = self.begin_artwork()
+            self.update_track_info(title, artist, album, time.perf_counter() - age)
+        elif kind == "progress":
+            if self.last_track_info:
+                self.update_progress(*self.last_track_info, *delta[1:])
+        elif kind == "progress_full":
+            self.update_progress(*delta[1:])
+        elif kind == "artwork":
+            self.submit_artwork(self._artwork_generation, *delta[1:])
+        elif kind == "clear":
+            self.last_clear_time = 0  # the worker already rate limits its clears
+            self.clear_all_data()
+
+    def on_worker_lost(self):
+        """The worker died or stalled - what it showed can no longer be trusted"""
+        if self.is_running:
+            self.last_clear_time = 0
+            self.clear_all_data()
@@ -0,0 +1,3 @@
+"""
+Test support for ANP Tray App - fakes shared by the tests and benchmarks
+"""
\ No newline at end of file
@@ -0,0 +1,414 @@
+"""
+Fakes for running without Windows - scripted players, iTunes COM and the GSMTC sessions
+
+Imported by the tests and benchmarks only. FakePlayer stands in for a whole
+backend; the other fakes stand in for what the real backends talk to, so the
+real player classes run against them. They count what the real objects would
+cost (e.g. cross-process COM reads) and can simulate a call that hangs.
+"""
+import asyncio
+import itertools
+import queue
+import threading
+from datetime import datetime, timedelta, timezone
+from core.runtime import get_runtime
+from players.base_player import BasePlayer
+from players.gsmtc import PlaybackStatus, SessionManager
+from players.itunes_events import iTunesEventSource
+
+
+class RecordingManager:
+    """Stand-in for an output manager or the event hub - records every call and does nothing"""
+
+    def __init__(self):
+        self.calls = []  # (method name, args) in call order
+
+    def __getattr__(self, name):
+        if name.startswith("__"):
+            raise AttributeError(name)
+
+        def record(*args, **kwargs):
+            self.calls.append((name, args))
+        return record
+
+    async def read_apple_music_artwork(self, session):
+        self.calls.append(("read_apple_music_artwork", (session,)))
+        return None
+
+    def called(self, name):
+        """Arguments of every call of one method"""
+        return [args for called, args in self.calls if called == name]
+
+
+class FakePlayer(BasePlayer):
+    """A player driven by method calls instead of a monitored application"""
+
+    def __init__(self, name, file_manager, progress_tracker, artwork_manager, available=True):
+        super().__init__(name, file_manager, progress_tracker, artwork_manager)
+        self.available = available
+        self.starts = 0
+        self.stops = 0
+
+    def is_available(self):
+        return self.available
+
+    def start_monitoring(self):
+        self.starts += 1
+        self.is_running = True
+
+    def stop_monitoring(self):
+        self.stops += 1
+        self.is_running = False
+        self.clear_all_data()
+
+    def play(self, title, artist, album, duration_seconds=240, position_seconds=0):
+        """Show a track the way the real backends do"""
+        if self.track_changed((title, artist, album)):
+            generation = self.begin_artwork()
+            self.update_track_info(title, artist, album)
+            self.submit_artwork(generation, artist, album, title)
+        self.update_progress(title, artist, album, position_seconds, duration_seconds, True)
+
+    def stop(self):
+        """Playback stopped - the backends clear their outputs"""
+        self.last_clear_time = 0  # not subject to the clear rate limit
+        self.clear_all_data()
+
+
+class ScriptedFakePlayer(FakePlayer):
+    """A FakePlayer that plays through a list of tracks on its own.
+
+    Runs in a backend worker process when the class is passed as a
+    RemotePlayer's kind, with the RemotePlayer's options as keyword arguments.
+    """
+
+    def __init__(self, name, file_manager, progress_tracker, artwork_manager, tracks=None,
+                 track_seconds=5.0, tick=1.0, available=True):
+        super().__init__(name, file_manager, progress_tracker, artwork_manager, available)
+        self.tracks = tracks or [("Fake Track", "Fake Artist", "Fake Album")]
+        self.track_seconds = track_seconds
+        self.tick = tick
+        self._timer = None
+        self._index = 0
+        self._position = 0.0
+
+    def start_monitoring(self):
+        super().start_monitoring()
+        self._position = 0.0
+        self._advance(0.0)
+        self._timer = get_runtime().call_every(self.tick, self._advance, self.tick, name=f"fake-{self.name}")
+
+    def stop_monitoring(self):
+        if self._timer:
+            self._timer.cancel()
+            self._timer = None
+        super().stop_monitoring()
+
+    def _advance(self, seconds):
+        if not self.is_running:
+            return
+        self._position += seconds
+        if self._position >= self.track_seconds:
+            self._position = 0.0
+            self._index = (self._index + 1) % len(self.tracks)
+        title, artist, album = self.tracks[self._index]
+        self.play(title, artist, album, self.track_seconds, self._position)
+
+
+class FakeEventSource(iTunesEventSource):
+    """In-process event source for running the player without iTunes.
+
+    fire_* may be called from any thread; events are delivered to the
+    handler during pump() on the monitoring thread, like COM events.
+    """
+
+    def __init__(self, available=True):
+        self.available = available
+        self.handler = None
+        self.pumps = 0
+        self._events = queue.Queue()
+
+    def connect(self, itunes, handler):
+        if not self.available:
+            return False
+        self.handler = handler
+        return True
+
+    def pump(self, timeout):
+        self.pumps += 1
+        try:
+            event = self._events.get(timeout=timeout)
+        except queue.Empty:
+            return
+        while True:
+            if self.handler is not None:
+                event()
+            try:
+                event = self._events.get_nowait()
+            except queue.Empty:
+                return
+
+    def wake(self):
+        self._events.put(_no_event)
+
+    def disconnect(self):
+        self.handler = None
+
+    def fire_play(self, track=None):
+        self._events.put(lambda: self.handler.on_player_play(track))
+
+    def fire_stop(self, track=None):
+        self._events.put(lambda: self.handler.on_player_stop(track))
+
+    def fire_track_info_changed(self, track=None):
+        self._events.put(lambda: self.handler.on_track_info_changed(track))
+
+    def fire_quitting(self):
+        self._events.put(lambda: self.handler.on_quitting())
+
+
+def _no_event():
+    pass
+
+
+class FakeTrack:
+    """Stand-in for an IITTrack; property reads are counted as COM calls"""
+
+    def __init__(self, app, database_id, name, artist, album, duration):
+        self._app = app
+        self._database_id = database_id
+        self._name, self._artist, self._album, self._duration = name, artist, album, duration
+
+    @property
+    def TrackDatabaseID(self):
+        self._app.count_call()
+        return self._database_id
+
+    @property
+    def Name(self):
+        self._app.count_call()
+        return self._name
+
+    @property
+    def Artist(self):
+        self._app.count_call()
+        return self._artist
+
+    @property
+    def Album(self):
+        self._app.count_call()
+        return self._album
+
+    @property
+    def Duration(self):
+        self._app.count_call()
+        return self._duration
+
+
+class FakeiTunes:
+    """Stand-in for the iTunes.Application object; counts property reads.
+
+    hang(name) makes the next read of that property block until release(),
+    like a COM call stuck behind a modal dialog.
+    """
+
+    def __init__(self):
+        self.com_calls = 0
+        self._lock = threading.Lock()
+        self._hang = None
+        self._released = threading.Event()
+        self._track = None
+        self._state = 0  # PlayerState.STOPPED
+        self._position = 0
+        self._next_database_id = 1
+
+    def count_call(self):
+        with self._lock:
+            self.com_calls += 1
+
+    def hang(self, name):
+        self._released.clear()
+        self._hang = name
+
+    def release(self):
+        self._hang = None
+        self._released.set()
+
+    def _read(self, name, value):
+        self.count_call()
+        if self._hang == name:
+            self._hang = None  # only the next read hangs
+            self._released.wait()
+        return value
+
+    def set_playing(self, name, artist, album, duration, position=0):
+        self._track = FakeTrack(self, self._next_database_id, name, artist, album, duration)
+        self._next_database_id += 1
+        self._state = 1
+        self._position = position
+        return self._track
+
+    def set_state(self, state, position=None):
+        self._state = state
+        if position is not None:
+            self._position = position
+
+    @property
+    def CurrentTrack(self):
+        return self._read("CurrentTrack", self._track)
+
+    @property
+    def PlayerState(self):
+        return self._read("PlayerState", self._state)
+
+    @property
+    def PlayerPosition(self):
+        return self._read("PlayerPosition", self._position)
+
+
+class _EventSlot:
+    """add/remove/fire for one fake event"""
+
+    def __init__(self):
+        self._handlers = {}
+        self._tokens = itertools.count(1)
+        self._lock = threading.Lock()
+
+    def add(self, handler):
+        with self._lock:
+            token = next(self._tokens)
+            self._handlers[token] = handler
+            return token
+
+    def remove(self, token):
+        with self._lock:
+            self._handlers.pop(token, None)
+
+    def fire(self, sender):
+        with self._lock:
+            handlers = list(self._handlers.values())
+        for handler in handlers:
+            handler(sender, None)
+
+    def __len__(self):
+        return len(self._handlers)
+
+
+class FakeMediaProperties:
+    def __init__(self, title, artist, album_title):
+        self.title = title
+        self.artist = artist
+        self.album_title = album_title
+        self.thumbnail = None
+
+
+class FakePlaybackInfo:
+    def __init__(self, playback_status):
+        self.playback_status = playback_status
+
+
+class FakeTimeline:
+    def __init__(self, position, end_time, last_updated_time):
+        self.position = position
+        self.end_time = end_time
+        self.last_updated_time = last_updated_time
+
+
+class FakeSession:
+    """Stand-in for a GlobalSystemMediaTransportControlsSession"""
+
+    def __init__(self, source_app_user_model_id="AppleInc.AppleMusicWin_nzyj5cx40ttqa!App"):
+        self.source_app_user_model_id = source_app_user_model_id
+        self.media_properties_changed = _EventSlot()
+        self.playback_info_changed = _EventSlot()
+        self._properties = FakeMediaProperties("", "", "")
+        self._status = PlaybackStatus.CLOSED
+        self._timeline = FakeTimeline(timedelta(0), timedelta(0), datetime.now(timezone.utc))
+        self.hang_media_properties = False  # True: the next media properties await never completes
+        self.hang_playback_info = False  # True: the next playback info read blocks its thread until release()
+        self._released = threading.Event()
+
+    def add_media_properties_changed(self, handler):
+        return self.media_properties_changed.add(handler)
+
+    def remove_media_properties_changed(self, token):
+        self.media_properties_changed.remove(token)
+
+    def add_playback_info_changed(self, handler):
+        return self.playback_info_changed.add(handler)
+
+    def remove_playback_info_changed(self, token):
+        self.playback_info_changed.remove(token)
+
+    async def try_get_media_properties_async(self):
+        if self.hang_media_properties:
+            self.hang_media_properties = False
+            await asyncio.get_running_loop().create_future()
+        return self._properties
+
+    def get_playback_info(self):
+        if self.hang_playback_info:
+            self.hang_playback_info = False
+            self._released.wait()
+        return FakePlaybackInfo(self._status)
+
+    def release(self):
+        """Let a hung playback info read return"""
+        self._released.set()
+
+    def get_timeline_properties(self):
+        return self._timeline
+
+    def play(self, title, artist, album, duration_seconds, position_seconds=0):
+        """Start a track and fire the events Apple Music would"""
+        self._properties = FakeMediaProperties(title, artist, album)
+        self._status = PlaybackStatus.PLAYING
+        self._timeline = FakeTimeline(timedelta(seconds=position_seconds),
+                                      timedelta(seconds=duration_seconds), datetime.now(timezone.utc))
+        self.media_properties_changed.fire(self)
+        self.playback_info_changed.fire(self)
+
+    def set_status(self, status):
+        self._status = status
+        self.playback_info_changed.fire(self)
+
+
+class FakeSessionManager(SessionManager):
+    """In-process session manager; add_session/remove_session fire the change events"""
+
+    def __init__(self, available=True):
+        self.available = available
+        self.opens = 0
+        self.sessions_changed = _EventSlot()
+        self.current_session_changed = _EventSlot()
+        self._sessions = []
+
+    async def open(self):
+        self.opens += 1
+        return self.available
+
+    def get_sessions(self):
+        return list(self._sessions)
+
+    def add_sessions_changed(self, handler):
+        return self.sessions_changed.add(handler)
+
+    def remove_sessions_changed(self, token):
+        self.sessions_changed.remove(token)
+
+    def add_current_session_changed(self, handler):
+        return self.current_session_changed.add(handler)
+
+    def remove_current_session_changed(self, token):
+        self.current_session_changed.remove(token)
+
+    def add_session(self, session):
+        self._sessions.append(session)
+        self.sessions_changed.fire(self)
+        self.current_session_changed.fire(self)
+
+    def remove_session(self, session):
+        if session in self._sessions:
+            self._sessions.remove(session)
+        self.sessions_changed.fire(self)
+        self.current_session_changed.fire(self)
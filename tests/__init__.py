@@ -0,0 +1,3 @@
+"""
+Tests for ANP Tray App - run with python -m pytest from the repository root
+"""
@@ -0,0 +1,33 @@
+"""
+Shared fixtures - the process-wide runtime and recording output managers
+"""
+import pytest
+from core.runtime import get_runtime
+from testing.fakes import RecordingManager
+
+
+@pytest.fixture(scope="session")
+def runtime():
+    """The shared runtime; it cannot be restarted, so it stops once after the last test"""
+    runtime = get_runtime()
+    yield runtime
+    runtime.stop()
+
+
+@pytest.fixture
+def outputs():
+    """Recording file manager, progress tracker, artwork manager and event hub"""
+    return Outputs()
+
+
+class Outputs:
+    def __init__(self):
+        self.files = RecordingManager()
+        self.progress = RecordingManager()
+        self.artwork = RecordingManager()
+        self.hub = RecordingManager()
+
+    def managers(self):
+        """Constructor arguments of a player"""
+        return self.files, self.progress, self.artwork
+
@@ -0,0 +1,14 @@
+"""
+Helpers for tests that wait on background threads
+"""
+import time
+
+
+def wait_until(condition, timeout=5.0):
+    """Poll condition until it is true - returns False on timeout"""
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            return False
+        time.sleep(0.02)
+    return True
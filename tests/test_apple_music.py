@@ -0,0 +1,135 @@
+"""
+Apple Music session discovery against FakeSessionManager - attach, detach and re-attach
+"""
+import pytest
+from players.apple_music import AppleMusicPlayer
+from testing.fakes import FakeSession, FakeSessionManager
+from tests.helpers import wait_until
+
+
+class AppleMusicHarness:
+    def __init__(self, outputs, manager):
+        self.outputs = outputs
+        self.manager = manager
+        self.player = AppleMusicPlayer(*outputs.managers(), session_manager=manager)
+        self.player.event_hub = outputs.hub
+
+    def shown(self):
+        """Titles written to the now playing file, in order"""
+        return [args[0] for args in self.outputs.files.called("write_now_playing")]
+
+    def clears(self):
+        return len(self.outputs.files.called("clear_now_playing"))
+
+    def stop(self):
+        self.player.stop_monitoring()
+        if self.player.monitor_future:
+            self.player.monitor_future.result(timeout=5.0)
+
+
+@pytest.fixture
+def apple_music(outputs, runtime):
+    harness = AppleMusicHarness(outputs, FakeSessionManager())
+    yield harness
+    harness.stop()
+
+
+def sessions_handled(player):
+    stats = player.get_event_stats()
+    return stats["kinds"]["sessions"]["executed"] if stats else 0
+
+
+def attached(session):
+    return len(session.media_properties_changed) == 1 and len(session.playback_info_changed) == 1
+
+
+def test_attaches_to_a_session_that_is_already_running(apple_music):
+    session = FakeSession()
+    session.play("Reckoner", "Radiohead", "In Rainbows", 290)
+    apple_music.manager.add_session(session)
+
+    apple_music.player.start_monitoring()
+    assert wait_until(lambda: apple_music.shown() == ["Reckoner"])
+    assert apple_music.player.session is session
+    assert attached(session)
+
+
+def test_attaches_when_apple_music_starts_later(apple_music):
+    apple_music.player.start_monitoring()
+    assert wait_until(lambda: len(apple_music.manager.sessions_changed) == 1)
+    assert apple_music.player.session is None
+
+    session = FakeSession()
+    apple_music.manager.add_session(session)
+    assert wait_until(lambda: attached(session))
+    session.play("Reckoner", "Radiohead", "In Rainbows", 290)
+    assert wait_until(lambda: apple_music.shown() == ["Reckoner"])
+
+
+def test_ignores_sessions_of_other_apps(apple_music):
+    apple_music.player.start_monitoring()
+    assert wait_until(lambda: sessions_handled(apple_music.player) == 1)
+    other = FakeSession("Spotify.exe")
+    other.play("Reckoner", "Radiohead", "In Rainbows", 290)
+    apple_music.manager.add_session(other)
+    assert wait_until(lambda: sessions_handled(apple_music.player) >= 2)
+    assert apple_music.player.session is None
+    assert not attached(other)
+    assert apple_music.shown() == []
+
+
+def test_detaches_and_clears_when_the_session_closes(apple_music):
+    session = FakeSession()
+    session.play("Reckoner", "Radiohead", "In Rainbows", 290)
+    apple_music.manager.add_session(session)
+    apple_music.player.start_monitoring()
+    assert wait_until(lambda: apple_music.shown() == ["Reckoner"])
+    clears = apple_music.clears()
+
+    apple_music.player.last_clear_time = 0  # the clear rate limit is not under test
+    apple_music.manager.remove_session(session)
+    assert wait_until(lambda: apple_music.player.session is None)
+    assert not attached(session)
+    assert apple_music.clears() == clears + 1
+
+
+def test_reattaches_to_the_new_session_after_a_restart(apple_music):
+    old = FakeSession()
+    old.play("Reckoner", "Radiohead", "In Rainbows", 290)
+    apple_music.manager.add_session(old)
+    apple_music.player.start_monitoring()
+    assert wait_until(lambda: apple_music.shown() == ["Reckoner"])
+
+    # Apple Music restarted quickly: the old session is replaced by a new one
+    new = FakeSession()
+    new.play("Reckoner", "Radiohead", "In Rainbows", 290)
+    apple_music.manager._sessions.remove(old)
+    apple_music.manager.add_session(new)
+    assert wait_until(lambda: apple_music.player.session is new)
+    assert attached(new) and not attached(old)
+
+    new.play("Nude", "Radiohead", "In Rainbows", 255)
+    assert wait_until(lambda: apple_music.shown() == ["Reckoner", "Nude"])
+
+
+def test_stop_unsubscribes_from_the_manager_and_session(apple_music):
+    session = FakeSession()
+    apple_music.manager.add_session(session)
+    apple_music.player.start_monitoring()
+    assert wait_until(lambda: attached(session))
+
+    apple_music.stop()
+    assert len(apple_music.manager.sessions_changed) == 0
+    assert len(apple_music.manager.current_session_changed) == 0
+    assert not attached(session)
+
+
+def test_unavailable_manager_ends_monitoring(outputs, runtime):
+    harness = AppleMusicHarness(outputs, FakeSessionManager(available=False))
+    try:
+        harness.player.start_monitoring()
+        harness.player.monitor_future.result(timeout=5.0)
+        assert harness.manager.opens == 1
+        assert len(harness.manager.sessions_changed) == 0
+    finally:
+        harness.stop()
@@ -0,0 +1,117 @@
+"""
+Supervised backend worker processes - deltas, crash and stall recovery, restart backoff
+"""
+import time
+import pytest
+from core.backend_supervisor import BackendSupervisor
+from players.remote_player import RemotePlayer
+from testing.fakes import ScriptedFakePlayer
+from tests.helpers import wait_until
+
+TRACKS = [("Airbag", "Radiohead", "OK Computer"), ("Lucky", "Radiohead", "OK Computer")]
+SCRIPT = {"tracks": TRACKS, "track_seconds": 1.0, "tick": 0.25}
+
+
+def broken_backend(name, file_manager, progress_tracker, artwork_manager):
+    """Backend factory for a worker that dies while starting"""
+    raise RuntimeError("backend failed to start")
+
+
+@pytest.fixture
+def supervisor(runtime):
+    supervisor = BackendSupervisor(heartbeat_timeout=3.0, restart_backoff=(0.2, 1.0))
+    yield supervisor
+    supervisor.shutdown()
+
+
+def remote(supervisor, outputs, name="fake", kind=ScriptedFakePlayer, options=SCRIPT):
+    player = RemotePlayer(name, kind, *outputs.managers(), supervisor, options=options)
+    player.event_hub = outputs.hub
+    return player
+
+
+def shown(outputs):
+    """Titles written to the now playing file, in order"""
+    return [args[0] for args in outputs.files.called("write_now_playing")]
+
+
+def progress_ticks(outputs):
+    return len(outputs.progress.called("update_progress"))
+
+
+def test_worker_streams_its_player_state(supervisor, outputs):
+    player = remote(supervisor, outputs)
+    assert player.is_available()
+    player.start_monitoring()
+
+    assert wait_until(lambda: shown(outputs)[:2] == ["Airbag", "Lucky"])
+    assert outputs.progress.called("update_progress")[0][:3] == TRACKS[0]
+    assert outputs.artwork.called("submit_artwork")[0][1:3] == ("Radiohead", "OK Computer")
+    stats = supervisor.get_stats()["fake"]
+    assert stats["state"] == "running" and stats["spawns"] == 1 and stats["deltas"] > 0
+
+
+def test_stopped_worker_publishes_nothing(supervisor, outputs):
+    player = remote(supervisor, outputs)
+    player.start_monitoring()
+    assert wait_until(lambda: progress_ticks(outputs) > 0)
+
+    player.stop_monitoring()
+    ticks = progress_ticks(outputs)
+    time.sleep(0.6)
+    assert progress_ticks(outputs) == ticks
+
+
+def test_crashed_worker_is_restarted(supervisor, outputs):
+    player = remote(supervisor, outputs)
+    player.start_monitoring()
+    assert wait_until(lambda: supervisor.get_stats()["fake"]["state"] == "running")
+    assert wait_until(lambda: progress_ticks(outputs) > 0)
+    pid = supervisor.get_stats()["fake"]["pid"]
+    clears = len(outputs.files.called("clear_now_playing"))
+
+    supervisor.inject_fault("fake", "crash")
+    assert wait_until(lambda: supervisor.get_stats()["fake"]["crashes"] == 1)
+    # What the dead worker showed is cleared right away
+    assert wait_until(lambda: len(outputs.files.called("clear_now_playing")) == clears + 1)
+
+    assert wait_until(lambda: supervisor.get_stats()["fake"]["pid"] not in (None, pid), timeout=10.0)
+    ticks = progress_ticks(outputs)
+    assert wait_until(lambda: progress_ticks(outputs) > ticks)
+    assert supervisor.get_stats()["fake"]["restarts"] == 1
+
+
+def test_frozen_worker_is_restarted_after_its_heartbeats_stop(supervisor, outputs):
+    player = remote(supervisor, outputs)
+    player.start_monitoring()
+    assert wait_until(lambda: supervisor.get_stats()["fake"]["state"] == "running")
+    pid = supervisor.get_stats()["fake"]["pid"]
+
+    supervisor.inject_fault("fake", "freeze")
+    assert wait_until(lambda: supervisor.get_stats()["fake"]["stalls"] == 1, timeout=10.0)
+    assert wait_until(lambda: supervisor.get_stats()["fake"]["pid"] not in (None, pid), timeout=10.0)
+    ticks = progress_ticks(outputs)
+    assert wait_until(lambda: progress_ticks(outputs) > ticks)
+
+
+def test_worker_that_keeps_failing_backs_off(supervisor, outputs):
+    player = remote(supervisor, outputs, kind=broken_backend, options=None)
+    started = time.monotonic()
+    player.start_monitoring()
+    assert wait_until(lambda: supervisor.get_stats()["fake"]["crashes"] >= 3, timeout=10.0)
+    # Two restarts in between, 0.2s and then 0.4s after a crash
+    assert time.monotonic() - started >= 0.6
+    assert supervisor._workers["fake"].failures >= 3
+    assert shown(outputs) == []
+
+
+def test_shutdown_stops_every_worker(supervisor, outputs):
+    players = [remote(supervisor, outputs, name) for name in ("a", "b")]
+    for player in players:
+        player.start_monitoring()
+    assert wait_until(lambda: all(stats["state"] == "running" for stats in supervisor.get_stats().values()))
+    processes = [worker.process for worker in supervisor._workers.values()]
+
+    supervisor.shutdown()
+    assert all(not process.is_alive() for process in processes)
+    assert all(stats["state"] == "stopped" for stats in supervisor.get_stats().values())
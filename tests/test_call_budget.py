@@ -0,0 +1,215 @@
+"""
+Call deadlines and the watchdog - hung calls are reported and their backend restarted
+"""
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+import pytest
+import players.apple_music as apple_music_module
+import players.itunes as itunes_module
+from core.call_budget import CallBudget, CallTimeout, percentile
+from players.apple_music import AppleMusicPlayer
+from players.itunes import iTunesPlayer
+from testing.fakes import FakeEventSource, FakeiTunes, FakeSession, FakeSessionManager
+from tests.helpers import wait_until
+
+
+@pytest.fixture
+def budget():
+    executor = ThreadPoolExecutor(max_workers=2)
+    budget = CallBudget(executor, restart_backoff=(0.3, 1.0))
+    budget.start()
+    yield budget
+    budget.stop()
+    executor.shutdown(wait=False)
+
+
+class Restarts:
+    """on_hang callback that records what it was called with"""
+
+    def __init__(self):
+        self.records = []
+
+    def __call__(self, record):
+        self.records.append(record)
+
+
+def hang(budget, backend, site, release, deadline=0.1):
+    """A blocking call on its own thread that runs until release is set"""
+    def call():
+        with budget.call(backend, site, deadline):
+            release.wait(5.0)
+    thread = threading.Thread(target=call, daemon=True)
+    thread.start()
+    return thread
+
+
+def test_percentile_is_nearest_rank():
+    assert percentile([], 0.5) == 0.0
+    assert percentile([1, 2, 3, 4], 0.5) == 2
+    assert percentile([1, 2, 3, 4], 0.99) == 4
+
+
+def test_calls_within_the_deadline_are_only_measured(budget):
+    restarts = Restarts()
+    budget.register("player", restarts)
+    with budget.call("player", "fast", 1.0):
+        pass
+    stats = budget.get_stats()
+    assert stats["sites"]["fast"]["calls"] == 1
+    assert stats["hangs"] == 0
+    assert restarts.records == []
+
+
+def test_failed_calls_are_counted(budget):
+    with pytest.raises(ValueError):
+        with budget.call("player", "failing", 1.0):
+            raise ValueError("boom")
+    assert budget.get_stats()["sites"]["failing"]["failures"] == 1
+
+
+def test_awaited_call_past_its_deadline_raises_and_restarts(budget):
+    restarts = Restarts()
+    budget.register("player", restarts)
+
+    async def never():
+        await asyncio.get_running_loop().create_future()
+
+    with pytest.raises(CallTimeout) as raised:
+        asyncio.run(budget.wait_for("player", "stuck", never(), 0.1))
+    assert raised.value.site == "stuck"
+    assert wait_until(lambda: len(restarts.records) == 1)
+    assert restarts.records[0] == {"backend": "player", "site": "stuck",
+                                   "thread": threading.current_thread().name}
+    assert budget.get_stats()["sites"]["stuck"]["hangs"] == 1
+
+
+def test_blocking_call_past_its_deadline_restarts_its_backend(budget):
+    restarts = Restarts()
+    budget.register("player", restarts)
+    release = threading.Event()
+    thread = hang(budget, "player", "blocking", release)
+
+    assert wait_until(lambda: len(restarts.records) == 1)
+    assert budget.get_stats()["in_flight"][0]["hung"]
+
+    # The call still ends up in the latency stats once it returns
+    release.set()
+    thread.join(5.0)
+    stats = budget.get_stats()
+    assert stats["in_flight"] == []
+    assert stats["sites"]["blocking"]["calls"] == 1
+    assert stats["sites"]["blocking"]["max_ms"] >= 100
+
+
+def test_restarts_back_off_while_a_backend_keeps_hanging(budget):
+    restarts = Restarts()
+    budget.register("player", restarts)
+    release = threading.Event()
+    try:
+        hang(budget, "player", "first", release)
+        assert wait_until(lambda: len(restarts.records) == 1)
+        started = time.monotonic()
+        hang(budget, "player", "second", release)
+        assert wait_until(lambda: len(restarts.records) == 2)
+        # The second restart waited for the first backoff step
+        assert time.monotonic() - started >= 0.25
+    finally:
+        release.set()
+
+
+def test_completed_call_resets_the_backoff(budget):
+    restarts = Restarts()
+    budget.register("player", restarts)
+    release = threading.Event()
+    thread = hang(budget, "player", "blocking", release)
+    assert wait_until(lambda: len(restarts.records) == 1)
+    release.set()
+    thread.join(5.0)
+    # The hung call itself finishing does not count
+    assert budget._backends["player"].consecutive == 1
+
+    with budget.call("player", "fast", 1.0):
+        pass
+    assert budget._backends["player"].consecutive == 0
+
+
+def test_hangs_of_unregistered_backends_are_only_reported(budget):
+    release = threading.Event()
+    try:
+        hang(budget, "nobody", "blocking", release)
+        assert wait_until(lambda: budget.get_stats()["hangs"] == 1)
+        assert budget.get_stats()["restarts"] == 0
+    finally:
+        release.set()
+
+
+# Backends restarted by the shared runtime's watchdog
+
+def shown(outputs):
+    """Titles written to the now playing file, in order"""
+    return [args[0] for args in outputs.files.called("write_now_playing")]
+
+
+def test_itunes_recovers_from_a_hung_com_call(outputs, runtime, monkeypatch):
+    monkeypatch.setattr(itunes_module, "CALL_DEADLINE_COM", 0.3)
+    app = FakeiTunes()
+    app.set_playing("Karma Police", "Radiohead", "OK Computer", 264)
+    player = iTunesPlayer(*outputs.managers(), event_source=FakeEventSource(), itunes_factory=lambda: app)
+    player.event_hub = outputs.hub
+    try:
+        player.start_monitoring()
+        assert wait_until(lambda: player.last_known_state == "playing")
+        apartment = player.apartment
+
+        app.hang("PlayerPosition")
+        assert wait_until(lambda: player.apartment is not apartment, timeout=10.0)
+        assert wait_until(lambda: player.last_known_state == "playing" and player.itunes is app)
+    finally:
+        app.release()
+        player.stop_monitoring()
+
+
+def test_apple_music_recovers_from_a_hung_await(outputs, runtime, monkeypatch):
+    monkeypatch.setattr(apple_music_module, "CALL_DEADLINE_WINRT", 0.3)
+    manager = FakeSessionManager()
+    player = AppleMusicPlayer(*outputs.managers(), session_manager=manager)
+    player.event_hub = outputs.hub
+    session = FakeSession()
+    manager.add_session(session)
+    restarts = runtime.budget.stats["restarts"]
+    try:
+        player.start_monitoring()
+        session.play("Airbag", "Radiohead", "OK Computer", 284)
+        assert wait_until(lambda: shown(outputs) == ["Airbag"])
+
+        session.hang_media_properties = True
+        session.play("Lucky", "Radiohead", "OK Computer", 259)
+        assert wait_until(lambda: runtime.budget.stats["restarts"] > restarts, timeout=10.0)
+        assert wait_until(lambda: "Lucky" in shown(outputs))
+    finally:
+        player.stop_monitoring()
+
+
+def test_hung_blocking_winrt_call_does_not_stall_the_loop(outputs, runtime, monkeypatch):
+    monkeypatch.setattr(apple_music_module, "CALL_DEADLINE_WINRT", 0.3)
+    manager = FakeSessionManager()
+    player = AppleMusicPlayer(*outputs.managers(), session_manager=manager)
+    player.event_hub = outputs.hub
+    session = FakeSession()
+    manager.add_session(session)
+    try:
+        player.start_monitoring()
+        session.play("Airbag", "Radiohead", "OK Computer", 284)
+        assert wait_until(lambda: player.current_track_id)
+
+        session.hang_playback_info = True
+        session.play("Lucky", "Radiohead", "OK Computer", 259)
+        time.sleep(0.2)
+        started = time.monotonic()
+        asyncio.run_coroutine_threadsafe(asyncio.sleep(0), runtime.loop).result(5.0)
+        assert time.monotonic() - started < 0.1
+    finally:
+        session.release()
+        player.stop_monitoring()
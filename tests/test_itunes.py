@@ -0,0 +1,143 @@
+"""
+iTunes monitoring against FakeiTunes - events, polling fallback, quit and relaunch, standby
+"""
+import pytest
+from players.base_player import PlayerState
+from players.itunes import iTunesPlayer
+from testing.fakes import FakeEventSource, FakeiTunes
+from tests.helpers import wait_until
+
+
+class iTunesHarness:
+    def __init__(self, outputs, events_available=True):
+        self.outputs = outputs
+        self.app = FakeiTunes()
+        self.events = FakeEventSource(available=events_available)
+        self.running = True  # what the process list says
+        self.created = 0
+        self.player = iTunesPlayer(*outputs.managers(), event_source=self.events,
+                                   itunes_factory=self._create, process_check=lambda: self.running)
+        self.player.event_hub = outputs.hub
+
+    def _create(self):
+        self.created += 1
+        return self.app
+
+    def shown(self):
+        """Titles written to the now playing file, in order"""
+        return [args[0] for args in self.outputs.files.called("write_now_playing")]
+
+    def clears(self):
+        return len(self.outputs.files.called("clear_now_playing"))
+
+
+@pytest.fixture
+def itunes(outputs, runtime):
+    harness = iTunesHarness(outputs)
+    yield harness
+    harness.player.stop_monitoring()
+
+
+@pytest.fixture
+def polling_itunes(outputs, runtime):
+    harness = iTunesHarness(outputs, events_available=False)
+    yield harness
+    harness.player.stop_monitoring()
+
+
+def test_play_event_publishes_the_track(itunes):
+    itunes.player.start_monitoring()
+    assert wait_until(lambda: itunes.player.monitor_mode == "events")
+    track = itunes.app.set_playing("Angel", "Massive Attack", "Mezzanine", 379)
+    itunes.events.fire_play(track)
+    assert wait_until(lambda: itunes.shown() == ["Angel"])
+
+
+def test_track_already_playing_at_start_is_published(itunes):
+    itunes.app.set_playing("Angel", "Massive Attack", "Mezzanine", 379)
+    itunes.player.start_monitoring()
+    assert wait_until(lambda: itunes.shown() == ["Angel"])
+
+
+def test_stop_followed_by_play_does_not_clear(itunes):
+    track = itunes.app.set_playing("Angel", "Massive Attack", "Mezzanine", 379)
+    itunes.player.start_monitoring()
+    assert wait_until(lambda: itunes.shown() == ["Angel"])
+    clears = itunes.clears()
+
+    # iTunes moving to the next track: stop, then play well within the grace period
+    itunes.events.fire_stop(track)
+    track = itunes.app.set_playing("Risingson", "Massive Attack", "Mezzanine", 298)
+    itunes.events.fire_play(track)
+    assert wait_until(lambda: itunes.shown() == ["Angel", "Risingson"])
+    assert itunes.clears() == clears
+
+
+def test_pause_clears_after_the_grace_period(itunes):
+    track = itunes.app.set_playing("Angel", "Massive Attack", "Mezzanine", 379)
+    itunes.player.start_monitoring()
+    assert wait_until(lambda: itunes.shown() == ["Angel"])
+    clears = itunes.clears()
+
+    itunes.app.set_state(PlayerState.PAUSED)
+    itunes.events.fire_stop(track)
+    assert wait_until(lambda: itunes.player.last_known_state == "paused")
+    assert itunes.clears() == clears + 1
+
+
+def test_falls_back_to_polling_without_events(polling_itunes):
+    polling_itunes.app.set_playing("Angel", "Massive Attack", "Mezzanine", 379)
+    polling_itunes.player.start_monitoring()
+    assert wait_until(lambda: polling_itunes.shown() == ["Angel"])
+    assert polling_itunes.player.monitor_mode == "polling"
+
+
+def test_reconnects_when_itunes_starts_again(itunes):
+    itunes.player.start_monitoring()
+    assert wait_until(lambda: itunes.player.monitor_mode == "events")
+
+    itunes.running = False
+    itunes.events.fire_quitting()
+    assert wait_until(lambda: itunes.player.itunes is None)
+    assert itunes.player.is_running
+
+    itunes.app.set_playing("Angel", "Massive Attack", "Mezzanine", 379)
+    itunes.running = True
+    assert wait_until(lambda: itunes.shown() == ["Angel"], timeout=10.0)
+    assert itunes.created == 2
+
+
+def test_quit_without_a_process_list_stops_monitoring(itunes):
+    itunes.player.start_monitoring()
+    assert wait_until(lambda: itunes.player.monitor_mode == "events")
+
+    itunes.running = None  # process list cannot be read
+    itunes.events.fire_quitting()
+    assert wait_until(lambda: not itunes.player.is_running)
+    assert wait_until(lambda: not itunes.player._monitor_active())
+
+    # The next start is a cold one, not "already running"
+    itunes.running = True
+    itunes.player.start_monitoring()
+    assert wait_until(lambda: itunes.created == 2)
+
+
+def test_start_while_monitoring_is_a_no_op(itunes):
+    itunes.player.start_monitoring()
+    assert wait_until(lambda: itunes.player.monitor_mode == "events")
+    itunes.player.start_monitoring()
+    assert itunes.created == 1
+
+
+def test_resume_from_standby_keeps_the_com_object(itunes):
+    itunes.app.set_playing("Angel", "Massive Attack", "Mezzanine", 379)
+    itunes.player.start_monitoring()
+    assert wait_until(lambda: itunes.shown() == ["Angel"])
+
+    itunes.player.standby()
+    assert wait_until(lambda: itunes.player.in_standby)
+    assert itunes.player.is_available()
+
+    itunes.player.start_monitoring()
+    assert wait_until(lambda: itunes.shown() == ["Angel", "Angel"])
+    assert itunes.created == 1
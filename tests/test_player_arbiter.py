@@ -0,0 +1,222 @@
+"""
+Output arbitration between concurrently monitored players
+"""
+import pytest
+import core.player_manager as player_manager
+from core.player_arbiter import PlayerArbiter, ARBITRATION_PRIORITY, ARBITRATION_RECENT
+from core.player_manager import PlayerManager
+from config.settings import PLAYER_APPLE_MUSIC, PLAYER_ITUNES
+from testing.fakes import FakePlayer
+from tests.helpers import wait_until
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+    def advance(self, seconds=1.0):
+        self.now += seconds
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+def make_arbiter(clock, rule=ARBITRATION_RECENT, priority=("a", "b", "c")):
+    handovers = []
+    arbiter = PlayerArbiter(priority, rule, on_handover=lambda *args: handovers.append(args), clock=clock)
+    return arbiter, handovers
+
+
+# Rules
+
+def test_recent_rule_hands_over_to_the_last_player_to_start(clock):
+    arbiter, handovers = make_arbiter(clock)
+    assert arbiter.report("b", True) == "b"
+    clock.advance()
+    assert arbiter.report("a", True) == "a"
+    assert handovers == [(None, "b", "b"), ("b", "a", "a")]
+
+
+def test_recent_rule_ignores_progress_reports_of_a_player_already_active(clock):
+    arbiter, _ = make_arbiter(clock)
+    arbiter.report("a", True)
+    clock.advance()
+    arbiter.report("b", True)
+    clock.advance()
+    # Every progress tick reports active again - that is not a new start
+    assert arbiter.report("a", True) == "b"
+
+
+def test_priority_rule_keeps_the_preferred_player_while_it_is_active(clock):
+    arbiter, _ = make_arbiter(clock, ARBITRATION_PRIORITY)
+    arbiter.report("a", True)
+    clock.advance()
+    assert arbiter.report("b", True) == "a"
+
+
+def test_priority_rule_takes_over_from_a_lower_priority_owner(clock):
+    arbiter, handovers = make_arbiter(clock, ARBITRATION_PRIORITY)
+    arbiter.report("b", True)
+    clock.advance()
+    assert arbiter.report("a", True) == "a"
+    assert handovers[-1] == ("b", "a", "a")
+
+
+@pytest.mark.parametrize("rule", [ARBITRATION_RECENT, ARBITRATION_PRIORITY])
+def test_priority_breaks_ties(clock, rule):
+    arbiter, _ = make_arbiter(clock, rule)
+    arbiter.report("c", True)
+    arbiter.report("b", True)  # same clock time as c
+    assert arbiter.owner == "b"
+
+
+def test_unlisted_players_rank_after_listed_ones(clock):
+    arbiter, _ = make_arbiter(clock, priority=("a",))
+    arbiter.report("z", True)
+    arbiter.report("a", True)
+    assert arbiter.owner == "a"
+
+
+# Idle players
+
+def test_idle_owner_keeps_the_outputs(clock):
+    arbiter, handovers = make_arbiter(clock)
+    arbiter.report("a", True)
+    assert arbiter.report("a", False) == "a"
+    # Another idle player does not take over either
+    assert arbiter.report("b", False) == "a"
+    assert handovers == [(None, "a", "a")]
+
+
+def test_idle_player_never_becomes_owner(clock):
+    arbiter, handovers = make_arbiter(clock)
+    assert arbiter.report("a", False) is None
+    assert handovers == []
+
+
+def test_owner_going_idle_hands_over_to_an_active_player(clock):
+    arbiter, handovers = make_arbiter(clock)
+    arbiter.report("a", True)
+    clock.advance()
+    arbiter.report("b", True)
+    # The reporter is b, but a has to re-publish: it has nothing new to report
+    assert arbiter.report("b", False) == "a"
+    assert handovers[-1] == ("b", "a", "b")
+
+
+def test_forget_releases_a_player(clock):
+    arbiter, _ = make_arbiter(clock)
+    arbiter.report("a", True)
+    clock.advance()
+    arbiter.report("b", True)
+    assert arbiter.forget("b") == "a"
+    assert not arbiter.is_active("b")
+
+
+# prefer()
+
+def test_prefer_an_active_player_hands_over_to_it(clock):
+    arbiter, handovers = make_arbiter(clock)
+    arbiter.report("a", True)
+    clock.advance()
+    arbiter.report("b", True)
+    clock.advance()
+    assert arbiter.prefer("a") == "a"
+    assert arbiter.priority == ["a", "b", "c"]
+    assert handovers[-1] == ("b", "a", None)
+
+
+def test_prefer_an_idle_player_only_changes_the_priority(clock):
+    arbiter, handovers = make_arbiter(clock)
+    arbiter.report("a", True)
+    assert arbiter.prefer("c") == "a"
+    assert arbiter.priority == ["c", "a", "b"]
+    assert len(handovers) == 1
+
+    # ... which decides the next tie
+    arbiter.report("a", False)
+    arbiter.report("b", True)
+    arbiter.report("c", True)
+    assert arbiter.owner == "c"
+
+
+def test_prefer_under_the_priority_rule(clock):
+    arbiter, _ = make_arbiter(clock, ARBITRATION_PRIORITY)
+    arbiter.report("a", True)
+    arbiter.report("b", True)
+    assert arbiter.prefer("b") == "b"
+    assert arbiter.get_stats()["active"] == ["b", "a"]
+
+
+# Handover through the player manager
+
+@pytest.fixture
+def concurrent(outputs):
+    """A concurrent-mode PlayerManager over two fake players sharing the recording outputs"""
+    players = {name: FakePlayer(name, *outputs.managers()) for name in (PLAYER_APPLE_MUSIC, PLAYER_ITUNES)}
+    for player in players.values():
+        player.event_hub = outputs.hub
+    manager = PlayerManager(*outputs.managers(), monitor_mode="concurrent", players=players)
+    manager.arbiter.rule = ARBITRATION_RECENT
+    yield manager, players
+    manager.shutdown()
+
+
+def test_handover_republishes_without_clearing(concurrent, outputs):
+    manager, players = concurrent
+    apple_music, itunes = players[PLAYER_APPLE_MUSIC], players[PLAYER_ITUNES]
+    assert manager.start_all_players(quiet=True)
+
+    apple_music.play("Airbag", "Radiohead", "OK Computer", 284, 30)
+    itunes.play("Teardrop", "Massive Attack", "Mezzanine", 330, 10)
+    assert manager.get_current_player_name() == PLAYER_ITUNES
+    del outputs.files.calls[:]
+    del outputs.progress.calls[:]
+
+    itunes.stop()
+    assert manager.get_current_player_name() == PLAYER_APPLE_MUSIC
+    assert outputs.files.called("clear_now_playing") == []
+    assert outputs.progress.called("clear_progress") == []
+    assert outputs.files.called("write_now_playing")[-1][:3] == ("Airbag", "Radiohead", "OK Computer")
+    assert outputs.progress.called("update_progress")[-1][:5] == ("Airbag", "Radiohead", "OK Computer", 30, 284)
+
+
+def test_only_the_owner_reaches_the_outputs(concurrent, outputs):
+    manager, players = concurrent
+    manager.start_all_players(quiet=True)
+    players[PLAYER_ITUNES].play("Teardrop", "Massive Attack", "Mezzanine")
+    del outputs.files.calls[:]
+
+    manager.arbiter.rule = ARBITRATION_PRIORITY
+    manager.arbiter.prefer(PLAYER_ITUNES)
+    players[PLAYER_APPLE_MUSIC].play("Airbag", "Radiohead", "OK Computer")
+    assert manager.get_current_player_name() == PLAYER_ITUNES
+    assert outputs.files.called("write_now_playing") == []
+
+
+def test_last_player_to_stop_clears_the_outputs(concurrent, outputs):
+    manager, players = concurrent
+    manager.start_all_players(quiet=True)
+    players[PLAYER_APPLE_MUSIC].play("Airbag", "Radiohead", "OK Computer")
+    players[PLAYER_APPLE_MUSIC].stop()
+    assert len(outputs.files.called("clear_now_playing")) == 1
+
+
+def test_players_unavailable_at_startup_are_probed_again(outputs, runtime, monkeypatch):
+    monkeypatch.setattr(player_manager, "PLAYER_REPROBE_INTERVAL", 0.1)
+    players = {name: FakePlayer(name, *outputs.managers(), available=False)
+               for name in (PLAYER_APPLE_MUSIC, PLAYER_ITUNES)}
+    manager = PlayerManager(*outputs.managers(), monitor_mode="concurrent", players=players)
+    try:
+        assert not manager.start_all_players(quiet=True)
+        players[PLAYER_ITUNES].available = True
+        assert wait_until(lambda: manager.monitored == [PLAYER_ITUNES])
+        assert players[PLAYER_ITUNES].starts == 1
+    finally:
+        manager.shutdown()
+    assert manager._reprobe_timer is None
@@ -7,6 +7,9 @@ import tkinter as tk
 from tkinter import messagebox
 import webbrowser
 import os
+from core.runtime import get_runtime
+from core.track_latency import get_track_latency, ARTWORK_STAGES, STAGES
+from core.tracing import get_tracer
 from config.settings import ICON_DEFAULT, ICON_APPLE, ICON_ITUNES, PLAYER_APPLE_MUSIC, PLAYER_ITUNES, APP_NAME, APP_AUTHOR, APP_WEBSITE, APP_DESCRIPTION
 
 class SystemTrayManager:
@@ -19,6 +22,9 @@ class SystemTrayManager:
         self.fallback_mode = False
         self.quit_requested = False
         self._lock = threading.Lock()
+        self._quit_event = threading.Event()
+        self._status_timer = None
+        self._console_handler = None  # keeps the ctypes callback alive
     
     def start(self):
         """Start the system tray with fallback to console mode"""
@@ -92,6 +98,8 @@ class SystemTrayManager:
                 (f"Use {PLAYER_APPLE_MUSIC}", None, self._switch_to_apple_music),
                 (f"Use {PLAYER_ITUNES}", None, self._switch_to_itunes),
                 ("Show Status", None, self._show_status_popup),
+                ("Save Latency Report", None, self._save_latency_report),
+                ("Start / Save Trace", None, self._toggle_tracing),
                 ("About", None, self._show_about),
             )
             
@@ -112,25 +120,16 @@ class SystemTrayManager:
             # Start the system tray in a separate thread
             self.running = True
             self.quit_requested = False
+            self._quit_event.clear()
             
-            # Start systray in background thread
-            tray_thread = threading.Thread(target=self._systray_thread, daemon=False)
+            # The tray icon needs its own Win32 message loop thread
+            tray_thread = threading.Thread(target=self._systray_thread, name="systray", daemon=False)
             tray_thread.start()
             
-            # Custom blocking loop - wait until quit is requested
+            # Periodic status runs on the runtime; this thread just waits for quit
             print("System tray is now active. Monitoring music...")
-            last_status_time = 0
-            
-            while self.running and not self.quit_requested:
-                current_time = time.time()
-                
-                # Show periodic status
-                if current_time - last_status_time >= 60:  # Every minute
-                    current_player = self.player_manager.get_current_player_name()
-                    print(f"[{time.strftime('%H:%M:%S')}] System tray active - {current_player} monitoring")
-                    last_status_time = current_time
-                
-                time.sleep(1)
+            self._start_status_timer(60, "System tray active - {player} monitoring")
+            self._wait_for_quit()
             
             print("System tray shutdown requested")
             
@@ -166,6 +165,8 @@ class SystemTrayManager:
         print("  1 - Switch to Apple Music")
         print("  2 - Switch to iTunes") 
         print("  s - Show current status")
+        print("  l - Save track-change latency report")
+        print("  t - Start tracing / save the trace")
         print("  c - Clear screen")
         print("  q - Quit")
         print("  h - Show this help")
@@ -173,37 +174,77 @@ class SystemTrayManager:
         print("App is now monitoring music and writing files...")
         print("="*60)
         
-        # Start input handler in separate thread
-        input_thread = threading.Thread(target=self._handle_console_input, daemon=True)
-        input_thread.start()
+        # Status every 30 seconds from the runtime; input is read on this thread
+        self._start_status_timer(30, "♪ Console mode - {player} active")
+        try:
+            self._handle_console_input()
+        finally:
+            self.running = False
+            self._quit_event.set()
+            self._cancel_status_timer()
+            print("Console mode ended")
+    
+    def _start_status_timer(self, interval, message):
+        """Print a status line every interval seconds from the runtime loop.
         
-        # Main console loop
-        last_status_time = 0
+        Deferrable: the heartbeat rides on other wakeups and never wakes an
+        idle app by itself.
+        """
+        def print_status():
+            current_player = self.player_manager.get_current_player_name()
+            print(f"[{time.strftime('%H:%M:%S')}] {message.format(player=current_player)}")
+        print_status()
+        self._status_timer = get_runtime().call_every(interval, print_status, name="status", deferrable=True)
+    
+    def _cancel_status_timer(self):
+        if self._status_timer:
+            self._status_timer.cancel()
+            self._status_timer = None
+    
+    def _wait_for_quit(self):
+        """Block until quit is requested - no polling"""
+        self._install_console_handler()
         try:
-            while self.running and not self.quit_requested:
-                current_time = time.time()
-                
-                # Show status every 30 seconds
-                if current_time - last_status_time >= 30:
-                    current_player = self.player_manager.get_current_player_name()
-                    print(f"[{time.strftime('%H:%M:%S')}] ♪ Console mode - {current_player} active")
-                    last_status_time = current_time
-                
-                time.sleep(1)
-                
+            self._quit_event.wait()
         except KeyboardInterrupt:
             print("\nReceived Ctrl+C")
             self.quit_requested = True
         finally:
-            self.running = False
-            print("Console mode ended")
+            self._cancel_status_timer()
+    
+    def _install_console_handler(self):
+        """On Windows, turn Ctrl+C into a quit request.
+        
+        Python only raises KeyboardInterrupt in a main thread that wakes up
+        now and then; the console handler lets the wait above block for good.
+        """
+        if os.name != "nt" or self._console_handler:
+            return
+        try:
+            import ctypes
+            from ctypes import wintypes
+            
+            def on_console_event(event):
+                # CTRL_C_EVENT, CTRL_BREAK_EVENT, CTRL_CLOSE_EVENT
+                if event not in (0, 1, 2):
+                    return False
+                print("\nReceived Ctrl+C")
+                self.quit_requested = True
+                self._quit_event.set()
+                return True
+            
+            handler_type = ctypes.WINFUNCTYPE(wintypes.BOOL, wintypes.DWORD)
+            self._console_handler = handler_type(on_console_event)
+            ctypes.windll.kernel32.SetConsoleCtrlHandler(self._console_handler, True)
+        except Exception as e:
+            print(f"Console control handler unavailable: {e}")
     
     def _handle_console_input(self):
-        """Handle console input in separate thread"""
+        """Handle console input on the main thread"""
         while self.running and not self.quit_requested:
             try:
                 print(f"\n[{time.strftime('%H:%M:%S')}] Current Player: {self.player_manager.get_current_player_name()}")
-                print("Command (1/2/s/c/q/h): ", end="", flush=True)
+                print("Command (1/2/s/l/t/c/q/h): ", end="", flush=True)
                 
                 cmd = input().strip().lower()
                 
@@ -222,6 +263,10 @@ class SystemTrayManager:
                     print(f"✅ Switch {'successful' if success else 'failed'}")
                 elif cmd == 's':
                     self._show_detailed_status()
+                elif cmd == 'l':
+                    self._save_latency_report()
+                elif cmd == 't':
+                    self._toggle_tracing()
                 elif cmd == 'c':
                     import os
                     os.system('cls' if os.name == 'nt' else 'clear')
@@ -282,7 +327,93 @@ class SystemTrayManager:
                         pass
             else:
                 print(f"  {name}: ❌ MISSING ({abs_path})")
-        
+
+        # Write-behind queue health
+        try:
+            from core.io_writer import get_io_writer
+            io_stats = get_io_writer().get_stats()
+            print(f"\nWriter queue depth: {io_stats['queue_depth']}")
+            for target, stats in io_stats["targets"].items():
+                print(f"  {target}: {stats['written']} written, {stats['elided']} unchanged, "
+                      f"{stats['superseded']} coalesced, "
+                      f"avg {stats['avg_latency_ms']:.1f} ms, max {stats['max_latency_ms']:.1f} ms")
+        except Exception as e:
+            print(f"Writer stats unavailable: {e}")
+
+        # Concurrent monitoring
+        arbiter_stats = self.player_manager.get_arbiter_stats()
+        if arbiter_stats:
+            print(f"\nConcurrent monitoring: {', '.join(arbiter_stats['monitored']) or 'none'} "
+                  f"(playing: {', '.join(arbiter_stats['active']) or 'none'}), "
+                  f"{arbiter_stats['handovers']} handovers")
+
+        # Backend worker processes
+        worker_stats = self.player_manager.get_worker_stats()
+        if worker_stats:
+            print("\nBackend processes:")
+            for name, stats in worker_stats.items():
+                age = stats["last_message_age"]
+                print(f"  {name}: {stats['state']} (pid {stats['pid'] or '-'}), "
+                      f"up {stats['uptime']:.0f}s, {stats['restarts']} restarts "
+                      f"({stats['crashes']} crashed, {stats['stalls']} stalled), {stats['deltas']} deltas, "
+                      f"last message {f'{age:.1f}s ago' if age is not None else '-'}")
+
+        # Track change to files on disk, per backend and per artwork source
+        latency = get_track_latency().get_stats()
+        if latency["changes"]:
+            print(f"\nTrack-change latency: {latency['changes']} changes, {latency['completed']} complete, "
+                  f"{latency['superseded']} superseded, {latency['cleared']} cleared (ms from detection)")
+            groups = list(latency["backends"].items())
+            groups += [(f"artwork: {source}", stages) for source, stages in latency["artwork_sources"].items()]
+            for group, stages in groups:
+                print(f"  {group}")
+                for stage in STAGES:
+                    hist = stages.get(stage)
+                    if hist:
+                        print(f"    {stage:<17} {hist['count']:5d}  p50 {hist['p50_ms']:8.1f}  "
+                              f"p95 {hist['p95_ms']:8.1f}  p99 {hist['p99_ms']:8.1f}  max {hist['max_ms']:8.1f}")
+
+        # Threads and tasks of the shared runtime
+        inventory = get_runtime().get_inventory()
+        print(f"\nRuntime threads ({len(inventory['threads'])}): {', '.join(inventory['threads'])}")
+        print(f"  Loop tasks ({len(inventory['tasks'])}): {', '.join(inventory['tasks']) or 'none'}")
+        print(f"  COM apartment: {inventory['apartment_job'] or 'idle'}, {inventory['apartment_queued']} queued; "
+              f"executor: {inventory['executor_threads']}/{inventory['executor_workers']} threads, "
+              f"{inventory['executor_queued']} queued")
+        trace_stats = get_tracer().get_stats()
+        print(f"  Tracing: {'on' if trace_stats['enabled'] else 'off'}, "
+              f"{trace_stats['buffered']}/{trace_stats['capacity']} spans buffered, {trace_stats['flushes']} saved")
+        timer_stats = get_runtime().timers.get_stats()
+        print(f"  Timers: {timer_stats['wakeups_per_minute']} wakeups/min, {timer_stats['wakeups']} total, "
+              f"{timer_stats['merged']} merged; active: {', '.join(timer_stats['active']) or 'none'}")
+
+        # Latency of external calls and what the watchdog caught
+        budget_stats = get_runtime().budget.get_stats()
+        if budget_stats["sites"]:
+            print(f"\nExternal calls: {budget_stats['hangs']} hangs, {budget_stats['restarts']} restarts")
+            for site, site_stats in sorted(budget_stats["sites"].items()):
+                print(f"  {site:<34} {site_stats['calls']:6d} calls  p50 {site_stats['p50_ms']:7.1f}  "
+                      f"p95 {site_stats['p95_ms']:7.1f}  p99 {site_stats['p99_ms']:7.1f} ms"
+                      f"{'  hung ' + str(site_stats['hangs']) if site_stats['hangs'] else ''}")
+        for call in budget_stats["in_flight"]:
+            if call["hung"]:
+                print(f"  HUNG: {call['backend']} {call['site']} on {call['thread']} for {call['seconds']:.1f}s")
+
+        # COM traffic of the iTunes backend
+        current_player = self.player_manager.get_current_player()
+        if current_player and hasattr(current_player, "get_com_stats"):
+            com_stats = current_player.get_com_stats()
+            print(f"\niTunes COM ({com_stats['monitor_mode']}): {com_stats['calls_per_tick']:.2f} calls/tick, "
+                  f"last tick {com_stats['last_tick_calls']}, "
+                  f"track cache {com_stats['track_cache_hits']} hits / {com_stats['track_cache_misses']} misses")
+
+        # Event coalescing of the Apple Music backend
+        if current_player and hasattr(current_player, "get_event_stats"):
+            event_stats = current_player.get_event_stats()
+            if event_stats:
+                print(f"\nGSMTC events: {event_stats['received']} received, "
+                      f"{event_stats['coalesced']} coalesced, {event_stats['executed']} executed")
+
         print("="*50)
     
     def _show_help(self):
@@ -294,6 +425,8 @@ class SystemTrayManager:
         print("  1 - Switch to Apple Music player")
         print("  2 - Switch to iTunes player") 
         print("  s - Show detailed status and file info")
+        print("  l - Save track-change latency report (JSON)")
+        print("  t - Start tracing, or save the trace (Chrome/Perfetto JSON) and stop")
         print("  c - Clear screen")
         print("  q - Quit application")
         print("  h - Show this help")
@@ -313,16 +446,58 @@ class SystemTrayManager:
                 track_info = self.current_info.get("track", "No track")
                 
                 message = f"Current Player: {current_player}\nNow Playing: {track_info}"
+                latency_lines = self._latency_summary()
+                if latency_lines:
+                    message += "\n\nTrack change to files on disk (p50 / p95 / p99):\n" + "\n".join(latency_lines)
                 messagebox.showinfo("ANP Status", message)
             except Exception as e:
                 print(f"Status popup error: {e}")
     
+    def _latency_summary(self):
+        """One line per backend and artwork source: how long a track change takes to be fully on disk"""
+        lines = []
+        stats = get_track_latency().get_stats()
+        groups = [(backend, stages, ("text", "artwork", "complete"))
+                  for backend, stages in stats["backends"].items()]
+        groups += [(f"artwork: {source}", stages, ARTWORK_STAGES)
+                   for source, stages in stats["artwork_sources"].items()]
+        for group, stages, shown in groups:
+            parts = []
+            for stage in shown:
+                hist = stages.get(stage)
+                if hist:
+                    parts.append(f"{stage} {hist['p50_ms']:.0f} / {hist['p95_ms']:.0f} / {hist['p99_ms']:.0f} ms")
+            if parts:
+                lines.append(f"{group}: {', '.join(parts)}")
+        return lines
+    
+    def _save_latency_report(self, _=None):
+        """Write the track-change latency histograms and recent traces to a JSON file"""
+        try:
+            path = get_track_latency().dump()
+            print(f"Latency report saved: {path}")
+        except Exception as e:
+            print(f"Latency report error: {e}")
+    
+    def _toggle_tracing(self, _=None):
+        """Start recording spans, or write the recorded ones to the trace file and stop"""
+        tracer = get_tracer()
+        try:
+            if tracer.enabled:
+                tracer.disable()
+                tracer.flush()
+            else:
+                tracer.enable()
+        except Exception as e:
+            print(f"Trace error: {e}")
+    
     def stop(self):
         """Stop the system tray"""
         with self._lock:
             print("Stopping system tray manager...")
             self.running = False
             self.quit_requested = True
+            self._quit_event.set()
             
             if self.systray and not self.fallback_mode:
                 try:
@@ -421,5 +596,6 @@ class SystemTrayManager:
         print("System tray quit requested...")
         self.quit_requested = True
         self.running = False
+        self._quit_event.set()
         if hasattr(self, 'player_manager'):
             self.player_manager.shutdown()
\ No newline at end of file
@@ -0,0 +1,69 @@
+"""
+Shared HTTP client with pooled keep-alive connections
+"""
+import threading
+from urllib.parse import urlsplit
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from core.runtime import get_runtime
+from config.settings import (HTTP_POOL_CONNECTIONS, HTTP_POOL_MAXSIZE, HTTP_MAX_RETRIES,
+                             HTTP_RETRY_BACKOFF, HTTP_CONNECT_TIMEOUT, LASTFM_READ_TIMEOUT,
+                             CALL_DEADLINE_HTTP)
+
+DEFAULT_HEADERS = {
+    'User-Agent': 'ANP-TrayApp/1.0 (Windows; Music Player Integration)',
+    'Accept-Language': 'en-US,en;q=0.5',
+    'Accept-Encoding': 'gzip, deflate',
+}
+
+
+class HttpClient:
+    def __init__(self, pool_connections=HTTP_POOL_CONNECTIONS, pool_maxsize=HTTP_POOL_MAXSIZE,
+                 max_retries=HTTP_MAX_RETRIES, backoff_factor=HTTP_RETRY_BACKOFF,
+                 connect_timeout=HTTP_CONNECT_TIMEOUT, read_timeout=LASTFM_READ_TIMEOUT, budget=None):
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+        self.budget = budget  # call budget for latency and hang tracking, the runtime's by default
+
+        # Retry idempotent requests on connection errors and transient server errors
+        retry = Retry(
+            total=max_retries,
+            backoff_factor=backoff_factor,
+            status_forcelist=(429, 500, 502, 503, 504),
+            allowed_methods=frozenset(["GET", "HEAD"]),
+            raise_on_status=False,
+        )
+
+        # One adapter keeps a connection pool per host (api + image CDN)
+        adapter = HTTPAdapter(pool_connections=pool_connections, pool_maxsize=pool_maxsize,
+                              max_retries=retry)
+
+        self.session = requests.Session()
+        self.session.headers.update(DEFAULT_HEADERS)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+    def get(self, url, read_timeout=None, **kwargs):
+        """GET through the pooled session using the configured timeout policy"""
+        timeout = (self.connect_timeout, read_timeout or self.read_timeout)
+        budget = self.budget or get_runtime().budget
+        with budget.call("http", f"http.{urlsplit(url).hostname}", CALL_DEADLINE_HTTP):
+            return self.session.get(url, timeout=timeout, **kwargs)
+
+    def close(self):
+        """Close all pooled connections"""
+        self.session.close()
+
+
+_shared_client = None
+_shared_client_lock = threading.Lock()
+
+
+def get_http_client():
+    """Get the process-wide HTTP client"""
+    global _shared_client
+    with _shared_client_lock:
+        if _shared_client is None:
+            _shared_client = HttpClient()
+        return _shared_client
@@ -0,0 +1,58 @@
+"""
+Image helpers for serving artwork - type sniffing and optional resizing
+"""
+import io
+
+# Magic bytes -> content type
+_SIGNATURES = (
+    (b"\x89PNG\r\n\x1a\n", "image/png"),
+    (b"\xff\xd8\xff", "image/jpeg"),
+    (b"BM", "image/bmp"),
+    (b"GIF8", "image/gif"),
+)
+
+MIN_RESIZE = 16
+MAX_RESIZE = 2048
+
+
+def sniff_content_type(data):
+    """Content type from the leading bytes (artwork files are always named .png)"""
+    for signature, content_type in _SIGNATURES:
+        if data.startswith(signature):
+            return content_type
+    if data[:4] == b"RIFF" and data[8:12] == b"WEBP":
+        return "image/webp"
+    return "application/octet-stream"
+
+
+def resizing_available():
+    """Check if Pillow is installed"""
+    try:
+        import PIL  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+
+def resize_image(data, size):
+    """Scale artwork to fit a size x size box, returns PNG bytes or None.
+
+    Never upscales. Needs Pillow; without it None is returned and callers
+    serve the original bytes.
+    """
+    try:
+        from PIL import Image
+    except ImportError:
+        return None
+
+    try:
+        with Image.open(io.BytesIO(data)) as image:
+            image.thumbnail((size, size))
+            if image.mode not in ("RGB", "RGBA"):
+                image = image.convert("RGBA")
+            output = io.BytesIO()
+            image.save(output, format="PNG", optimize=True)
+            return output.getvalue()
+    except Exception as e:
+        print(f"Error resizing artwork: {e}")
+        return None
@@ -1,16 +1,184 @@
 """
-Last.fm API client for artwork fallback
+Last.fm API client for artwork fallback - MEMOIZED LOOKUPS
 """
-import requests
-from config.settings import LASTFM_API_KEY
+import json
+import os
+import threading
+import time
+from utils.http_client import get_http_client
+from config.settings import (LASTFM_API_KEY, LASTFM_CACHE_TTL, LASTFM_NEGATIVE_CACHE_TTL,
+                             LASTFM_CACHE_FILE, LASTFM_CACHE_SAVE_INTERVAL, LASTFM_READ_TIMEOUT)
+
+
+class LookupCache:
+    """TTL cache for Last.fm lookups - misses are stored as None with a shorter TTL
+
+    New entries are kept in memory and written to cache_file at most every
+    save_interval seconds (save_if_due) and on shutdown (flush).
+    """
+
+    def __init__(self, ttl=LASTFM_CACHE_TTL, negative_ttl=LASTFM_NEGATIVE_CACHE_TTL,
+                 cache_file=LASTFM_CACHE_FILE, save_interval=LASTFM_CACHE_SAVE_INTERVAL):
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.cache_file = cache_file
+        self.save_interval = save_interval
+        self._entries = {}  # key -> (value, expires_at)
+        # Entries added since the file was last written
+        self._dirty = False
+        self._saved_at = time.monotonic()
+        self._save_lock = threading.Lock()
+        self._load()
+
+    def get(self, key):
+        """Return (found, value) for a key that has not expired"""
+        entry = self._entries.get(key)
+        if not entry:
+            return False, None
+
+        value, expires_at = entry
+        if expires_at <= time.time():
+            del self._entries[key]
+            return False, None
+        return True, value
+
+    def set(self, key, value):
+        """Remember a lookup result - None means a confirmed miss"""
+        ttl = self.ttl if value else self.negative_ttl
+        self._entries[key] = (value, time.time() + ttl)
+        self._dirty = True
+
+    def save_if_due(self):
+        """Write new entries if the last write is save_interval old - THREAD SAFE"""
+        if self._dirty and time.monotonic() - self._saved_at >= self.save_interval:
+            self.flush()
+
+    def flush(self):
+        """Persist entries still held in memory only - THREAD SAFE"""
+        with self._save_lock:
+            if self._dirty:
+                self._save()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def _load(self):
+        if not self.cache_file:
+            return
+        try:
+            with open(self.cache_file, "r", encoding="utf-8") as f:
+                entries = json.load(f)
+            now = time.time()
+            for key, (value, expires_at) in entries.items():
+                if expires_at > now:
+                    self._entries[key] = (value, expires_at)
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            print(f"Last.fm cache load failed: {e}")
+
+    def _save(self):
+        if not self.cache_file:
+            return
+        try:
+            now = time.time()
+            self._dirty = False
+            self._saved_at = time.monotonic()
+            entries = {key: entry for key, entry in list(self._entries.items()) if entry[1] > now}
+            os.makedirs(os.path.dirname(self.cache_file), exist_ok=True)
+            temp_path = self.cache_file + ".tmp"
+            with open(temp_path, "w", encoding="utf-8") as f:
+                json.dump(entries, f)
+            os.replace(temp_path, self.cache_file)
+        except Exception as e:
+            print(f"Last.fm cache save failed: {e}")
+
+
+class _Flight:
+    """A lookup in progress that other callers can wait on"""
 
-class LastFmClient:
     def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+
+
+class LastFmClient:
+    def __init__(self, cache=None, http_client=None):
         self.api_key = LASTFM_API_KEY
         self.base_url = "http://ws.audioscrobbler.com/2.0/"
-    
+        self.http = http_client or get_http_client()
+        self.cache = cache if cache is not None else LookupCache()
+        self._lock = threading.Lock()
+        self._in_flight = {}
+        self.stats = {
+            "network_calls": 0,
+            "cache_hits": 0,
+            "negative_hits": 0,
+            "coalesced": 0,
+            "errors": 0,
+        }
+
     def get_album_artwork_url(self, artist, album):
-        """Get artwork URL for album from Last.fm"""
+        """Get artwork URL for album from Last.fm - MEMOIZED, THREAD SAFE"""
+        key = self._cache_key(artist, album)
+
+        with self._lock:
+            found, url = self.cache.get(key)
+            if found:
+                self.stats["cache_hits" if url else "negative_hits"] += 1
+                return url
+
+            flight = self._in_flight.get(key)
+            is_leader = flight is None
+            if is_leader:
+                flight = _Flight()
+                self._in_flight[key] = flight
+            else:
+                self.stats["coalesced"] += 1
+
+        if not is_leader:
+            # Same lookup already running - share its answer
+            flight.done.wait()
+            return flight.result
+
+        url, cacheable = None, False
+        try:
+            url, cacheable = self._fetch_album_artwork_url(artist, album)
+        finally:
+            with self._lock:
+                if cacheable:
+                    self.cache.set(key, url)
+                flight.result = url
+                del self._in_flight[key]
+            flight.done.set()
+            # Written outside the lock, so lookups never wait on the file
+            if cacheable:
+                self.cache.save_if_due()
+        return url
+
+    def get_track_artwork_url(self, artist, track):
+        """Get artwork URL for track from Last.fm (fallback method)"""
+        return self.get_album_artwork_url(artist, track)
+
+    def flush(self):
+        """Persist cached lookups - call on shutdown"""
+        self.cache.flush()
+
+    def get_stats(self):
+        """Get lookup counters including network calls saved by the cache"""
+        with self._lock:
+            stats = dict(self.stats)
+            stats["cached_lookups"] = len(self.cache)
+        stats["calls_saved"] = stats["cache_hits"] + stats["negative_hits"] + stats["coalesced"]
+        return stats
+
+    def _cache_key(self, artist, album):
+        return f"{(artist or '').casefold().strip()}\x1f{(album or '').casefold().strip()}"
+
+    def _fetch_album_artwork_url(self, artist, album):
+        """Query Last.fm - returns (url, cacheable); transport errors are not cacheable"""
+        with self._lock:
+            self.stats["network_calls"] += 1
         try:
             params = {
                 "method": "album.getinfo",
@@ -19,20 +187,27 @@ class LastFmClient:
                 "album": album,
                 "format": "json"
             }
-            response = requests.get(self.base_url, params=params, timeout=5)
+            response = self.http.get(self.base_url, params=params, read_timeout=LASTFM_READ_TIMEOUT)
+            if response.status_code >= 500:
+                return None, False
             data = response.json()
-            
+
+            # Error 6 is "not found"; anything else (rate limit, outage) is transient
+            if data.get("error") not in (None, 6):
+                print(f"Last.fm API error {data.get('error')}: {data.get('message')}")
+                return None, False
+
             if "album" in data and "image" in data["album"]:
                 images = data["album"]["image"]
                 for img in reversed(images):  # Get largest image
                     if img.get("#text"):
-                        return img["#text"]
-            return None
-            
+                        return img["#text"], True
+
+            # Last.fm answered but has no artwork (or does not know the album)
+            return None, True
+
         except Exception as e:
             print(f"Last.fm artwork fetch failed: {e}")
-            return None
-    
-    def get_track_artwork_url(self, artist, track):
-        """Get artwork URL for track from Last.fm (fallback method)"""
-        return self.get_album_artwork_url(artist, track)
\ No newline at end of file
+            with self._lock:
+                self.stats["errors"] += 1
+            return None, False
@@ -0,0 +1,146 @@
+"""
+Memory-mapped live state file with seqlock-protected in-place updates
+
+The file has a fixed size, so it is never renamed or reopened. Readers map
+it once and take lock-free consistent snapshots, which suits overlays and
+local tools that poll many times per second.
+
+Layout (little endian):
+
+    offset  size  field
+    0       4     magic b"ANPS"
+    4       2     layout version
+    6       2     reserved
+    8       8     sequence - odd while a write is in progress
+    16      4     payload length in bytes
+    20      4     payload capacity in bytes
+    24      8     write time (unix seconds, float64)
+    32      cap   payload - UTF-8 JSON, same fields as track_progress.json
+
+Writer: bump sequence to odd, write payload/length/time, bump to even.
+Writes are serialized by a lock, so several threads may share one writer.
+Reader: read sequence, copy payload, re-read sequence; the copy is valid
+when both reads match and are even, otherwise retry.
+
+This module only depends on the standard library so external tools can
+copy it as-is.
+"""
+import json
+import mmap
+import os
+import struct
+import threading
+import time
+
+MAGIC = b"ANPS"
+LAYOUT_VERSION = 1
+HEADER = struct.Struct("<4sHHQIId")
+HEADER_SIZE = 32
+SEQUENCE = struct.Struct("<Q")
+SEQUENCE_OFFSET = 8
+BODY = struct.Struct("<Id")  # payload length, write time
+BODY_OFFSET = 16
+PAYLOAD_OFFSET = HEADER_SIZE
+READ_RETRIES = 100
+
+
+class LiveStateWriter:
+    def __init__(self, path, capacity=16384):
+        self.path = os.path.abspath(path)
+        self.capacity = capacity
+        self.writes = 0
+        self.rejected = 0
+        self._file = None
+        self._map = None
+        self._sequence = 0
+        self._lock = threading.Lock()  # the seqlock allows a single writer at a time
+        self._open()
+
+    def _open(self):
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        size = HEADER_SIZE + self.capacity
+        self._file = open(self.path, "a+b")
+        self._file.truncate(size)
+        self._file.flush()
+        self._map = mmap.mmap(self._file.fileno(), size, access=mmap.ACCESS_WRITE)
+
+        # Start from an even sequence above whatever a previous run left behind
+        magic = self._map[0:4]
+        if magic == MAGIC:
+            previous = SEQUENCE.unpack_from(self._map, SEQUENCE_OFFSET)[0]
+            self._sequence = previous + (previous & 1)
+        HEADER.pack_into(self._map, 0, MAGIC, LAYOUT_VERSION, 0, self._sequence,
+                         0, self.capacity, time.time())
+
+    def write(self, payload):
+        """Replace the payload in place - returns False if it does not fit - THREAD SAFE"""
+        if len(payload) > self.capacity:
+            self.rejected += 1
+            return False
+
+        with self._lock:
+            live_map = self._map
+            if live_map is None:
+                return False
+            self._sequence += 1  # odd: write in progress
+            SEQUENCE.pack_into(live_map, SEQUENCE_OFFSET, self._sequence)
+            live_map[PAYLOAD_OFFSET:PAYLOAD_OFFSET + len(payload)] = payload
+            BODY.pack_into(live_map, BODY_OFFSET, len(payload), time.time())
+            self._sequence += 1  # even: consistent again
+            SEQUENCE.pack_into(live_map, SEQUENCE_OFFSET, self._sequence)
+            self.writes += 1
+        return True
+
+    def close(self):
+        with self._lock:
+            if self._map is not None:
+                self._map.close()
+                self._map = None
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+
+class LiveStateReader:
+    def __init__(self, path):
+        self.path = os.path.abspath(path)
+        self.retries = 0
+        self._file = open(self.path, "rb")
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        if self._map[0:4] != MAGIC:
+            self.close()
+            raise ValueError(f"Not a live state file: {self.path}")
+
+    def read_bytes(self):
+        """Consistent copy of the payload bytes, or None if the writer never settled"""
+        live_map = self._map
+        for _ in range(READ_RETRIES):
+            before = SEQUENCE.unpack_from(live_map, SEQUENCE_OFFSET)[0]
+            if before & 1:
+                self.retries += 1
+                continue
+            length, _ = BODY.unpack_from(live_map, BODY_OFFSET)
+            payload = live_map[PAYLOAD_OFFSET:PAYLOAD_OFFSET + length]
+            if SEQUENCE.unpack_from(live_map, SEQUENCE_OFFSET)[0] == before:
+                return payload
+            self.retries += 1
+        return None
+
+    def read(self):
+        """Consistent snapshot decoded from JSON ({} when cleared)"""
+        payload = self.read_bytes()
+        if not payload:
+            return {}
+        return json.loads(payload)
+
+    def sequence(self):
+        """Current sequence number - cheap change detection for pollers"""
+        return SEQUENCE.unpack_from(self._map, SEQUENCE_OFFSET)[0]
+
+    def close(self):
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+        if self._file is not None:
+            self._file.close()
+            self._file = None
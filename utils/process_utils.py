@@ -0,0 +1,109 @@
+"""
+Process list utilities - cheap checks that never start the process they look for
+"""
+import os
+import sys
+import time
+
+
+def running_process_names():
+    """Lower-case executable names of running processes, or None if the list cannot be read"""
+    try:
+        if sys.platform == "win32":
+            return _windows_process_names()
+        if os.path.isdir("/proc"):
+            return _proc_process_names()
+    except Exception as e:
+        print(f"Process list unavailable: {e}")
+    return None
+
+
+def is_process_running(name):
+    """True or False, or None when the process list cannot be read"""
+    names = running_process_names()
+    if names is None:
+        return None
+    return name.lower() in names
+
+
+def _windows_process_names():
+    """Toolhelp snapshot of the process list (no WMI, no subprocess)"""
+    import ctypes
+    from ctypes import wintypes
+
+    class PROCESSENTRY32W(ctypes.Structure):
+        _fields_ = [
+            ("dwSize", wintypes.DWORD),
+            ("cntUsage", wintypes.DWORD),
+            ("th32ProcessID", wintypes.DWORD),
+            ("th32DefaultHeapID", ctypes.c_size_t),
+            ("th32ModuleID", wintypes.DWORD),
+            ("cntThreads", wintypes.DWORD),
+            ("th32ParentProcessID", wintypes.DWORD),
+            ("pcPriClassBase", ctypes.c_long),
+            ("dwFlags", wintypes.DWORD),
+            ("szExeFile", ctypes.c_wchar * 260),
+        ]
+
+    TH32CS_SNAPPROCESS = 0x00000002
+    kernel32 = ctypes.WinDLL("kernel32", use_last_error=True)
+    kernel32.CreateToolhelp32Snapshot.argtypes = (wintypes.DWORD, wintypes.DWORD)
+    kernel32.CreateToolhelp32Snapshot.restype = wintypes.HANDLE
+    kernel32.Process32FirstW.argtypes = (wintypes.HANDLE, ctypes.POINTER(PROCESSENTRY32W))
+    kernel32.Process32NextW.argtypes = (wintypes.HANDLE, ctypes.POINTER(PROCESSENTRY32W))
+    kernel32.CloseHandle.argtypes = (wintypes.HANDLE,)
+
+    snapshot = kernel32.CreateToolhelp32Snapshot(TH32CS_SNAPPROCESS, 0)
+    if not snapshot or snapshot == wintypes.HANDLE(-1).value:
+        return None
+
+    names = set()
+    try:
+        entry = PROCESSENTRY32W()
+        entry.dwSize = ctypes.sizeof(PROCESSENTRY32W)
+        found = kernel32.Process32FirstW(snapshot, ctypes.byref(entry))
+        while found:
+            names.add(entry.szExeFile.lower())
+            found = kernel32.Process32NextW(snapshot, ctypes.byref(entry))
+    finally:
+        kernel32.CloseHandle(snapshot)
+    return names
+
+
+def _proc_process_names():
+    """Process names from /proc (comm is truncated to 15 characters)"""
+    names = set()
+    for pid in os.listdir("/proc"):
+        if not pid.isdigit():
+            continue
+        try:
+            with open(f"/proc/{pid}/comm", "r") as f:
+                names.add(f.read().strip().lower())
+        except OSError:
+            pass  # process exited while listing
+    return names
+
+
+class AvailabilityProbe:
+    """Caches the result of an availability check for a few seconds"""
+
+    def __init__(self, check, ttl, clock=time.monotonic):
+        self.check = check
+        self.ttl = ttl
+        self.clock = clock
+        self._result = None
+        self._checked_at = None
+        self.stats = {"probes": 0, "cached": 0}
+
+    def is_available(self):
+        now = self.clock()
+        if self._checked_at is not None and now - self._checked_at < self.ttl:
+            self.stats["cached"] += 1
+            return self._result
+        self.stats["probes"] += 1
+        self._result = bool(self.check())
+        self._checked_at = now
+        return self._result
+
+    def invalidate(self):
+        self._checked_at = None
@@ -0,0 +1,53 @@
+"""
+Reader helper for track_progress.json - extrapolates the live position
+
+Works with both progress modes: in "anchor" mode the file only changes on
+track change, pause or seek, and the position is extrapolated from the
+anchor; in "interval" mode the last written position is extrapolated from
+its timestamp, which smooths over the 1 s update gap.
+
+Usage from another tool:
+
+    from utils.progress_reader import read_progress, extrapolate_position
+    progress = read_progress("../NPlaying/track_progress.json")
+    print(extrapolate_position(progress))
+"""
+import json
+import time
+
+
+def read_progress(path):
+    """Read the progress file - returns {} when missing or mid-update"""
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def extrapolate_position(progress, now=None, now_monotonic=None):
+    """Current playback position in seconds, clamped to the track duration
+
+    The monotonic anchor is preferred because it is immune to wall clock
+    adjustments; it is comparable across processes on the same machine.
+    """
+    if not progress:
+        return 0.0
+
+    if "anchor_position_seconds" in progress:
+        position = progress["anchor_position_seconds"]
+        if "anchor_monotonic" in progress:
+            elapsed = (time.monotonic() if now_monotonic is None else now_monotonic) - progress["anchor_monotonic"]
+        else:
+            elapsed = (time.time() if now is None else now) - progress.get("anchor_timestamp_unix", 0)
+    else:
+        position = progress.get("position_seconds", 0)
+        elapsed = (time.time() if now is None else now) - progress.get("timestamp_unix", 0)
+
+    if progress.get("is_playing"):
+        position += max(0.0, elapsed) * progress.get("playback_rate", 1.0)
+
+    duration = progress.get("duration_seconds", 0)
+    if duration > 0:
+        position = min(position, duration)
+    return max(0.0, position)
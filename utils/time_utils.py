@@ -25,6 +25,9 @@ def timespan_to_seconds(timespan):
         # 1 second = 10,000,000 ticks
         if hasattr(timespan, 'ticks'):
             return timespan.ticks / 10000000.0
+        # Newer projections map TimeSpan to datetime.timedelta
+        elif hasattr(timespan, 'total_seconds'):
+            return timespan.total_seconds()
         # Alternative: check for total_milliseconds
         elif hasattr(timespan, 'total_milliseconds'):
             return timespan.total_milliseconds / 1000.0